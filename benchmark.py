@@ -0,0 +1,252 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from data_cache import clear_cache, configure_cache
+from data_loader import load_columns
+from drawbar import drawbar_coefficient, file_mean_drawbar_coefficient
+from figure_export import configure_export
+from memoize import configure_memo
+from run_store import RunStore
+from schemas import CHRONO_SCHEMA, SINGLE_WHEEL_SCHEMA
+from series_store import SeriesStore
+from smoothing import make_filter
+from synthetic_data import write_chrono_csv, write_single_wheel_csv, write_sweep
+
+DEFAULT_ROWS = [10_000, 1_000_000, 10_000_000]
+SWEEP_SLIPS = [0.0, 0.1, 0.2, 0.3]
+SCALES = [1.0, 2.0]
+
+
+def measure(func, repeat=1, memory=True):
+    """
+    Time func() (best of repeat runs) and, optionally, its peak traced allocation.
+
+    Memory is measured in a separate run so tracemalloc overhead does not affect the timing.
+
+    Returns:
+        dict: seconds, peak_bytes (None when memory is False) and max_rss_bytes of the process.
+    """
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - started)
+
+    peak_bytes = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        func()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss_bytes = max_rss if sys.platform == "darwin" else max_rss * 1024
+    return {"seconds": min(seconds), "peak_bytes": peak_bytes, "max_rss_bytes": max_rss_bytes}
+
+
+def generate_datasets(data_dir, rows):
+    """Generate (or reuse) the synthetic inputs for one dataset size."""
+    folder = os.path.join(data_dir, f"rows_{rows}")
+    os.makedirs(folder, exist_ok=True)
+    paths = {
+        "chrono": os.path.join(folder, "chrono.csv"),
+        "single_wheel": os.path.join(folder, "single_wheel.csv"),
+        "scales": [os.path.join(folder, f"scale_{scale:g}.csv") for scale in SCALES],
+        "sweep": os.path.join(folder, "sweep"),
+    }
+    if not os.path.exists(paths["chrono"]):
+        print(f"Generating {rows} row Chrono dataset")
+        write_chrono_csv(paths["chrono"], rows)
+    if not os.path.exists(paths["single_wheel"]):
+        print(f"Generating {rows} row single wheel dataset")
+        write_single_wheel_csv(paths["single_wheel"], rows)
+    for i, path in enumerate(paths["scales"]):
+        if not os.path.exists(path):
+            write_single_wheel_csv(path, rows, seed=i + 1)
+
+    # The sweep splits the same total number of rows over its runs
+    marker = os.path.join(folder, "sweep.complete")
+    if not os.path.exists(marker):
+        print(f"Generating {rows} row sweep over {len(SWEEP_SLIPS)} runs")
+        write_sweep(paths["sweep"], SWEEP_SLIPS, max(rows // len(SWEEP_SLIPS), 1))
+        open(marker, "w").close()
+
+    # Analysis window over the middle half of each sweep run
+    duration = max(rows // len(SWEEP_SLIPS), 1) * 0.001
+    paths["window"] = (0.25 * duration, 0.75 * duration)
+    return paths
+
+
+def benchmark_cases(paths):
+    """
+    (entry point, stage, callable) for every benchmarked step.
+
+    load: parse the columns the entry point needs; reduce: compute its numbers;
+    render: run the entry point end to end with headless export.
+    """
+    # Imported here so the benchmark controls the matplotlib backend first
+    from combined_plotter import (analyze_chronosim_data, batch_process_data, list_subfolders,
+                                  plot_chronosim_data, plot_single_wheel_data, process_subfolder)
+    from forceXY_time import plot_forces
+
+    start_time, end_time = paths["window"]
+
+    chrono_columns = ['t', 'posX', 'posY', 'posZ', 'velX', 'velY', 'velZ',
+                      'torqueLF', 'torqueRF', 'torqueLB', 'torqueRB']
+    single_wheel_columns = ['t', 'f_x', 'f_y', 'f_z', 'd_c', 'v_max']
+
+    def drawbar_time_reduce():
+        df = load_columns(paths["single_wheel"], columns=['t', 'f_x', 'f_y', 'f_z'], dtype=np.float32)
+        coeff = drawbar_coefficient(df['f_x'].to_numpy(), df['f_y'].to_numpy(), df['f_z'].to_numpy())
+        return make_filter('savgol', 51, 2).apply(coeff)
+
+    return [
+        ("plot_chronosim", "load",
+         lambda: load_columns(paths["chrono"], columns=chrono_columns, names=CHRONO_SCHEMA, dtype=np.float32)),
+        ("plot_chronosim", "reduce", lambda: analyze_chronosim_data(paths["chrono"])),
+        ("plot_chronosim", "render", lambda: plot_chronosim_data(paths["chrono"])),
+
+        ("plot_single_wheel", "load",
+         lambda: load_columns(paths["single_wheel"], columns=single_wheel_columns, names=SINGLE_WHEEL_SCHEMA,
+                              dtype=np.float32)),
+        ("plot_single_wheel", "render", lambda: plot_single_wheel_data(paths["single_wheel"])),
+
+        ("batch_process", "load",
+         lambda: [SeriesStore.open(os.path.join(path, "output.csv"), ['d_c'])
+                  for path in list_subfolders(paths["sweep"])]),
+        ("batch_process", "reduce",
+         lambda: [process_subfolder(path, start_time, end_time) for path in list_subfolders(paths["sweep"])]),
+        ("batch_process", "render",
+         lambda: batch_process_data(paths["sweep"], start_time=start_time, end_time=end_time, index_path=False,
+                                    registry_path=False)),
+
+        ("drawbar_slip_scale", "reduce", lambda: file_mean_drawbar_coefficient(paths["single_wheel"])),
+        ("drawbar_time_scale", "reduce", drawbar_time_reduce),
+
+        ("forceXY_time", "load", lambda: RunStore.load(paths["scales"], ['f_x', 'f_y'], labels=SCALES)),
+        ("forceXY_time", "render", lambda: plot_forces(paths["scales"], SCALES, 0.1)),
+    ]
+
+
+def run_benchmarks(rows_list, data_dir, work_dir, repeat=1, memory=True, cache=False, entry_points=None):
+    """
+    Benchmark every entry point at every dataset size.
+
+    Returns:
+        list: One result dict per (rows, entry point, stage).
+    """
+    configure_cache(enabled=cache, cache_dir=os.path.join(work_dir, "cache"))
+    configure_export(out_dir=os.path.join(work_dir, "figures"), force=True)
+    # Memoized results would turn every reduce case after the first run into a lookup
+    configure_memo(enabled=False)
+
+    results = []
+    for rows in rows_list:
+        paths = generate_datasets(data_dir, rows)
+        for entry_point, stage, func in benchmark_cases(paths):
+            if entry_points and entry_point not in entry_points:
+                continue
+            if cache:
+                # Every case starts from an empty cache; with --repeat > 1 the best time is the warm-cache cost
+                clear_cache()
+            try:
+                result = measure(func, repeat, memory)
+            except Exception as e:
+                # Record the failure and keep benchmarking the other cases
+                print(f"{rows:>10} rows  {entry_point:<20} {stage:<7} failed: {e}")
+                results.append({"rows": rows, "entry_point": entry_point, "stage": stage, "error": str(e)})
+                continue
+            result.update(rows=rows, entry_point=entry_point, stage=stage)
+            results.append(result)
+            peak = f", peak {result['peak_bytes'] / 2**20:.1f} MiB" if memory else ""
+            print(f"{rows:>10} rows  {entry_point:<20} {stage:<7} {result['seconds']:8.3f} s{peak}")
+    return results
+
+
+def environment_info():
+    """Versions and commit the results were recorded with."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare_results(results, baseline_path, tolerance=0.2):
+    """
+    Print the timing change of each case against a previous results file.
+
+    Returns:
+        list: (rows, entry_point, stage, ratio) of cases slower than 1 + tolerance.
+    """
+    with open(baseline_path) as fp:
+        baseline = {(r["rows"], r["entry_point"], r["stage"]): r for r in json.load(fp)["results"]}
+
+    regressions = []
+    for result in results:
+        key = (result["rows"], result["entry_point"], result["stage"])
+        if "error" in result or "seconds" not in baseline.get(key, {}) or baseline[key]["seconds"] <= 0:
+            continue
+        ratio = result["seconds"] / baseline[key]["seconds"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(key + (ratio,))
+            flag = "  REGRESSION"
+        print(f"{key[0]:>10} rows  {key[1]:<20} {key[2]:<7} {ratio:6.2f}x baseline{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and memory-profile load, reduce and render of each plotting entry point.")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS, help="Dataset sizes (rows per file)")
+    parser.add_argument('--data-dir', default='benchmark_data', help="Where synthetic datasets are generated and reused")
+    parser.add_argument('--work-dir', default=None, help="Scratch folder for the cache and figures (default: <data-dir>/work)")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON file the results are written to")
+    parser.add_argument('--repeat', type=int, default=1, help="Timed runs per case (the best is recorded)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced run measuring peak allocations")
+    parser.add_argument('--cache', action='store_true', help="Benchmark with the column cache enabled")
+    parser.add_argument('--only', nargs='+', default=None, help="Entry points to benchmark, e.g. plot_chronosim batch_process")
+    parser.add_argument('--compare', default=None, help="Previous results JSON to compare timings against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Slowdown fraction reported as a regression")
+    args = parser.parse_args(argv)
+
+    work_dir = args.work_dir or os.path.join(args.data_dir, "work")
+    results = run_benchmarks(args.rows, args.data_dir, work_dir, args.repeat, not args.no_memory, args.cache, args.only)
+
+    with open(args.output, "w") as fp:
+        json.dump({"environment": environment_info(), "cache": args.cache, "repeat": args.repeat, "results": results},
+                  fp, indent=2)
+    print(f"Saved results to {args.output}")
+
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than {1 + args.tolerance:.2f}x baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import numpy as np
+
+from window_sweep import prefix_sums
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_RESAMPLES = 2000
+
+# Samples used to estimate the autocorrelation length, and the most block indices
+# drawn at once (bounds the resampling memory for long runs)
+ACF_MAX_SAMPLES = 2**20
+MAX_INDICES = 2**22
+
+
+def block_length(y):
+    """
+    Moving-block length for a correlated series.
+
+    Five times the lag at which the sample autocorrelation first drops below 1/e, so a
+    block spans the correlated stretch of samples, but at least n^(1/3) and at most n / 4.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    minimum = int(np.ceil(n ** (1 / 3)))
+    maximum = max(1, n // 4)
+
+    # Autocorrelation of (at most) the first ACF_MAX_SAMPLES samples via the power spectrum
+    head = y[:ACF_MAX_SAMPLES] - y[:ACF_MAX_SAMPLES].mean()
+    nfft = 1 << int(np.ceil(np.log2(2 * len(head))))
+    autocorr = np.fft.irfft(np.abs(np.fft.rfft(head, nfft)) ** 2, nfft)[:len(head)]
+    if autocorr[0] <= 0:
+        return min(minimum, maximum)
+    below = np.flatnonzero(autocorr < autocorr[0] / np.e)
+    correlated = 5 * int(below[0]) if len(below) else maximum
+    return int(np.clip(correlated, min(minimum, maximum), maximum))
+
+
+def block_bootstrap_means(y, n_resamples=DEFAULT_RESAMPLES, block=None, seed=0):
+    """
+    Moving-block bootstrap distribution of the mean of y.
+
+    Every resample concatenates ceil(n / block) blocks drawn with replacement from the
+    n - block + 1 overlapping blocks. Its mean is the mean of the drawn block means,
+    which come from prefix sums, so a resample costs one index array row instead of
+    gathering n samples.
+
+    Parameters:
+        y (np.ndarray): Samples (NaN samples are dropped).
+        n_resamples (int): Number of bootstrap resamples.
+        block (int): Block length in samples; estimated with block_length when None.
+        seed (int): Random seed, so repeated analyses give identical intervals.
+
+    Returns:
+        np.ndarray: The n_resamples resampled means.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    y = y[~np.isnan(y)]
+    n = len(y)
+    if n < 2:
+        raise ValueError("Need at least 2 samples to bootstrap a mean")
+    block = min(block or block_length(y), n)
+    n_blocks = -(-n // block)
+
+    sums = prefix_sums(y)
+    block_means = (sums[block:] - sums[:-block]) / block
+
+    # Resamples are drawn in batches so the index array stays below MAX_INDICES entries
+    rng = np.random.default_rng(seed)
+    means = np.empty(n_resamples)
+    batch = max(1, MAX_INDICES // n_blocks)
+    for start in range(0, n_resamples, batch):
+        stop = min(start + batch, n_resamples)
+        starts = rng.integers(0, len(block_means), size=(stop - start, n_blocks))
+        means[start:stop] = block_means[starts].mean(axis=1)
+    return means
+
+
+def bootstrap_ci(y, confidence=DEFAULT_CONFIDENCE, n_resamples=DEFAULT_RESAMPLES, block=None, seed=0):
+    """
+    Percentile block-bootstrap confidence interval of the mean of y.
+
+    Returns:
+        tuple: (mean, low, high); the bounds are NaN with fewer than 2 defined samples,
+        and the mean too without any.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    y = y[~np.isnan(y)]
+    if len(y) < 2:
+        return float(y[0]) if len(y) else float("nan"), float("nan"), float("nan")
+    means = block_bootstrap_means(y, n_resamples, block, seed)
+    low, high = np.quantile(means, [(1 - confidence) / 2, (1 + confidence) / 2])
+    return float(np.mean(y)), float(low), float(high)
+
+
+def error_bars(means, lows, highs):
+    """Asymmetric matplotlib yerr ([below, above]) from interval bounds; NaN bounds give no bar."""
+    means = np.asarray(means, dtype=np.float64)
+    below = np.nan_to_num(means - np.asarray(lows, dtype=np.float64))
+    above = np.nan_to_num(np.asarray(highs, dtype=np.float64) - means)
+    return np.vstack([np.maximum(below, 0), np.maximum(above, 0)])
@@ -0,0 +1,48 @@
+import argparse
+import importlib
+
+# Subcommand -> (module, combined_plotter functionality or None for a script main(), help)
+# Modules are imported only when their subcommand runs, and matplotlib only when a
+# figure is actually drawn, so --help and analysis-only commands start fast.
+COMMANDS = {
+    "chronosim": ("combined_plotter", "plot_chronosim", "Plot Chronosim position, torque and velocity"),
+    "analyze": ("combined_plotter", "analyze_chronosim", "Chronosim slip and effective radius, no plotting"),
+    "drawbar": ("combined_plotter", "plot_drawbar", "Drawbar coefficient vs slip against reference data"),
+    "single_wheel": ("combined_plotter", "plot_single_wheel", "Plot single wheel forces, drawbar coefficient and V_max"),
+    "batch": ("combined_plotter", "batch_process", "Slip vs drawbar curve of a sweep folder"),
+    "batch_node": ("combined_plotter", "batch_node", "Work through a sweep folder's shared queue on this node"),
+    "batch_merge": ("combined_plotter", "batch_merge", "Slip vs drawbar curve from the results of every node"),
+    "sweep": ("combined_plotter", "plot_start_time_testing", "Mean drawbar coefficient over a grid of analysis windows"),
+    "slip_sweep": ("combined_plotter", "plot_slip_window_sweep", "Chronosim slip over a grid of analysis windows"),
+    "query_index": ("combined_plotter", "query_index", "Results stored in a batch results index"),
+    "slip_scale": ("drawbar_slip_scale", None, "Drawbar coefficient vs slip per scale value"),
+    "time_scale": ("drawbar_time_scale", None, "Drawbar coefficient vs time per scale value"),
+    "forces": ("forceXY_time", None, "f_x and f_y vs time per scale value"),
+    "positions": ("posXY_time", None, "pos_x and pos_y vs time per scale value"),
+    "posz": ("posZ_time", None, "pos_z vs time per scale value"),
+}
+
+
+def main(argv=None):
+    epilog = "commands:\n" + "\n".join(f"  {name:<14}{help_text}" for name, (_, _, help_text) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog="chrono_plotter.py",
+        description="Plot and analyze Chrono rover and single wheel simulation output.",
+        epilog=epilog + "\n\nRun 'chrono_plotter.py <command> --help' (or without arguments) for command options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help="One of the commands below")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="Arguments of the command")
+    args = parser.parse_args(argv)
+
+    module_name, functionality, _ = COMMANDS[args.command]
+    module = importlib.import_module(module_name)
+    prog = f"chrono_plotter.py {args.command}"
+    if functionality is not None:
+        module.main([functionality] + args.args, prog=prog)
+    else:
+        module.main(args.args, prog=prog)
+
+
+if __name__ == "__main__":
+    main()
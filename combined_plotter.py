@@ -1,33 +1,78 @@
 import sys
 import os
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt 
 import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bootstrap import DEFAULT_CONFIDENCE, bootstrap_ci, error_bars
+from data_cache import cache_settings, configure_cache, init_worker_cache
+from downsample import configure_downsampling, downsample_settings, init_worker_downsampling, plot_series
+from live_monitor import follow_chronosim_data, follow_single_wheel_data
+from figure_export import configure_export, exporting, figure_stem, figures_are_current, finish_figure, render_in_parallel
+from data_loader import load_columns
+from schemas import CHRONO_SCHEMA, SINGLE_WHEEL_SCHEMA
+from kinematics import body_kinematics
+from memoize import configure_memo, init_worker_memo, memo_settings, memoize
+from instrumentation import configure_instrumentation, merge_events, run_traced, stage
+from reference_curves import DEFAULT_REGISTRY_PATH, load_registry
+from results_index import INDEX_FILE_NAME, ResultsIndex, run_fingerprint
+from series_store import SeriesStore
+from work_queue import DEFAULT_LEASE, QUEUE_FILE_NAME, WorkQueue, worker_name
+from window_sweep import window_grid, window_labels, window_means
 
 
 #  chronosimplotter.py 
-def plot_chronosim_data(file_path):
-    """Plot Chronosim data from a CSV file."""
-    data = pd.read_csv(file_path)
-    data.columns = [
-        't', 'posX', 'posY', 'posZ', 'velX', 'velY', 'velZ', 
-        'quatE0', 'quatE1', 'quatE2', 'quatE3', 
-        'torqueLF', 'torqueRF', 'torqueLB', 'torqueRB', 'slip'
-    ]
+# Columns drawn by plot_chronosim_data
+CHRONO_PLOT_COLUMNS = ['t', 'posX', 'posY', 'posZ', 'velX', 'velY', 'velZ',
+                       'torqueLF', 'torqueRF', 'torqueLB', 'torqueRB']
+
+# Columns of the table returned by analyze_chronosim_runs
+ANALYSIS_COLUMNS = ['file', 'w_r', 'r_wheel', 'start_time', 'end_time', 'samples', 'duration',
+                    'mean_vel_x', 'std_vel_x', 'min_vel_x', 'max_vel_x', 'slip', 'effective_radius',
+                    'mean_vel_body_x', 'body_slip', 'heading_change', 'error']
+
+
+def chronosim_figure_names(file_path):
+    stem = figure_stem(file_path)
+    return [f"{stem}_position_torque", f"{stem}_velocity"]
+
+
+def load_chronosim_data(file_path):
+    """
+    Load the plotted Chronosim columns once for both plotting and analysis.
+
+    Columns are float32 to halve memory, except velX which stays float64 so the
+    slip computed from it matches analyze_chronosim_data exactly.
+    """
+    dtype = {column: np.float32 for column in CHRONO_PLOT_COLUMNS}
+    dtype['velX'] = np.float64
+    return load_columns(file_path, columns=CHRONO_PLOT_COLUMNS, names=CHRONO_SCHEMA, dtype=dtype)
+
+
+def plot_chronosim_data(file_path, data=None):
+    """Plot Chronosim data from a CSV file (or from data already returned by load_chronosim_data)."""
+    import matplotlib.pyplot as plt
+
+    figure_names = chronosim_figure_names(file_path)
+    if figures_are_current(figure_names, [file_path]):
+        print(f"Figures for {file_path} are up to date, skipping")
+        return
+
+    if data is None:
+        data = load_chronosim_data(file_path)
 
     # Create the first figure with two subplots: Position and Torque
     fig1, (ax1, ax2) = plt.subplots(2, 1, sharex=True, figsize=(10, 8))
 
     # Position vs Time
-    ax1.plot(data['t'], data[['posX', 'posY', 'posZ']])
+    plot_series(ax1, data['t'], data[['posX', 'posY', 'posZ']])
     ax1.set_title("Position vs Time")
     ax1.set_ylabel("Position (m)")
     ax1.legend(["posX", "posY", "posZ"], loc="lower right")
     ax1.grid()
 
     # Torque vs Time
-    ax2.plot(data['t'], data[['torqueLF', 'torqueRF', 'torqueLB', 'torqueRB']])
+    plot_series(ax2, data['t'], data[['torqueLF', 'torqueRF', 'torqueLB', 'torqueRB']])
     ax2.set_title("Wheel Torques vs Time")
     ax2.set_ylabel("Torque (N*m)")
     ax2.legend(["lf", "rf", "lb", "rb"], loc="lower right")
@@ -35,13 +80,13 @@ def plot_chronosim_data(file_path):
 
     plt.xlabel("Time (s)")
     plt.tight_layout()
-    plt.show()
+    finish_figure(fig1, figure_names[0], [file_path])
 
     # Create the second figure for Velocity
     fig2, ax3 = plt.subplots(figsize=(12, 8))
 
     # Velocity vs Time
-    ax3.plot(data['t'], data[['velX', 'velY', 'velZ']])
+    plot_series(ax3, data['t'], data[['velX', 'velY', 'velZ']])
     ax3.set_title("Velocity vs Time")
     ax3.set_ylabel("Velocity (m/s)")
     ax3.legend(["velX", "velY", "velZ"], loc="upper right")
@@ -50,20 +95,155 @@ def plot_chronosim_data(file_path):
 
     plt.xlabel("Time (s)")
     plt.tight_layout()
-    plt.show()
+    finish_figure(fig2, figure_names[1], [file_path])
 
 def analyze_chronosim_data(file_path, start_time=1, w_r=0.2, r_wheel=0.09):
     """Analyze Chronosim data to calculate slip and effective radius."""
-    data = pd.read_csv(file_path)
-    data.columns = [
-        't', 'posX', 'posY', 'posZ', 'velX', 'velY', 'velZ', 
-        'quatE0', 'quatE1', 'quatE2', 'quatE3', 
-        'torqueLF', 'torqueRF', 'torqueLB', 'torqueRB', 'slip'
-    ]
+    row = analyze_chronosim_run(file_path, start_time, w_r=w_r, r_wheel=r_wheel)
+    return row['slip'], row['effective_radius']
+
+
+def chronosim_window_stats(t, vel_x, start_time=1, end_time=None, w_r=0.2, r_wheel=0.09):
+    """
+    Slip, effective radius and velX statistics over the window [start_time, end_time].
+
+    Parameters:
+        t (np.ndarray): Sorted sample times.
+        vel_x (np.ndarray): Forward velocity samples.
+        end_time (float): End of the window; None runs to the end of the data.
+
+    Returns:
+        dict: samples, duration, mean/std/min/max of velX, slip (%) and effective_radius.
+    """
+    start = np.searchsorted(t, start_time, side='left')
+    stop = len(t) if end_time is None else np.searchsorted(t, end_time, side='right')
+    window = np.asarray(vel_x[start:stop], dtype=np.float64)
+    if len(window) == 0:
+        raise ValueError(f"No samples between t={start_time} and t={end_time}")
 
     # Slip Calculations
-    start_id = data[data['t'] >= start_time].index[0]
-    mean_vel_x = data['velX'].loc[start_id:].mean()
+    mean_vel_x = float(np.mean(window))
+    expected_velocity = w_r * r_wheel
+    return {
+        'samples': len(window),
+        'duration': float(t[stop - 1] - t[start]),
+        'mean_vel_x': mean_vel_x,
+        'std_vel_x': float(np.std(window)),
+        'min_vel_x': float(np.min(window)),
+        'max_vel_x': float(np.max(window)),
+        'slip': (1 - mean_vel_x / expected_velocity) * 100,
+        'effective_radius': mean_vel_x / w_r,
+    }
+
+
+def analyze_chronosim_run(file_path, start_time=1, end_time=None, w_r=0.2, r_wheel=0.09, plot=False,
+                          body_frame=False):
+    """
+    One row of the Chronosim analysis table (see analyze_chronosim_runs).
+
+    With plot=True the file is parsed once and the same columns are plotted and
+    analyzed; otherwise only velX is opened (memory-mapped when cached).
+    With body_frame=True the slip is also computed from the forward velocity in the
+    rover's body frame (see kinematics.py), which stays correct when the rover yaws.
+    """
+    if plot and not figures_are_current(chronosim_figure_names(file_path), [file_path]):
+        data = load_chronosim_data(file_path)
+        plot_chronosim_data(file_path, data)
+        stats = _chronosim_run_stats(file_path, data['t'].to_numpy(), data['velX'].to_numpy(),
+                                     start_time, end_time, w_r, r_wheel, body_frame)
+    else:
+        stats = chronosim_run_stats(file_path, start_time, end_time, w_r, r_wheel, body_frame)
+    return {'file': file_path, 'w_r': w_r, 'r_wheel': r_wheel, 'start_time': start_time,
+            'end_time': end_time, **stats, 'error': None}
+
+
+@memoize("file_path")
+def chronosim_run_stats(file_path, start_time=1, end_time=None, w_r=0.2, r_wheel=0.09, body_frame=False):
+    """
+    Window statistics of a Chronosim run (see analyze_chronosim_run).
+
+    Only velX is opened (memory-mapped when cached). Memoized on the file content and
+    the arguments, so repeated analyses of an unchanged run return immediately.
+    """
+    store = SeriesStore.open(file_path, ['velX'], names=CHRONO_SCHEMA)
+    return _chronosim_run_stats(file_path, store.t, store['velX'], start_time, end_time, w_r, r_wheel, body_frame)
+
+
+def _chronosim_run_stats(file_path, t, vel_x, start_time, end_time, w_r, r_wheel, body_frame):
+    with stage("reduce", file_path, rows=len(t)):
+        stats = chronosim_window_stats(t, vel_x, start_time, end_time, w_r, r_wheel)
+
+    if body_frame:
+        body = body_kinematics(file_path, CHRONO_SCHEMA)
+        with stage("reduce", file_path, rows=len(body['t'])):
+            body_stats = chronosim_window_stats(body['t'], body['vel_body_x'], start_time, end_time, w_r, r_wheel)
+            start = np.searchsorted(body['t'], start_time, side='left')
+            stop = len(body['t']) if end_time is None else np.searchsorted(body['t'], end_time, side='right')
+            heading_change = float(np.degrees(body['heading'][stop - 1] - body['heading'][start]))
+        stats.update(mean_vel_body_x=body_stats['mean_vel_x'], body_slip=body_stats['slip'], heading_change=heading_change)
+    return stats
+
+
+def _analyze_chronosim_item(item):
+    """analyze_chronosim_run on an argument tuple (top-level so worker processes can run it)."""
+    return analyze_chronosim_run(*item)
+
+
+def analyze_chronosim_runs(file_paths, w_r=0.2, r_wheel=0.09, start_time=1, end_time=None, workers=1, plot=False,
+                           body_frame=False):
+    """
+    Slip, effective radius and window statistics of many Chronosim runs as one table.
+
+    Parameters:
+        file_paths (list): Chronosim CSV files.
+        w_r (float or list): Wheel angular velocity (rad/s), one value or one per run.
+        r_wheel (float or list): Wheel radius (m), one value or one per run.
+        start_time, end_time (float): Analysis window (s); end_time None runs to the end.
+        workers (int): Number of worker processes.
+        plot (bool): Also plot each run from the same parsed data. Interactive plots
+            are drawn serially; exported figures render in the workers.
+        body_frame (bool): Add the body-frame slip and the heading change (degrees) over
+            the window, derived from the quaternion columns.
+
+    Returns:
+        pd.DataFrame: One row per file, in input order, with ANALYSIS_COLUMNS. A run
+        that fails has NaN values and its message in the error column.
+    """
+    import pandas as pd
+
+    file_paths = list(file_paths)
+    w_rs = np.broadcast_to(np.asarray(w_r, dtype=np.float64), (len(file_paths),))
+    r_wheels = np.broadcast_to(np.asarray(r_wheel, dtype=np.float64), (len(file_paths),))
+    if plot and not exporting():
+        workers = 1
+
+    items = [(path, start_time, end_time, float(w), float(r), plot, body_frame)
+             for path, w, r in zip(file_paths, w_rs, r_wheels)]
+    rows = []
+    for item, row, error in render_in_parallel(
+        _analyze_chronosim_item, items, workers, init_worker, (cache_settings(), downsample_settings(), memo_settings())
+    ):
+        if error is not None:
+            row = {'file': item[0], 'w_r': item[3], 'r_wheel': item[4], 'start_time': start_time,
+                   'end_time': end_time, 'error': str(error)}
+        rows.append(row)
+    return pd.DataFrame(rows, columns=ANALYSIS_COLUMNS)
+
+
+def analyze_chronosim_windows(file_path, windows, w_r=0.2, r_wheel=0.09):
+    """
+    Slip and effective radius of a Chronosim run for many analysis windows at once.
+
+    Parameters:
+        file_path (str): Path to the Chronosim CSV file.
+        windows (np.ndarray): (n_windows, 2) array of [start, end] times, e.g. from window_grid.
+
+    Returns:
+        tuple: (slip array in %, effective radius array), one entry per window.
+    """
+    store = SeriesStore.open(file_path, ['velX'], names=CHRONO_SCHEMA)
+    with stage("reduce", file_path, rows=len(store)):
+        mean_vel_x = window_means(store.t, store['velX'], windows)
     expected_velocity = w_r * r_wheel
     slip = (1 - mean_vel_x / expected_velocity) * 100
     effective_radius = mean_vel_x / w_r
@@ -71,38 +251,46 @@ def analyze_chronosim_data(file_path, start_time=1, w_r=0.2, r_wheel=0.09):
     return slip, effective_radius
 
 
+def init_worker(cache, downsampling, memo=None):
+    """Process pool initializer carrying the cache, downsampling and memoization settings."""
+    init_worker_cache(cache)
+    init_worker_downsampling(downsampling)
+    if memo is not None:
+        init_worker_memo(memo)
+
+
 #  drawbarplotter.py 
-def plot_terramule_data():
+def plot_terramule_data(registry_path=DEFAULT_REGISTRY_PATH):
     """Plot Terramule experimental data."""
-    sand_data = np.genfromtxt("TerramuleData/Sand.csv", delimiter=",", skip_header=1, names=["slip", "drawbar"])
-    fillite_data = np.genfromtxt("TerramuleData/Fillite.csv", delimiter=",", skip_header=1, names=["slip", "drawbar"])
-    plt.plot(fillite_data["slip"], fillite_data["drawbar"], label="PHY-TERRA-FILLITE")
-    plt.plot(sand_data["slip"], sand_data["drawbar"], label="PHY-TERRA-SAND")
+    import matplotlib.pyplot as plt
 
+    registry = load_registry(registry_path)
+    registry.plot(plt.gca(), registry.names(kind="physical"))
 
-def plot_drawbar_data():
-    """Plot drawbar coefficient data."""
-    plt.rcParams.update({'font.size': 14})
-    plt.figure(figsize=(6.5, 6.5))
 
-    plot_terramule_data()
+def plot_drawbar_data(registry_path=DEFAULT_REGISTRY_PATH, kinds=None):
+    """
+    Plot drawbar coefficient data.
 
-    # Mass-adjusted terramule
-    sim_terra_b = np.array([[-11, 0], [4, 0.3], [19, 0.5], [30, 0.6], [37, 0.7]])
-    plt.plot(sim_terra_b[:, 0] + 11, sim_terra_b[:, 1], marker=".", linestyle="--", label="SIM-TERRA-GRC1, Adjusted")
+    The reference curves (Terramule measurements, adjusted simulations, experiments and
+    the results of past batch_process sweeps) come from the reference curve registry.
 
-    # Moonranger, Full Mass, Earth
-    sim_mr_earth = np.array([[15.68, 0], [15.69, 0.0125], [18.08, 0.025], [21.33, 0.0375], [26.54, 0.05], [29.50, 0.1], [32.75, 0.15], [39.74, 0.20], [45.48, 0.25], [46.90, 0.3], [58.34, 0.5]])
-    plt.plot(sim_mr_earth[:, 0] - 15.68, sim_mr_earth[:, 1], marker=".", linestyle="--", label="SIM-MR-EARTH-GRC1, Adjusted")
+    Parameters:
+        registry_path (str): Registry file, built from the built-in curves on first use.
+        kinds (list): Only draw curves of these kinds (physical, simulation, experiment, batch).
+    """
+    import matplotlib.pyplot as plt
 
-    # Moonranger, Full Mass, Moon
-    sim_mr_moon = np.array([[-2.86, 0], [0.82, 0.05], [5.35, 0.1], [8.86, 0.15], [17.42, 0.2], [24.24, 0.25], [28.10, 0.3], [33.3, 0.4], [48.77, 0.5]])
-    plt.plot(sim_mr_moon[:, 0] + 2.86, sim_mr_moon[:, 1], marker=".", linestyle="--", label="SIM-MR-MOON-GRC1, Adjusted")
+    registry = load_registry(registry_path)
+    names = [meta["name"] for meta in registry.metadata if kinds is None or meta.get("kind") in kinds]
+    if figures_are_current(["drawbarplot"], [registry_path], params=names):
+        print("Drawbar figure is up to date, skipping")
+        return
 
-    # Moonranger, Full Mass, Earth, Single Wheel, Experimental
-    exp_mr_earth = np.array([[-0.01377441834, -0.02065071089], [0.04254638267, 0.06378585476], [0.09886718369, 0.126498084], [0.1551879847, 0.1628421714], [0.2115087857, 0.1764346278], [0.2678295868, 0.194016305]])
-    error = np.fliplr([[0.003275811, 0.005570809, 0.002379257, 0.004441608, 0.003802956, 0.002151173], [0.00297384, 0.006661601, 0.002437128, 0.007362803, 0.006234711, 0.00191919]])
-    plt.errorbar(exp_mr_earth[:, 0] * 100, exp_mr_earth[:, 1], yerr=error, marker=".", linestyle="-", label="EXP-MR-EARTH-BEST90, Adjusted")
+    plt.rcParams.update({'font.size': 14})
+    fig = plt.figure(figsize=(6.5, 6.5))
+
+    registry.plot(plt.gca(), names)
 
     plt.xlabel("Slip (%)")
     plt.ylabel("Drawbar Coefficient")
@@ -112,8 +300,9 @@ def plot_drawbar_data():
     plt.legend()
     plt.grid()
     plt.tight_layout()
-    plt.savefig("drawbarplot.png")
-    plt.show()
+    if not exporting():
+        plt.savefig("drawbarplot.png")
+    finish_figure(fig, "drawbarplot", [registry_path], params=names)
 
 
 #  singlewheelplotter.py 
@@ -124,187 +313,831 @@ def plot_single_wheel_data(file_path):
     Parameters:
         file_path (str): Path to the CSV file containing the experimental data.
     """
+    import matplotlib.pyplot as plt
+
+    figure_name = f"{figure_stem(file_path)}_single_wheel"
+    if figures_are_current([figure_name], [file_path]):
+        print(f"Figure for {file_path} is up to date, skipping")
+        return
+
     # Load data
-    data = pd.read_csv(file_path)
-    data.columns = [
-        't', 'f_x', 'f_y', 'f_z', 'd_c', 'v_max', 
-        'pos_x', 'pos_y', 'pos_z', 
-        'oriq_x', 'oriq_y', 'oriq_z', 'oriq_w', 
-        'vel_x', 'vel_y', 'vel_z'
-    ]
+    data = load_columns(
+        file_path,
+        columns=['t', 'f_x', 'f_y', 'f_z', 'd_c', 'v_max'],
+        names=SINGLE_WHEEL_SCHEMA,
+        dtype=np.float32,
+    )
 
     # Create subplots
     fig, axs = plt.subplots(3, 1, figsize=(10, 12), sharex=True)
     fig.suptitle("Single Wheel Experimental Data", fontsize=16)
 
     # Forces vs Time
-    axs[0].plot(data['t'], data[['f_x', 'f_y', 'f_z']])
+    plot_series(axs[0], data['t'], data[['f_x', 'f_y', 'f_z']])
     axs[0].set_title("Forces vs Time")
     axs[0].set_ylabel("Force (N)")
     axs[0].legend(["f_x", "f_y", "f_z"], loc="upper right")
     axs[0].grid()
 
     # Drawbar Coefficient vs Time
-    axs[1].plot(data['t'], data['d_c'])
+    plot_series(axs[1], data['t'], data['d_c'])
     axs[1].set_title("Drawbar Coefficient vs Time")
     axs[1].set_ylabel("D_c")
     axs[1].grid()
     axs[1].set_ylim(-0.5, 0.5)
 
     # V_max vs Time
-    axs[2].plot(data['t'], data['v_max'])
+    plot_series(axs[2], data['t'], data['v_max'])
     axs[2].set_title("V_max vs Time")
     axs[2].set_ylabel("V_max (m/s)")
     axs[2].set_xlabel("Time (s)")
     axs[2].grid()
-    
-    plt.show()
+
+    finish_figure(fig, figure_name, [file_path])
 
 #  starttimetesting.py 
-def batch_process_data(main_folder, output_directory="SimulatedData", start_time=10, end_time=20, save_output=False):
-    """
-    Process batch data from a main folder containing multiple wheel test subfolders.
-    Each subfolder should contain a params.json and output.csv file.
-    """
-    print(f"Starting batch processing for main folder: {main_folder}")
-    print(f"Output directory: {output_directory}")
-    print(f"Time range for analysis: {start_time} to {end_time} seconds")
-    print(f"Save output: {save_output}")
+# Files batch_process keeps in a sweep folder next to its run subfolders
+SWEEP_STATE_FILES = {INDEX_FILE_NAME, QUEUE_FILE_NAME}
+
+# Files of a wheel test subfolder that its results are computed from
+SUBFOLDER_FILES = ("params.json", "output.csv")
 
-    # Create output directory if it doesn't exist
-    if save_output and not os.path.exists(output_directory):
-        print(f"Creating output directory: {output_directory}")
-        os.makedirs(output_directory)
-    elif save_output:
-        print(f"Output directory already exists: {output_directory}")
 
-    all_slip_drawbar = []
+def list_subfolders(main_folder):
+    """
+    Return the sorted run subfolders of a sweep folder.
 
-    # Iterate through each subfolder in the main folder
+    Plain files are skipped; only unexpected ones are reported, not the results index
+    and work queue kept in the folder (or their SQLite journals).
+    """
+    subdir_paths = []
     for subdir in sorted(os.listdir(main_folder)):
         subdir_path = os.path.join(main_folder, subdir)
-        print(f"\nProcessing subfolder: {subdir_path}")
 
         # Skip if it's not a directory
         if not os.path.isdir(subdir_path):
-            print(f"Skipping non-directory: {subdir_path}")
+            if subdir.split("-")[0] not in SWEEP_STATE_FILES:
+                print(f"Skipping non-directory: {subdir_path}")
             continue
+        subdir_paths.append(subdir_path)
+    return subdir_paths
 
-        # Check if params.json and output.csv exist
-        params_path = os.path.join(subdir_path, "params.json")
-        output_csv_path = os.path.join(subdir_path, "output.csv")
 
-        if not os.path.exists(params_path):
-            print(f"Error: {params_path} does not exist")
-            continue
-        if not os.path.exists(output_csv_path):
-            print(f"Error: {output_csv_path} does not exist")
-            continue
+def load_subfolder(subdir_path):
+    """
+    Check a wheel test subfolder and load its slip value.
+
+    Returns:
+        tuple: (slip, path to output.csv)
+    """
+    # Check if params.json and output.csv exist
+    params_path = os.path.join(subdir_path, "params.json")
+    output_csv_path = os.path.join(subdir_path, "output.csv")
 
-        # Load slip value from params.json
-        with open(params_path) as params_fp:
-            params = json.load(params_fp)
-            slip = float(params["slip"])
-            print(f"Loaded slip value: {slip} from {params_path}")
+    if not os.path.exists(params_path):
+        raise FileNotFoundError(f"{params_path} does not exist")
+    if not os.path.exists(output_csv_path):
+        raise FileNotFoundError(f"{output_csv_path} does not exist")
 
-        # Read the output data
-        print(f"Reading data from {output_csv_path}")
-        data = pd.read_csv(output_csv_path, skipinitialspace=True)
+    # Load slip value from params.json
+    with open(params_path) as params_fp:
+        params = json.load(params_fp)
+        slip = float(params["slip"])
 
-        try:
-            # Debug: Print the columns in the CSV file
-            print(f"Columns in CSV: {data.columns}")
+    return slip, output_csv_path
 
-            # Debug: Print the time range
-            print(f"Time range in CSV: min={data['t'].min()}, max={data['t'].max()}")
 
-            # Find start and end indices
-            start_id = data[data['t'] >= start_time].index[0]
-            end_id = data[data['t'] <= end_time].index[-1]
-            print(f"Time range for analysis: start={data['t'][start_id]}, end={data['t'][end_id]}")
+def map_subfolders(func, subdir_paths, workers=1, *args):
+    """
+    Apply func(subdir_path, *args) to every subfolder, serially or in a process pool.
+
+    Yields (subdir_path, result, error) in completion order; a failure in one
+    subfolder is yielded as its error instead of stopping the others.
+    """
+    if workers > 1 and len(subdir_paths) > 1:
+        # Reduce subfolders in parallel; each future carries its own failure
+        settings = (cache_settings(), downsample_settings(), memo_settings())
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=settings) as executor:
+            futures = {executor.submit(run_traced, func, subdir_path, *args): subdir_path for subdir_path in subdir_paths}
+            for future in as_completed(futures):
+                try:
+                    result, worker_events = future.result()
+                except Exception as e:
+                    yield futures[future], None, e
+                    continue
+                # Stage timings recorded in the worker join this process's trace
+                merge_events(worker_events)
+                yield futures[future], result, None
+    else:
+        for subdir_path in subdir_paths:
+            try:
+                yield subdir_path, func(subdir_path, *args), None
+            except Exception as e:
+                yield subdir_path, None, e
 
-            # Calculate mean drawbar coefficient
-            mean_d_c = data['d_c'].loc[start_id:end_id].mean()
-            print(f"Calculated mean drawbar coefficient: {mean_d_c} for slip {slip}")
 
-            # Append to slip_drawbar
-            all_slip_drawbar.append([slip, mean_d_c])
-            print(f"Updated slip_drawbar: {all_slip_drawbar}")
-        except Exception as e:
-            print(f"Error processing {subdir_path}: {e}")
+@memoize("subdir_path", files=("params.json", "output.csv"))
+def process_subfolder(subdir_path, start_time=10, end_time=20, confidence=DEFAULT_CONFIDENCE):
+    """
+    Reduce a single wheel test subfolder to its slip value and mean drawbar coefficient.
+
+    Parameters:
+        subdir_path (str): Folder containing params.json and output.csv.
+        start_time (float): Start of the analysis window (s).
+        end_time (float): End of the analysis window (s).
+        confidence (float): Level of the block-bootstrap interval of the mean (None to skip it).
+
+    Returns:
+        tuple: (slip, mean_d_c, ci_low, ci_high); the bounds are NaN when skipped or with
+        fewer than 2 defined samples in the window, the mean without any.
+        Memoized on the content of params.json and output.csv (see memoize.py).
+    """
+    slip, output_csv_path = load_subfolder(subdir_path)
+
+    # Open only the columns needed; the analysis window is found by binary search on t
+    store = SeriesStore.open(output_csv_path, ['d_c'], end_time=end_time)
+    window = store.window_slice(start_time, end_time)
+    if window.start == window.stop:
+        raise ValueError(f"No samples between t={start_time} and t={end_time}")
+
+    # Calculate mean drawbar coefficient over the defined samples (the interval sees the same ones)
+    with stage("reduce", subdir_path, rows=window.stop - window.start):
+        d_c = np.asarray(store['d_c'][window])
+        d_c = d_c[~np.isnan(d_c)]
+        mean_d_c = float(np.mean(d_c)) if len(d_c) else float("nan")
+
+    # Block bootstrap, since neighbouring samples in the window are strongly correlated
+    ci_low = ci_high = float("nan")
+    if confidence is not None:
+        with stage("stats", subdir_path, rows=len(d_c)):
+            _, ci_low, ci_high = bootstrap_ci(d_c, confidence)
+
+    return slip, mean_d_c, ci_low, ci_high
+
+
+def batch_process_data(main_folder, output_directory="SimulatedData", start_time=10, end_time=20, save_output=False, workers=1,
+                       index_path=None, confidence=DEFAULT_CONFIDENCE, registry_path=None):
+    """
+    Process batch data from a main folder containing multiple wheel test subfolders.
+    Each subfolder should contain a params.json and output.csv file.
+
+    With workers > 1 the subfolders are reduced in a process pool. Results are
+    always merged in slip order, and a failing subfolder is reported without
+    stopping the others.
+
+    Results are kept in a persistent index (index_path, by default results_index.sqlite
+    in the main folder; pass False to disable). Runs whose params.json and output.csv
+    are unchanged for this analysis window are read from the index, not recomputed.
+
+    Each run's mean carries a block-bootstrap confidence interval (see bootstrap.py) at the
+    given confidence, drawn as the error bars of the slip vs drawbar curve.
+
+    The curve is also added to the reference curve registry (registry_path, by default
+    reference_curves.npz next to TerramuleData; pass False to disable), so
+    plot_drawbar overlays it on the reference data.
+    """
+    print(f"Batch processing {main_folder}: window {start_time} to {end_time} s, {workers} worker(s)")
+
+    if index_path is None:
+        index_path = os.path.join(main_folder, INDEX_FILE_NAME)
+    index = ResultsIndex(index_path) if index_path else None
+
+    # Reuse indexed results of unchanged runs; only new or changed runs are recomputed
+    results = {}
+    fingerprints = {}
+    pending = []
+    for subdir_path in list_subfolders(main_folder):
+        cached = index.lookup(subdir_path, start_time, end_time, confidence) if index else None
+        if cached is not None:
+            results[subdir_path] = cached
+            continue
+        if index:
+            try:
+                fingerprints[subdir_path] = run_fingerprint(subdir_path)
+            except OSError:
+                pass
+        pending.append(subdir_path)
+    if index:
+        print(f"Results index {index_path}: {len(results)} up to date, {len(pending)} to compute")
+
+    # One progress line per computed run
+    for done, (subdir_path, result, error) in enumerate(
+        map_subfolders(process_subfolder, pending, workers, start_time, end_time, confidence), start=1
+    ):
+        if error is not None:
+            print(f"[{done}/{len(pending)}] Error processing {subdir_path}: {error}")
+            continue
+        slip, mean_d_c, ci_low, ci_high = result
+        results[subdir_path] = result
+        print(f"[{done}/{len(pending)}] {subdir_path}: slip {slip}, mean drawbar coefficient {mean_d_c:.4f}"
+              f" [{ci_low:.4f}, {ci_high:.4f}]")
+        # A window without defined samples has no mean to index; it is recomputed (memoized) next time
+        if index and subdir_path in fingerprints and not np.isnan(mean_d_c):
+            index.store(subdir_path, start_time, end_time, slip, mean_d_c, fingerprints[subdir_path],
+                        ci_low, ci_high, confidence)
+    if index:
+        index.close()
+
+    plot_batch_results(main_folder, results, output_directory, start_time, end_time, save_output, confidence,
+                       registry_path)
+
+
+def plot_batch_results(main_folder, results, output_directory="SimulatedData", start_time=10, end_time=20,
+                       save_output=False, confidence=DEFAULT_CONFIDENCE, registry_path=None):
+    """
+    Plot, save and register the slip vs drawbar curve of a sweep (see batch_process_data).
+
+    Parameters:
+        results (dict): subfolder path -> (slip, mean_d_c, ci_low, ci_high).
+    """
+    # Merge in deterministic slip order (ties broken by folder name)
+    all_slip_drawbar = [list(results[path]) for path in sorted(results, key=lambda path: (results[path][0], path))]
 
-    # Convert to numpy array and ensure it's 2D
-    all_slip_drawbar = np.atleast_2d(all_slip_drawbar)
-    print(f"Final slip_drawbar data: {all_slip_drawbar}")
+    # Convert to numpy array (slip, drawbar, CI low, CI high) and ensure it's 2D
+    all_slip_drawbar = np.atleast_2d(np.array(all_slip_drawbar, dtype=float))
+    print(f"{len(results)} runs in the slip vs drawbar curve")
 
     # Plot the data (only if slip_drawbar is not empty)
     if all_slip_drawbar.size > 0:
-        print("\nPlotting data")
-        plt.plot(all_slip_drawbar[:, 0], all_slip_drawbar[:, 1], marker="o", linestyle="--")
-        plt.xlabel("Slip")
-        plt.ylabel("Drawbar Coefficient")
-        plt.title("Drawbar Coefficient vs Slip")
-        plt.grid()
-        plt.show()
+        # The figure is up to date while no params.json or output.csv of the sweep changed
+        input_paths = [os.path.join(path, file_name) for path in sorted(results) for file_name in SUBFOLDER_FILES]
+        figure_params = [main_folder, start_time, end_time, confidence]
+        if figures_are_current(["slip_drawbar"], input_paths, figure_params):
+            print("Slip vs drawbar figure is up to date, skipping")
+        else:
+            import matplotlib.pyplot as plt
+
+            fig = plt.figure()
+            plt.errorbar(all_slip_drawbar[:, 0], all_slip_drawbar[:, 1], yerr=error_bars(*all_slip_drawbar[:, 1:4].T),
+                         marker="o", linestyle="--", capsize=3)
+            plt.xlabel("Slip")
+            plt.ylabel("Drawbar Coefficient")
+            plt.title("Drawbar Coefficient vs Slip")
+            plt.grid()
+            finish_figure(fig, "slip_drawbar", input_paths, figure_params)
 
         # Save output if enabled
         if save_output:
+            os.makedirs(output_directory, exist_ok=True)
             output_file = os.path.join(output_directory, "slip_drawbar.txt")
             print(f"Saving output to: {output_file}")
-            np.savetxt(output_file, all_slip_drawbar, header="Slip, Drawbar")
+            np.savetxt(output_file, all_slip_drawbar, header="Slip, Drawbar, CI low, CI high")
+
+        # Register the sweep as a reference curve (slips are fractions, the registry plots percent)
+        if registry_path is not False:
+            registry_path = registry_path or DEFAULT_REGISTRY_PATH
+            registry = load_registry(registry_path)
+            name = f"SIM-SWEEP {os.path.basename(os.path.normpath(main_folder))}, {start_time:g}-{end_time:g} s"
+            registry.add(name, all_slip_drawbar[:, 0], all_slip_drawbar[:, 1], all_slip_drawbar[:, 2],
+                         all_slip_drawbar[:, 3], kind="batch", offset=0.0, slip_scale=100.0,
+                         source=os.path.abspath(main_folder), start_time=start_time, end_time=end_time,
+                         confidence=confidence)
+            registry.save()
+            print(f"Added {name!r} to {registry_path}")
+    else:
+        print("No valid data found for plotting.")
+
+
+def run_queue_worker(main_folder, queue_path, worker, start_time=10, end_time=20, confidence=DEFAULT_CONFIDENCE,
+                     lease=DEFAULT_LEASE):
+    """
+    Claim and reduce subfolders from a shared work queue until none are left.
+
+    Each claim is reduced like in batch_process_data (process_subfolder) and its result
+    written back to the queue, so a worker killed halfway loses at most its current claim.
+
+    Returns:
+        tuple: (completed, failed) counts of this worker.
+    """
+    completed = failed = 0
+    with WorkQueue(queue_path) as queue:
+        while True:
+            subfolder = queue.claim(worker, start_time, end_time, confidence, lease)
+            if subfolder is None:
+                return completed, failed
+            subdir_path = os.path.join(main_folder, subfolder)
+            try:
+                fingerprint = run_fingerprint(subdir_path)
+                result = process_subfolder(subdir_path, start_time, end_time, confidence)
+            except Exception as e:
+                queue.fail(worker, subfolder, start_time, end_time, confidence, e)
+                print(f"{worker}: error processing {subdir_path}: {e}")
+                failed += 1
+                continue
+            if not queue.complete(worker, subfolder, start_time, end_time, confidence, result, fingerprint):
+                print(f"{worker}: claim of {subdir_path} expired, result discarded")
+                continue
+            completed += 1
+            print(f"{worker}: {subdir_path}: slip {result[0]}, mean drawbar coefficient {result[1]:.4f}")
+
+
+def run_batch_node(main_folder, start_time=10, end_time=20, confidence=DEFAULT_CONFIDENCE, workers=1, queue_path=None,
+                   lease=DEFAULT_LEASE, retry_failed=False):
+    """
+    Take part in a distributed batch_process of a sweep folder on shared storage.
+
+    Every node (and every one of its workers) enqueues the subfolders, which is a no-op
+    once they are queued, then claims and reduces them until the queue is drained. Start
+    it on as many nodes as wanted; merge_batch_results builds the curve afterwards.
+
+    Parameters:
+        queue_path (str): Queue database (default work_queue.sqlite in the main folder).
+        lease (float): Seconds after which a claim that never completed is handed out again.
+        retry_failed (bool): Make subfolders that failed earlier pending again first.
+    """
+    queue_path = queue_path or os.path.join(main_folder, QUEUE_FILE_NAME)
+    with WorkQueue(queue_path) as queue:
+        added = queue.enqueue([os.path.basename(path) for path in list_subfolders(main_folder)],
+                              start_time, end_time, confidence)
+        if retry_failed:
+            print(f"Requeued {queue.requeue_failed(start_time, end_time, confidence)} failed subfolders")
+    print(f"Work queue {queue_path}: {added} subfolders added, window {start_time} to {end_time} s, {workers} worker(s)")
+
+    names = [worker_name(index) for index in range(workers)]
+    if workers > 1:
+        # Each process claims independently; their stage timings join this process's trace
+        settings = (cache_settings(), downsample_settings(), memo_settings())
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=settings) as executor:
+            futures = [executor.submit(run_traced, run_queue_worker, main_folder, queue_path, name, start_time, end_time,
+                                       confidence, lease) for name in names]
+            counts = []
+            for future in futures:
+                result, worker_events = future.result()
+                merge_events(worker_events)
+                counts.append(result)
     else:
+        counts = [run_queue_worker(main_folder, queue_path, names[0], start_time, end_time, confidence, lease)]
+
+    with WorkQueue(queue_path) as queue:
+        progress = queue.progress(start_time, end_time, confidence)
+    print(f"This node: {sum(count[0] for count in counts)} completed, {sum(count[1] for count in counts)} failed. "
+          f"Queue: {progress['done']} done, {progress['failed']} failed, {progress['claimed']} claimed elsewhere, "
+          f"{progress['pending']} pending")
+    return progress
+
+
+def merge_batch_results(main_folder, output_directory="SimulatedData", start_time=10, end_time=20, save_output=False,
+                        confidence=DEFAULT_CONFIDENCE, queue_path=None, index_path=None, registry_path=None):
+    """
+    Build the slip vs drawbar curve of a distributed sweep from the partial results in its queue.
+
+    Completed runs are also written to the results index (see batch_process_data), so a
+    later batch_process of the same window only recomputes runs changed since.
+
+    Returns:
+        dict: Task counts per state; the curve only covers the 'done' runs.
+    """
+    queue_path = queue_path or os.path.join(main_folder, QUEUE_FILE_NAME)
+    with WorkQueue(queue_path) as queue:
+        progress = queue.progress(start_time, end_time, confidence)
+        done, failed = queue.results(start_time, end_time, confidence)
+    for subfolder, error in failed:
+        print(f"Error processing {os.path.join(main_folder, subfolder)}: {error}")
+    if progress["pending"] or progress["claimed"]:
+        print(f"Warning: {progress['pending']} subfolders pending and {progress['claimed']} claimed; "
+              "merging the completed ones only")
+
+    # SQLite stores NaN as NULL: skipped intervals come back as None
+    results = {}
+    fingerprints = {}
+    for subfolder, slip, mean_d_c, ci_low, ci_high, fingerprint in done:
+        subdir_path = os.path.join(main_folder, subfolder)
+        results[subdir_path] = tuple(np.nan if value is None else value for value in (slip, mean_d_c, ci_low, ci_high))
+        fingerprints[subdir_path] = fingerprint
+    print(f"Merging {len(results)} runs from {queue_path}")
+
+    if index_path is None:
+        index_path = os.path.join(main_folder, INDEX_FILE_NAME)
+    if index_path:
+        with ResultsIndex(index_path) as index:
+            for subdir_path, (slip, mean_d_c, ci_low, ci_high) in results.items():
+                if np.isnan(mean_d_c):
+                    continue
+                index.store(subdir_path, start_time, end_time, slip, mean_d_c, fingerprints[subdir_path],
+                            ci_low, ci_high, confidence)
+
+    plot_batch_results(main_folder, results, output_directory, start_time, end_time, save_output, confidence,
+                       registry_path)
+    return progress
+
+
+def query_results_index(index_path, start_time=None, end_time=None, main_folder=None):
+    """Print and plot slip vs drawbar results of past sweeps straight from a results index."""
+    import matplotlib.pyplot as plt
+
+    with ResultsIndex(index_path) as index:
+        rows = index.query(start_time, end_time, main_folder)
+    if not rows:
+        print("No indexed results match.")
+        return rows
+
+    # One curve per analysis window
+    fig = plt.figure()
+    windows = sorted({(row[1], row[2]) for row in rows})
+    for window in windows:
+        selected = [row for row in rows if (row[1], row[2]) == window]
+        for subfolder, _, _, slip, mean_d_c, _, _ in selected:
+            print(f"{subfolder} [{window[0]:g}, {window[1]:g}] s: slip {slip}, mean drawbar coefficient {mean_d_c}")
+        curve = np.array([row[3:7] for row in selected], dtype=float)
+        plt.errorbar(curve[:, 0], curve[:, 1], yerr=error_bars(*curve[:, 1:].T), marker="o", linestyle="--",
+                     capsize=3, label=f"{window[0]:g}-{window[1]:g} s")
+    plt.xlabel("Slip")
+    plt.ylabel("Drawbar Coefficient")
+    plt.title("Drawbar Coefficient vs Slip (indexed results)")
+    plt.legend(title="Analysis window")
+    plt.grid()
+    finish_figure(fig, "indexed_slip_drawbar", [index_path], params=[start_time, end_time, main_folder])
+    return rows
+
+
+def sweep_subfolder(subdir_path, windows):
+    """
+    Mean drawbar coefficient of one wheel test subfolder for every analysis window.
+
+    Returns:
+        tuple: (slip, array of mean d_c per window)
+    """
+    slip, output_csv_path = load_subfolder(subdir_path)
+    store = SeriesStore.open(output_csv_path, ['d_c'])
+    with stage("reduce", subdir_path, rows=len(store)):
+        return slip, window_means(store.t, store['d_c'], windows)
+
+
+def plot_start_time_testing(main_folder, start_times, end_times, workers=1, output_file=None):
+    """
+    Sweep a grid of analysis windows over every run of a batch folder.
+
+    Each output.csv is read once and all windowed means come from prefix sums,
+    instead of re-running batch_process_data once per window.
+
+    Parameters:
+        main_folder (str): Folder of wheel test subfolders (see batch_process_data).
+        start_times (list): Candidate window start times (s).
+        end_times (list): Candidate window end times (s).
+        workers (int): Number of worker processes.
+        output_file (str): Optional .npz file to save slips, windows and means to.
+
+    Returns:
+        tuple: (slips, windows, means) where means has shape (runs, windows).
+    """
+    windows = window_grid(start_times, end_times)
+    if len(windows) == 0:
+        print("No windows with end_time > start_time.")
+        return np.empty(0), windows, np.empty((0, 0))
+    print(f"Sweeping {len(windows)} windows over {main_folder}")
+
+    results = {}
+    for subdir_path, result, error in map_subfolders(sweep_subfolder, list_subfolders(main_folder), workers, windows):
+        if error is not None:
+            print(f"Error processing {subdir_path}: {error}")
+            continue
+        results[subdir_path] = result
+
+    # Runs in deterministic slip order
+    ordered = sorted(results, key=lambda path: (results[path][0], path))
+    slips = np.array([results[path][0] for path in ordered])
+    means = np.array([results[path][1] for path in ordered]).reshape(len(ordered), len(windows))
+
+    if output_file:
+        print(f"Saving sweep to: {output_file}")
+        np.savez(output_file, slips=slips, windows=windows, means=means)
+
+    if len(slips) == 0:
+        print("No valid data found for plotting.")
+        return slips, windows, means
+
+    # Heatmap of mean drawbar coefficient, runs x windows
+    input_paths = [os.path.join(path, file_name) for path in ordered for file_name in SUBFOLDER_FILES]
+    plot_window_heatmap(means, windows, [f"{slip:g}" for slip in slips], "Slip", "Drawbar Coefficient",
+                        "Mean Drawbar Coefficient per Analysis Window", "window_sweep",
+                        input_paths, params=[main_folder, windows.tolist()])
+
+    return slips, windows, means
+
+
+def plot_window_heatmap(matrix, windows, row_labels, ylabel, value_label, title, figure_name, input_paths=(), params=None):
+    """Heatmap of a (runs x windows) sweep result, one labelled row per run (skipped while up to date)."""
+    if figures_are_current([figure_name], input_paths, params):
+        print(f"Figure {figure_name} is up to date, skipping")
+        return
+
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(max(6, 0.4 * len(windows) + 2), max(4, 0.3 * len(row_labels) + 2)))
+    image = ax.imshow(matrix, aspect="auto", cmap="viridis", interpolation="nearest")
+    ax.set_xticks(np.arange(len(windows)))
+    ax.set_xticklabels(window_labels(windows), rotation=90)
+    ax.set_yticks(np.arange(len(row_labels)))
+    ax.set_yticklabels(row_labels)
+    ax.set_xlabel("Analysis window (s)")
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    fig.colorbar(image, ax=ax, label=value_label)
+    plt.tight_layout()
+    finish_figure(fig, figure_name, input_paths, params)
+
+
+def _chronosim_windows_item(item):
+    """analyze_chronosim_windows on an argument tuple (top-level so worker processes can run it)."""
+    return analyze_chronosim_windows(*item)
+
+
+def plot_slip_window_sweep(file_paths, start_times, end_times, w_r=0.2, r_wheel=0.09, workers=1, output_file=None):
+    """
+    Sweep a grid of analysis windows over Chronosim runs for their slip.
+
+    Each run is read once and the slip of every window comes from prefix sums of velX
+    (analyze_chronosim_windows), like the drawbar sweep of plot_start_time_testing.
+
+    Parameters:
+        file_paths (list): Chronosim CSV files.
+        start_times (list): Candidate window start times (s).
+        end_times (list): Candidate window end times (s).
+        w_r, r_wheel (float): Wheel angular velocity (rad/s) and radius (m).
+        workers (int): Number of worker processes.
+        output_file (str): Optional .npz file to save files, windows, slip and effective radius to.
+
+    Returns:
+        tuple: (windows, slip, effective_radius) where slip and effective_radius (%, m)
+        have shape (runs, windows); runs that fail are left out.
+    """
+    windows = window_grid(start_times, end_times)
+    if len(windows) == 0:
+        print("No windows with end_time > start_time.")
+        return windows, np.empty((0, 0)), np.empty((0, 0))
+    print(f"Sweeping {len(windows)} windows over {len(file_paths)} Chronosim runs")
+
+    done, slips, radii = [], [], []
+    items = [(path, windows, w_r, r_wheel) for path in file_paths]
+    for item, result, error in render_in_parallel(
+        _chronosim_windows_item, items, workers, init_worker, (cache_settings(), downsample_settings(), memo_settings())
+    ):
+        if error is not None:
+            print(f"Error processing {item[0]}: {error}")
+            continue
+        done.append(item[0])
+        slips.append(result[0])
+        radii.append(result[1])
+    slip = np.array(slips).reshape(len(done), len(windows))
+    effective_radius = np.array(radii).reshape(len(done), len(windows))
+
+    if output_file:
+        print(f"Saving sweep to: {output_file}")
+        np.savez(output_file, files=np.array(done), windows=windows, slip=slip, effective_radius=effective_radius)
+
+    if len(done) == 0:
         print("No valid data found for plotting.")
+        return windows, slip, effective_radius
+
+    # Heatmap of slip, runs x windows
+    plot_window_heatmap(slip, windows, [os.path.basename(path) for path in done], "Run", "Slip (%)",
+                        "Slip per Analysis Window", "slip_window_sweep", done, [windows.tolist(), w_r, r_wheel])
+    return windows, slip, effective_radius
+
+
+def parse_float_list(value):
+    """Parse a comma separated list of floats, e.g. '5,10,15'."""
+    return [float(item) for item in value.split(",") if item]
+
+
+def pop_option(argv, flag, default=None, cast=str):
+    """Remove `flag VALUE` from argv (in place) and return the cast value."""
+    if flag not in argv:
+        return default
+    index = argv.index(flag)
+    if index + 1 >= len(argv):
+        print(f"Missing value for {flag}")
+        sys.exit(1)
+    value = argv[index + 1]
+    del argv[index:index + 2]
+    return cast(value)
+
+
+def pop_flag(argv, flag):
+    """Remove a boolean flag from argv (in place) and return whether it was present."""
+    if flag not in argv:
+        return False
+    argv.remove(flag)
+    return True
+
+
+# Arguments of every functionality, in the order they are listed
+FUNCTIONALITY_USAGES = {
+    "plot_chronosim": "<file_path> [<file_path> ...] | <file_path> --follow [--refresh SECONDS]",
+    "plot_drawbar": "[--registry PATH] [--kinds physical,simulation,experiment,batch]",
+    "plot_single_wheel": "<file_path> [<file_path> ...] | <file_path> --follow [--refresh SECONDS]",
+    "plot_start_time_testing": "<main_folder> [--starts 5,10,15] [--ends 20,25,30] [--save sweep.npz] [--workers N]",
+    "batch_process": ("<main_folder> [output_directory] [start_time] [end_time] [save_output] [--workers N] "
+                      "[--index PATH | --no-index] [--confidence 0.95] [--registry PATH | --no-registry]"),
+    "query_index": "<index_path> [start_time] [end_time]",
+    "analyze_chronosim": ("<file_path> [<file_path> ...] [--start-time S] [--end-time S] [--w-r W[,W...]] "
+                          "[--r-wheel R[,R...]] [--body-frame] [--save table.csv] [--workers N] (no plotting)"),
+    "batch_node": ("<main_folder> [start_time] [end_time] [--workers N] [--queue PATH] [--lease SECONDS] "
+                   "[--retry-failed] [--confidence 0.95]"),
+    "batch_merge": ("<main_folder> [output_directory] [start_time] [end_time] [save_output] [--queue PATH] "
+                    "[--index PATH | --no-index] [--confidence 0.95] [--registry PATH | --no-registry]"),
+    "plot_slip_window_sweep": ("<file_path> [<file_path> ...] [--starts 5,10,15] [--ends 20,25,30] [--w-r 0.2] "
+                               "[--r-wheel 0.09] [--save sweep.npz] [--workers N]"),
+}
+
+# Options every functionality accepts
+COMMON_OPTIONS = [
+    "Figure options: --out-dir DIR [--format png|svg|pdf] [--force-export] (headless export)",
+    "                --no-downsample | --downsample minmax|lttb [--max-points N]",
+    "Results: --no-cache (re-parse CSVs), --rebuild-cache (re-parse once and refresh), --cache-max-bytes N, --no-memo (recompute memoized analysis results)",
+    "Instrumentation: --trace trace.json|trace.csv (per-stage timings) [--profile] (cProfile + tracemalloc)",
+]
+
+
+def functionality_usage(functionality, prog=None):
+    """Usage line of one functionality; prog replaces 'python combined_plotter.py <functionality>'."""
+    prog = prog or f"python combined_plotter.py {functionality}"
+    return f"Usage: {prog} {FUNCTIONALITY_USAGES[functionality]}"
+
+
+def print_functionalities():
+    print("Available functionalities:")
+    for number, (functionality, arguments) in enumerate(FUNCTIONALITY_USAGES.items(), 1):
+        print(f"{number}. {functionality} {arguments}")
+
+
 #  Main 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
+def main(argv=None, prog=None):
+    """
+    Run one functionality; argv defaults to the command line arguments (without the program name).
+
+    prog replaces 'python combined_plotter.py <functionality>' in usage messages (e.g. chrono_plotter.py).
+    """
+    argv = [sys.argv[0]] + list(sys.argv[1:] if argv is None else argv)
+    if len(argv) < 2:
         print("Usage: python combined_plotter.py <functionality> [arguments]")
-        print("Available functionalities:")
-        print("1. plot_chronosim <file_path>")
-        print("2. plot_drawbar")
-        print("3. plot_single_wheel <file_path>")
-        print("4. plot_start_time_testing <directory>")
-        print("5. batch_process <main_folder> [output_directory] [start_time] [end_time] [save_output]")
+        print_functionalities()
+        print("\n".join(COMMON_OPTIONS))
         sys.exit(1)
 
-    functionality = sys.argv[1]
+    functionality = argv[1]
+    if functionality in FUNCTIONALITY_USAGES and ("-h" in argv[2:] or "--help" in argv[2:]):
+        print(functionality_usage(functionality, prog))
+        print("\n".join(COMMON_OPTIONS))
+        sys.exit(0)
+    workers = pop_option(argv, "--workers", default=1, cast=int)
+    configure_cache(enabled=not pop_flag(argv, "--no-cache"), rebuild=pop_flag(argv, "--rebuild-cache"),
+                    max_bytes=pop_option(argv, "--cache-max-bytes", cast=int))
+    configure_memo(enabled=not pop_flag(argv, "--no-memo"))
+    configure_export(
+        out_dir=pop_option(argv, "--out-dir"),
+        fmt=pop_option(argv, "--format", default="png"),
+        force=pop_flag(argv, "--force-export"),
+    )
+    configure_downsampling(
+        enabled=not pop_flag(argv, "--no-downsample"),
+        method=pop_option(argv, "--downsample", default="minmax"),
+        max_points=pop_option(argv, "--max-points", cast=int),
+    )
+    configure_instrumentation(trace_path=pop_option(argv, "--trace"), profile=pop_flag(argv, "--profile"))
+    follow = pop_flag(argv, "--follow")
+    refresh = pop_option(argv, "--refresh", default=1.0, cast=float)
+    # Figures for several files render in parallel only when exported headlessly
+    render_workers = workers if exporting() else 1
 
     if functionality == "plot_chronosim":
-        if len(sys.argv) < 3:
-            print("Usage: python combined_plotter.py plot_chronosim <file_path>")
+        if len(argv) < 3:
+            print(functionality_usage(functionality, prog))
             sys.exit(1)
-        file_path = sys.argv[2]
-        plot_chronosim_data(file_path)
-        slip, effective_radius = analyze_chronosim_data(file_path)
-        print(f"Slip: {slip:.2f}%")
-        print(f"Effective Radius: {effective_radius:.4f}")
+        file_paths = argv[2:]
+        if follow:
+            # Tail the growing output of a running simulation
+            follow_chronosim_data(file_paths[0], refresh=refresh)
+            sys.exit(0)
+        # Each file is parsed once for both its figures and its slip
+        table = analyze_chronosim_runs(file_paths, workers=workers, plot=True)
+        for row in table.itertuples():
+            if row.error is not None:
+                print(f"Error processing {row.file}: {row.error}")
+                continue
+            if len(file_paths) > 1:
+                print(f"{row.file}:")
+            print(f"Slip: {row.slip:.2f}%")
+            print(f"Effective Radius: {row.effective_radius:.4f}")
+
+    elif functionality == "analyze_chronosim":
+        if len(argv) < 3:
+            print(functionality_usage(functionality, prog))
+            sys.exit(1)
+        start_time = pop_option(argv, "--start-time", default=1, cast=float)
+        end_time = pop_option(argv, "--end-time", cast=float)
+        w_r = pop_option(argv, "--w-r", default=[0.2], cast=parse_float_list)
+        r_wheel = pop_option(argv, "--r-wheel", default=[0.09], cast=parse_float_list)
+        output_file = pop_option(argv, "--save")
+        body_frame = pop_flag(argv, "--body-frame")
+        file_paths = argv[2:]
+        for name, values in (("--w-r", w_r), ("--r-wheel", r_wheel)):
+            if len(values) not in (1, len(file_paths)):
+                print(f"{name} needs one value or one per file ({len(file_paths)})")
+                sys.exit(1)
+
+        table = analyze_chronosim_runs(file_paths, w_r, r_wheel, start_time, end_time, workers, body_frame=body_frame)
+        unused = [column for column in ('mean_vel_body_x', 'body_slip', 'heading_change', 'error') if table[column].isna().all()]
+        print(table.drop(columns=unused).to_string(index=False))
+        if output_file:
+            print(f"Saving table to: {output_file}")
+            table.to_csv(output_file, index=False)
 
     elif functionality == "plot_drawbar":
-        plot_drawbar_data()
+        registry_path = pop_option(argv, "--registry", default=DEFAULT_REGISTRY_PATH)
+        kinds = pop_option(argv, "--kinds", cast=lambda value: value.split(","))
+        plot_drawbar_data(registry_path, kinds)
 
     elif functionality == "plot_single_wheel":
-        if len(sys.argv) < 3:
-            print("Usage: python combined_plotter.py plot_single_wheel <file_path>")
+        if len(argv) < 3:
+            print(functionality_usage(functionality, prog))
+            sys.exit(1)
+        file_paths = argv[2:]
+        if follow:
+            # Tail the growing output of a running simulation
+            follow_single_wheel_data(file_paths[0], refresh=refresh)
+            sys.exit(0)
+        for file_path, _, error in render_in_parallel(
+            plot_single_wheel_data, file_paths, render_workers, init_worker, (cache_settings(), downsample_settings(), memo_settings())
+        ):
+            if error is not None:
+                print(f"Error processing {file_path}: {error}")
+
+    elif functionality == "plot_start_time_testing":
+        if len(argv) < 3:
+            print(functionality_usage(functionality, prog))
             sys.exit(1)
-        file_path = sys.argv[2]
-        plot_single_wheel_data(file_path)
+        start_times = pop_option(argv, "--starts", default=[5, 10, 15], cast=parse_float_list)
+        end_times = pop_option(argv, "--ends", default=[20, 25, 30], cast=parse_float_list)
+        output_file = pop_option(argv, "--save")
+        plot_start_time_testing(argv[2], start_times, end_times, workers, output_file)
+
+    elif functionality == "plot_slip_window_sweep":
+        if len(argv) < 3:
+            print(functionality_usage(functionality, prog))
+            sys.exit(1)
+        start_times = pop_option(argv, "--starts", default=[5, 10, 15], cast=parse_float_list)
+        end_times = pop_option(argv, "--ends", default=[20, 25, 30], cast=parse_float_list)
+        w_r = pop_option(argv, "--w-r", default=0.2, cast=float)
+        r_wheel = pop_option(argv, "--r-wheel", default=0.09, cast=float)
+        output_file = pop_option(argv, "--save")
+        plot_slip_window_sweep(argv[2:], start_times, end_times, w_r, r_wheel, workers, output_file)
 
     elif functionality == "batch_process":
-        if len(sys.argv) < 3:
-            print("Usage: python combined_plotter.py batch_process <main_folder> [output_directory] [start_time] [end_time] [save_output]")
+        if len(argv) < 3:
+            print(functionality_usage(functionality, prog))
             sys.exit(1)
-        main_folder = sys.argv[2]
-        output_directory = sys.argv[3] if len(sys.argv) > 3 else "SimulatedData"
-        start_time = float(sys.argv[4]) if len(sys.argv) > 4 else 10
-        end_time = float(sys.argv[5]) if len(sys.argv) > 5 else 20
-        save_output = sys.argv[6].lower() == "true" if len(sys.argv) > 6 else False
-        batch_process_data(main_folder, output_directory, start_time, end_time, save_output)
+        index_path = False if pop_flag(argv, "--no-index") else pop_option(argv, "--index")
+        confidence = pop_option(argv, "--confidence", default=DEFAULT_CONFIDENCE, cast=float)
+        registry_path = False if pop_flag(argv, "--no-registry") else pop_option(argv, "--registry")
+        main_folder = argv[2]
+        output_directory = argv[3] if len(argv) > 3 else "SimulatedData"
+        start_time = float(argv[4]) if len(argv) > 4 else 10
+        end_time = float(argv[5]) if len(argv) > 5 else 20
+        save_output = argv[6].lower() == "true" if len(argv) > 6 else False
+        batch_process_data(main_folder, output_directory, start_time, end_time, save_output, workers, index_path,
+                           confidence or None, registry_path)
+
+    elif functionality == "batch_node":
+        if len(argv) < 3:
+            print(functionality_usage(functionality, prog))
+            sys.exit(1)
+        queue_path = pop_option(argv, "--queue")
+        lease = pop_option(argv, "--lease", default=DEFAULT_LEASE, cast=float)
+        retry_failed = pop_flag(argv, "--retry-failed")
+        confidence = pop_option(argv, "--confidence", default=DEFAULT_CONFIDENCE, cast=float)
+        start_time = float(argv[3]) if len(argv) > 3 else 10
+        end_time = float(argv[4]) if len(argv) > 4 else 20
+        run_batch_node(argv[2], start_time, end_time, confidence or None, workers, queue_path, lease, retry_failed)
+
+    elif functionality == "batch_merge":
+        if len(argv) < 3:
+            print(functionality_usage(functionality, prog))
+            sys.exit(1)
+        queue_path = pop_option(argv, "--queue")
+        index_path = False if pop_flag(argv, "--no-index") else pop_option(argv, "--index")
+        confidence = pop_option(argv, "--confidence", default=DEFAULT_CONFIDENCE, cast=float)
+        registry_path = False if pop_flag(argv, "--no-registry") else pop_option(argv, "--registry")
+        main_folder = argv[2]
+        output_directory = argv[3] if len(argv) > 3 else "SimulatedData"
+        start_time = float(argv[4]) if len(argv) > 4 else 10
+        end_time = float(argv[5]) if len(argv) > 5 else 20
+        save_output = argv[6].lower() == "true" if len(argv) > 6 else False
+        merge_batch_results(main_folder, output_directory, start_time, end_time, save_output, confidence or None,
+                            queue_path, index_path, registry_path)
+
+    elif functionality == "query_index":
+        if len(argv) < 3:
+            print(functionality_usage(functionality, prog))
+            sys.exit(1)
+        start_time = float(argv[3]) if len(argv) > 3 else None
+        end_time = float(argv[4]) if len(argv) > 4 else None
+        query_results_index(argv[2], start_time, end_time)
 
     else:
         print(f"Unknown functionality: {functionality}")
-        print("Available functionalities:")
-        print("1. plot_chronosim <file_path>")
-        print("2. plot_drawbar")
-        print("3. plot_single_wheel <file_path>")
-        print("4. batch_process <main_folder> [output_directory] [start_time] [end_time] [save_output]")
+        print_functionalities()
         sys.exit(1)
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from urllib.parse import quote
+
+import numpy as np
+
+# Cache location and size bound, overridable from the environment
+DEFAULT_CACHE_DIR = os.environ.get(
+    "CHRONO_PLOTTER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "chrono_plotter")
+)
+DEFAULT_MAX_BYTES = int(os.environ.get("CHRONO_PLOTTER_CACHE_MAX_BYTES", 4 * 1024**3))
+
+_settings = {
+    "enabled": True,
+    "rebuild": False,
+    "cache_dir": DEFAULT_CACHE_DIR,
+    "max_bytes": DEFAULT_MAX_BYTES,
+}
+
+# Cache size as last scanned plus the bytes this process has written since (None until first written)
+_tracked_bytes = None
+
+
+def configure_cache(enabled=True, rebuild=False, cache_dir=None, max_bytes=None):
+    """
+    Set the process-wide cache behaviour used by data_loader.
+
+    Parameters:
+        enabled (bool): Read and write cached columns.
+        rebuild (bool): Ignore entries written before now and re-parse every file once.
+            Columns rewritten after that (by this or any worker process given these
+            settings) are served from the cache again.
+        cache_dir (str): Directory holding the cache entries.
+        max_bytes (int): Total cache size above which least recently used entries are evicted.
+    """
+    _settings["enabled"] = enabled
+    # A rebuild is stored as its start time (ns), so worker processes share its cut-off
+    _settings["rebuild"] = time.time_ns() if rebuild is True else rebuild
+    if cache_dir is not None:
+        _settings["cache_dir"] = cache_dir
+    if max_bytes is not None:
+        _settings["max_bytes"] = max_bytes
+
+
+def cache_settings():
+    """Return the current cache settings (e.g. to pass to worker process initializers)."""
+    return dict(_settings)
+
+
+def init_worker_cache(settings):
+    """Process pool initializer applying settings returned by cache_settings()."""
+    configure_cache(**settings)
+
+
+def cache_enabled():
+    return _settings["enabled"]
+
+
+def add_cache_arguments(parser):
+    """Add the --no-cache / --rebuild-cache / --cache-max-bytes options to an argparse parser."""
+    parser.add_argument('--no-cache', action='store_true', help="Do not read or write the parsed-column cache")
+    parser.add_argument('--rebuild-cache', action='store_true', help="Re-parse input files and refresh their cache entries")
+    parser.add_argument('--cache-max-bytes', type=int, default=None,
+                        help="Cache size above which least recently used entries are evicted")
+
+
+def apply_cache_arguments(args):
+    """Configure the cache from arguments added by add_cache_arguments."""
+    configure_cache(enabled=not args.no_cache, rebuild=args.rebuild_cache, max_bytes=args.cache_max_bytes)
+
+
+def _source_key(file_path, names):
+    """Cache key for a source file: absolute path, size, mtime and the positional layout."""
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    key = json.dumps([file_path, stat.st_size, stat.st_mtime_ns, list(names) if names else None])
+    return hashlib.sha1(key.encode()).hexdigest(), file_path, stat
+
+
+def entry_dir(file_path, names=None):
+    """Return the cache directory for a source file (whether or not it exists yet)."""
+    key, _, _ = _source_key(file_path, names)
+    return os.path.join(_settings["cache_dir"], key)
+
+
+def _column_path(directory, column):
+    return os.path.join(directory, quote(column, safe="") + ".npy")
+
+
+def read_cached_columns(file_path, columns, names=None, mmap_mode=None):
+    """
+    Return cached arrays for the requested columns.
+
+    Returns:
+        tuple: (dict of column -> array for the cached columns, list of missing columns)
+    """
+    directory = entry_dir(file_path, names)
+    found, missing = {}, []
+    if not os.path.isdir(directory):
+        return found, list(columns)
+
+    for column in columns:
+        path = _column_path(directory, column)
+        # While rebuilding, only columns rewritten since the rebuild started count
+        fresh = os.path.exists(path) and (not _settings["rebuild"] or os.stat(path).st_mtime_ns >= _settings["rebuild"])
+        if fresh:
+            found[column] = np.load(path, mmap_mode=mmap_mode)
+        else:
+            missing.append(column)
+
+    # Mark the entry as recently used for eviction
+    os.utime(directory)
+    return found, missing
+
+
+def write_cached_columns(file_path, arrays, names=None):
+    """
+    Store parsed column arrays for a source file and enforce the cache size bound.
+
+    The cache directory is only scanned for eviction once the size tracked in this
+    process (a first scan plus the bytes written since) exceeds the bound.
+    """
+    global _tracked_bytes
+    key, source_path, stat = _source_key(file_path, names)
+    directory = os.path.join(_settings["cache_dir"], key)
+    os.makedirs(directory, exist_ok=True)
+
+    for column, values in arrays.items():
+        # Write to a temporary file first so concurrent readers never see partial arrays
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fp:
+            np.save(fp, np.ascontiguousarray(values))
+        os.replace(tmp_path, _column_path(directory, column))
+
+    meta = {"source": source_path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "names": list(names) if names else None}
+    with open(os.path.join(directory, "meta.json"), "w") as fp:
+        json.dump(meta, fp)
+
+    if _tracked_bytes is None:
+        _tracked_bytes = _cache_size()
+    else:
+        _tracked_bytes += sum(np.asarray(values).nbytes for values in arrays.values())
+    if _tracked_bytes > _settings["max_bytes"]:
+        evict_cache(keep=directory)
+
+
+def _entry_size(directory):
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+
+def _cache_size():
+    cache_dir = _settings["cache_dir"]
+    if not os.path.isdir(cache_dir):
+        return 0
+    return sum(_entry_size(entry.path) for entry in os.scandir(cache_dir) if entry.is_dir())
+
+
+def evict_cache(max_bytes=None, keep=None):
+    """
+    Remove least recently used entries until the cache fits in max_bytes.
+
+    Parameters:
+        max_bytes (int): Size bound; the configured bound when None.
+        keep (str): Entry directory that must not be evicted (the one just written).
+
+    Returns:
+        int: Number of entries removed.
+    """
+    global _tracked_bytes
+    max_bytes = _settings["max_bytes"] if max_bytes is None else max_bytes
+    cache_dir = _settings["cache_dir"]
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_dir():
+            entries.append((entry.stat().st_mtime, entry.path, _entry_size(entry.path)))
+    total = sum(size for _, _, size in entries)
+
+    removed = 0
+    for _, path, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and os.path.samefile(path, keep):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    _tracked_bytes = total
+    return removed
+
+
+def clear_cache():
+    """Delete every cache entry."""
+    global _tracked_bytes
+    _tracked_bytes = None
+    shutil.rmtree(_settings["cache_dir"], ignore_errors=True)
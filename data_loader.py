@@ -0,0 +1,200 @@
+import importlib.util
+import os
+
+import numpy as np
+
+from data_cache import cache_enabled, read_cached_columns, write_cached_columns
+from instrumentation import stage
+from schemas import Schema, read_header
+
+# Rows parsed per chunk when streaming up to an end time
+DEFAULT_CHUNKSIZE = 500_000
+
+# pandas is imported inside the parsing functions: opening memory-mapped cached
+# columns (SeriesStore) does not need it, which keeps analysis-only runs fast to start
+
+# Whole-file reads use the multithreaded pyarrow CSV engine when it is installed
+HAVE_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def _header_arguments(file_path, names):
+    """
+    read_csv arguments labelling the fields of file_path.
+
+    A Schema validates the header once and maps its columns by name (see schemas.py);
+    a plain names list replaces the header positionally.
+
+    Returns:
+        tuple: (read_csv keyword arguments, columns read when none are requested)
+    """
+    if isinstance(names, Schema):
+        layout = names.layout(file_path)
+        return dict(header=0 if layout.has_header else None, names=layout.labels), names.columns
+    if names is not None:
+        return dict(header=0, names=names), names
+    return {}, None
+
+
+def _column_dtypes(columns, dtype, time_column):
+    """Expand a dtype (or per-column dtype dict) to a dict, forcing float64 time."""
+    if isinstance(dtype, dict):
+        dtypes = dict(dtype)
+    else:
+        dtypes = {column: dtype for column in columns}
+    if time_column in columns:
+        dtypes[time_column] = np.float64
+    return dtypes
+
+
+def load_columns(file_path, columns=None, names=None, dtype=np.float64, end_time=None,
+                 time_column='t', chunksize=DEFAULT_CHUNKSIZE, use_cache=None):
+    """
+    Load only the requested columns of a simulation CSV with explicit dtypes.
+
+    Parameters:
+        file_path (str): Path to the CSV file.
+        columns (list): Columns to read, in the order they should be returned. All columns when None.
+        names: Schema of the file (e.g. CHRONO_SCHEMA), whose columns are mapped by header
+            name, or a list of positional column names replacing the file header.
+        dtype: dtype for the data columns, or a dict of per-column dtypes. The time column
+            is always read as float64 so long runs keep their time resolution.
+        end_time (float): When given, the file is streamed in chunks and reading stops at the
+            first row whose time is past end_time (cached columns are sliced instead).
+            Rows are assumed to be sorted by time.
+        time_column (str): Name of the time column.
+        chunksize (int): Rows per chunk when streaming.
+        use_cache (bool): Read/write the parsed-column cache (see data_cache). Follows the
+            configured cache setting when None.
+
+    Returns:
+        pd.DataFrame: The requested columns, indexed by row number in the file.
+    """
+    if use_cache is None:
+        use_cache = cache_enabled()
+    with stage("parse", file_path, source="cache" if use_cache else "csv") as event:
+        if use_cache:
+            data = _load_cached(file_path, columns, names, dtype, end_time, time_column)
+            event["bytes"] = int(data.memory_usage(index=False).sum())
+        else:
+            data = _read_csv(file_path, columns, names, dtype, end_time, time_column, chunksize)
+            event["bytes"] = os.path.getsize(file_path)
+        event["rows"] = len(data)
+    return data
+
+
+def _read_csv(file_path, columns, names, dtype, end_time, time_column, chunksize):
+    """Parse the requested columns of a CSV (see load_columns)."""
+    import pandas as pd
+
+    header_kwargs, all_columns = _header_arguments(file_path, names)
+    if columns is None and isinstance(names, Schema):
+        columns = all_columns
+    usecols = None
+    if columns is not None:
+        usecols = list(columns)
+        if end_time is not None and time_column not in usecols:
+            usecols.append(time_column)
+
+    dtype_columns = usecols if usecols is not None else all_columns
+    if dtype_columns is not None or isinstance(dtype, dict):
+        dtype = _column_dtypes(dtype_columns or [], dtype, time_column)
+
+    read_kwargs = dict(usecols=usecols, dtype=dtype, **header_kwargs)
+
+    if end_time is None:
+        # Typed, column-projected parse; pyarrow cannot skip the spaces of ", " separated files
+        if HAVE_PYARROW and not read_header(file_path)[1]:
+            data = _read_csv_arrow(file_path, usecols, dtype, header_kwargs)
+        else:
+            data = pd.read_csv(file_path, skipinitialspace=True, **read_kwargs)
+    else:
+        read_kwargs.update(skipinitialspace=True)
+        chunks = []
+        for chunk in pd.read_csv(file_path, chunksize=chunksize, **read_kwargs):
+            # Keep rows up to end_time and stop parsing once the window is passed
+            stop = np.searchsorted(chunk[time_column].to_numpy(), end_time, side='right')
+            chunks.append(chunk.iloc[:stop])
+            if stop < len(chunk):
+                break
+        data = pd.concat(chunks) if chunks else pd.DataFrame(columns=usecols or names)
+
+    if columns is not None:
+        data = data[list(columns)]
+    return data
+
+
+def _read_csv_arrow(file_path, usecols, dtype, header_kwargs):
+    """
+    Parse a CSV with the multithreaded pyarrow reader.
+
+    Column types are given up front (no inference) and unused columns are never converted.
+    """
+    import pyarrow as pa
+    from pyarrow import csv
+
+    names = header_kwargs.get("names")
+    read_options = csv.ReadOptions(
+        column_names=None if names is None else list(names),
+        skip_rows=1 if names is not None and header_kwargs.get("header") == 0 else 0,
+    )
+    column_types = {}
+    if isinstance(dtype, dict):
+        column_types = {column: pa.from_numpy_dtype(np.dtype(column_dtype)) for column, column_dtype in dtype.items()}
+    elif dtype is not None:
+        columns = usecols if usecols is not None else names or read_header(file_path)[0]
+        column_types = {column: pa.from_numpy_dtype(np.dtype(dtype)) for column in columns}
+    convert_options = csv.ConvertOptions(include_columns=usecols, column_types=column_types)
+    return csv.read_csv(file_path, read_options=read_options, convert_options=convert_options).to_pandas()
+
+
+def _load_cached(file_path, columns, names, dtype, end_time, time_column):
+    """Serve load_columns from the column cache, parsing and storing any missing columns."""
+    import pandas as pd
+
+    if columns is None:
+        columns = list(names) if names is not None else list(
+            pd.read_csv(file_path, nrows=0, skipinitialspace=True).columns
+        )
+    wanted = list(columns)
+    if end_time is not None and time_column not in wanted:
+        wanted.append(time_column)
+
+    arrays, missing = read_cached_columns(file_path, wanted, names)
+    if missing:
+        # Cache entries hold whole float64 columns so any later window or dtype can be served
+        parsed = load_columns(file_path, columns=missing, names=names, use_cache=False)
+        parsed_arrays = {column: parsed[column].to_numpy() for column in missing}
+        write_cached_columns(file_path, parsed_arrays, names)
+        arrays.update(parsed_arrays)
+
+    stop = None
+    if end_time is not None:
+        stop = np.searchsorted(arrays[time_column], end_time, side='right')
+
+    dtypes = _column_dtypes(columns, dtype, time_column)
+    return pd.DataFrame({
+        column: np.asarray(arrays[column][:stop], dtype=dtypes.get(column, np.float64))
+        for column in columns
+    })
+
+
+def iter_chunks(file_path, columns=None, names=None, dtype=np.float64, chunksize=DEFAULT_CHUNKSIZE,
+                time_column='t'):
+    """
+    Yield a CSV file as successive DataFrames of at most chunksize rows.
+
+    Only the requested columns are parsed, so the whole file is never held in memory.
+    """
+    import pandas as pd
+
+    header_kwargs, all_columns = _header_arguments(file_path, names)
+    if columns is None and isinstance(names, Schema):
+        columns = all_columns
+    dtype_columns = columns if columns is not None else all_columns
+    if dtype_columns is not None or isinstance(dtype, dict):
+        dtype = _column_dtypes(dtype_columns or [], dtype, time_column)
+    read_kwargs = dict(usecols=columns, dtype=dtype, skipinitialspace=True, chunksize=chunksize, **header_kwargs)
+
+    with pd.read_csv(file_path, **read_kwargs) as reader:
+        for chunk in reader:
+            yield chunk if columns is None else chunk[list(columns)]
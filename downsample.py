@@ -0,0 +1,187 @@
+import numpy as np
+
+from instrumentation import stage
+
+DOWNSAMPLE_METHODS = ['minmax', 'lttb']
+
+_settings = {
+    "enabled": True,
+    "method": "minmax",
+    "max_points": None,
+}
+
+
+def configure_downsampling(enabled=True, method="minmax", max_points=None):
+    """
+    Set how plotted series are reduced before drawing.
+
+    Parameters:
+        enabled (bool): Downsample long series (disable for publication figures).
+        method (str): 'minmax' keeps each bucket's extremes, 'lttb' uses Largest-Triangle-Three-Buckets.
+        max_points (int): Fixed point budget per series. None derives it from the axes width in pixels.
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r}, expected one of {DOWNSAMPLE_METHODS}")
+    _settings["enabled"] = enabled
+    _settings["method"] = method
+    _settings["max_points"] = max_points
+
+
+def downsample_settings():
+    return dict(_settings)
+
+
+def init_worker_downsampling(settings):
+    """Process pool initializer applying settings returned by downsample_settings()."""
+    configure_downsampling(**settings)
+
+
+def add_downsample_arguments(parser):
+    """Add --no-downsample / --downsample / --max-points to an argparse parser."""
+    parser.add_argument('--no-downsample', action='store_true', help="Plot every raw sample (e.g. for publication figures)")
+    parser.add_argument('--downsample', default='minmax', choices=DOWNSAMPLE_METHODS, help="Downsampling method for long series")
+    parser.add_argument('--max-points', type=int, default=None, help="Points per plotted series (default: from the axes width)")
+
+
+def apply_downsample_arguments(args):
+    """Configure downsampling from arguments added by add_downsample_arguments."""
+    configure_downsampling(not args.no_downsample, args.downsample, args.max_points)
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Indices of the minimum and maximum of y in each of n_buckets equal buckets.
+
+    The first and last samples are always kept, so the envelope and the extent of
+    the series survive. Returns sorted, unique indices (at most 2 * n_buckets + 2).
+    """
+    y = np.asarray(y)
+    n = len(y)
+    if n <= 2 * n_buckets + 2:
+        return np.arange(n)
+
+    bucket = int(np.ceil(n / n_buckets))
+    full = (n // bucket) * bucket
+    blocks = y[:full].reshape(-1, bucket)
+    offsets = np.arange(0, full, bucket)
+    parts = [[0], offsets + np.argmin(blocks, axis=1), offsets + np.argmax(blocks, axis=1)]
+    if full < n:
+        tail = y[full:]
+        parts += [[full + np.argmin(tail)], [full + np.argmax(tail)]]
+    parts.append([n - 1])
+    return np.unique(np.concatenate(parts))
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points preserving the visual shape of y(x).
+
+    Each bucket keeps the point forming the largest triangle with the previously kept
+    point and the average of the next bucket. The per-bucket search is vectorized.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket edges over the interior points (first and last are always kept)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    previous = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start, next_stop = stop, edges[i + 2] if i + 2 < len(edges) else n
+        next_stop = max(next_stop, next_start + 1)
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+
+        # Twice the triangle area for every candidate in the bucket
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        indices[i + 1] = previous
+    return indices
+
+
+def downsample(x, y, max_points, method=None):
+    """
+    Reduce a series to about max_points points while preserving its peaks.
+
+    Returns:
+        tuple: (x, y) arrays, unchanged when the series is already short enough.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    method = method or _settings["method"]
+    if not _settings["enabled"] or len(y) <= max_points:
+        return x, y
+    if method == "lttb":
+        indices = lttb_indices(x, y, max_points)
+    else:
+        indices = minmax_indices(y, max(1, max_points // 2 - 1))
+    return x[indices], y[indices]
+
+
+def point_budget(ax, points_per_pixel=2):
+    """Point budget for one series on an axes: its width in pixels times points_per_pixel."""
+    if _settings["max_points"] is not None:
+        return _settings["max_points"]
+    width = ax.get_window_extent().width
+    return max(100, int(width * points_per_pixel))
+
+
+def plot_series(ax, x, ys, **kwargs):
+    """
+    ax.plot replacement that downsamples each column of ys to the axes' pixel budget.
+
+    Parameters:
+        ax: Matplotlib axes.
+        x: Sample times.
+        ys: One series, or a DataFrame / 2D array with one series per column.
+        kwargs: Passed to ax.plot for every series.
+
+    Returns:
+        list: The created Line2D objects.
+    """
+    x = np.asarray(x)
+    if hasattr(ys, "columns"):
+        columns = [ys[column].to_numpy() for column in ys.columns]
+    else:
+        ys = np.asarray(ys)
+        columns = [ys] if ys.ndim == 1 else list(ys.T)
+
+    with stage("render", rows=len(x) * len(columns)):
+        budget = point_budget(ax)
+        lines = []
+        for y in columns:
+            lines += ax.plot(*downsample(x, y, budget), **kwargs)
+    return lines
+
+
+def fill_band(ax, x, low, high, **kwargs):
+    """
+    ax.fill_between replacement that reduces a band to the axes' pixel budget.
+
+    Each bucket of samples is shaded from its lowest low to its highest high (NaN
+    ignored), so no excursion of the band is lost.
+
+    Returns:
+        The created PolyCollection.
+    """
+    x, low, high = np.asarray(x), np.asarray(low), np.asarray(high)
+    with stage("render", rows=len(x)):
+        n_buckets = max(1, point_budget(ax) // 2)
+        if _settings["enabled"] and len(x) > 2 * n_buckets:
+            # Both edges of every bucket, at the bucket's extremes
+            starts = np.arange(0, len(x), int(np.ceil(len(x) / n_buckets)))
+            stops = np.append(starts[1:], len(x)) - 1
+            low = np.repeat(np.fmin.reduceat(low, starts), 2)
+            high = np.repeat(np.fmax.reduceat(high, starts), 2)
+            x = np.column_stack([x[starts], x[stops]]).ravel()
+        return ax.fill_between(x, low, high, **kwargs)
@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+
+from data_cache import cache_enabled
+from data_loader import DEFAULT_CHUNKSIZE, iter_chunks
+from instrumentation import stage
+from series_store import SeriesStore
+
+# Samples with |f_z| below this normal force (N) have no meaningful drawbar
+# coefficient (the wheel is out of contact) and are excluded instead of producing inf
+MIN_NORMAL_FORCE = 1e-3
+
+
+def _fill_coefficient(f_x, f_y, f_z, out, valid, min_normal_force):
+    """Write hypot(f_x, f_y) / f_z into out and the |f_z| >= min_normal_force mask into valid."""
+    np.abs(f_z, out=out)
+    np.greater_equal(out, min_normal_force, out=valid)
+    np.hypot(f_x, f_y, out=out)
+    np.divide(out, f_z, out=out, where=valid)
+
+
+def drawbar_coefficient(f_x, f_y, f_z, out=None, min_normal_force=MIN_NORMAL_FORCE):
+    """
+    Per-sample drawbar coefficient sqrt(f_x^2 + f_y^2) / f_z.
+
+    Parameters:
+        f_x, f_y, f_z (np.ndarray): Force components.
+        out (np.ndarray): Optional preallocated float64 output buffer of the same length.
+        min_normal_force (float): Samples with |f_z| below this are set to NaN.
+
+    Returns:
+        np.ndarray: The coefficient per sample (out, when given).
+    """
+    f_z = np.asarray(f_z)
+    if out is None:
+        out = np.empty(len(f_z))
+    valid = np.empty(len(f_z), dtype=bool)
+    _fill_coefficient(np.asarray(f_x), np.asarray(f_y), f_z, out, valid, min_normal_force)
+    np.logical_not(valid, out=valid)
+    out[valid] = np.nan
+    return out
+
+
+class DrawbarAccumulator:
+    """
+    Running mean of the drawbar coefficient over chunks of force samples.
+
+    Scratch buffers are reused across chunks, so the per-sample series is never
+    materialized for the whole run.
+    """
+
+    def __init__(self, min_normal_force=MIN_NORMAL_FORCE):
+        self.min_normal_force = min_normal_force
+        self.total = 0.0
+        self.count = 0
+        self.skipped = 0
+        self._out = np.empty(0)
+        self._valid = np.empty(0, dtype=bool)
+
+    def update(self, f_x, f_y, f_z):
+        n = len(f_z)
+        if n > len(self._out):
+            self._out = np.empty(n)
+            self._valid = np.empty(n, dtype=bool)
+        out, valid = self._out[:n], self._valid[:n]
+        _fill_coefficient(np.asarray(f_x), np.asarray(f_y), np.asarray(f_z), out, valid, self.min_normal_force)
+
+        n_valid = int(np.count_nonzero(valid))
+        self.total += float(np.sum(out, where=valid))
+        self.count += n_valid
+        self.skipped += n - n_valid
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float("nan")
+
+
+def file_mean_drawbar_coefficient(file_path, min_normal_force=MIN_NORMAL_FORCE, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Mean drawbar coefficient of a single wheel CSV in one bounded-memory pass.
+
+    With the column cache enabled the force columns are memory-mapped from it;
+    otherwise the CSV is streamed in chunks.
+
+    Returns:
+        DrawbarAccumulator: Holds the mean plus the counts of used and skipped samples.
+    """
+    accumulator = DrawbarAccumulator(min_normal_force)
+    with stage("reduce", file_path) as event:
+        if cache_enabled():
+            store = SeriesStore.open(file_path, ['f_x', 'f_y', 'f_z'])
+            f_x, f_y, f_z = store['f_x'], store['f_y'], store['f_z']
+            for start in range(0, len(f_z), chunksize):
+                stop = start + chunksize
+                accumulator.update(f_x[start:stop], f_y[start:stop], f_z[start:stop])
+        else:
+            # Streamed chunks are parsed inside this stage
+            event["bytes"] = os.path.getsize(file_path)
+            for chunk in iter_chunks(file_path, columns=['f_x', 'f_y', 'f_z'], chunksize=chunksize):
+                accumulator.update(chunk['f_x'].to_numpy(), chunk['f_y'].to_numpy(), chunk['f_z'].to_numpy())
+        event["rows"] = accumulator.count + accumulator.skipped
+    return accumulator
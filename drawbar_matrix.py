@@ -0,0 +1,157 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+from data_cache import cache_settings, init_worker_cache
+from drawbar import file_mean_drawbar_coefficient
+from figure_export import render_in_parallel
+from memoize import init_worker_memo, memo_settings, memoize
+
+# Manifest looked up inside a runs directory when none is given
+MANIFEST_FILE_NAME = "manifest.csv"
+
+
+def read_manifest(manifest_path):
+    """
+    Read a run manifest: a CSV file with csv, scale and slip columns.
+
+    Relative csv paths are resolved against the folder of the manifest.
+
+    Returns:
+        list: (csv_path, scale, slip) tuples in manifest order.
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    runs = []
+    with open(manifest_path, newline="") as fp:
+        reader = csv.DictReader(fp)
+        missing = {"csv", "scale", "slip"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"{manifest_path} is missing the column(s) {sorted(missing)}")
+        for row in reader:
+            runs.append((os.path.join(base, row["csv"]), float(row["scale"]), float(row["slip"])))
+    return runs
+
+
+def discover_runs(root, manifest_path=None):
+    """
+    Find the runs of a scale x slip grid.
+
+    Uses manifest_path, or root/manifest.csv when it exists. Otherwise every folder
+    below root holding an output.csv and a params.json with "scale" and "slip" is a run.
+
+    Returns:
+        list: (csv_path, scale, slip) tuples.
+    """
+    if manifest_path is None and os.path.exists(os.path.join(root, MANIFEST_FILE_NAME)):
+        manifest_path = os.path.join(root, MANIFEST_FILE_NAME)
+    if manifest_path is not None:
+        return read_manifest(manifest_path)
+
+    runs = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if "params.json" not in filenames or "output.csv" not in filenames:
+            continue
+        with open(os.path.join(dirpath, "params.json")) as params_fp:
+            params = json.load(params_fp)
+        if "scale" not in params or "slip" not in params:
+            print(f"Skipping {dirpath}: params.json has no scale and slip")
+            continue
+        runs.append((os.path.join(dirpath, "output.csv"), float(params["scale"]), float(params["slip"])))
+    return runs
+
+
+@memoize("csv_path")
+def reduce_run(csv_path):
+    """
+    Mean drawbar coefficient of one run in a bounded-memory pass: (mean, used samples, skipped samples).
+
+    Memoized on the file content (see memoize.py).
+    """
+    accumulator = file_mean_drawbar_coefficient(csv_path)
+    return accumulator.mean, accumulator.count, accumulator.skipped
+
+
+def _init_worker(cache, memo):
+    init_worker_cache(cache)
+    init_worker_memo(memo)
+
+
+class DrawbarMatrix:
+    """
+    Mean drawbar coefficient of every run of a scale x slip grid.
+
+    values[i, j] is the mean at scales[i] and slips[j] (NaN where no run exists) and
+    counts[i, j] the number of samples behind it. Runs repeating a (scale, slip) pair
+    are pooled, weighted by their sample counts.
+    """
+
+    def __init__(self, scales, slips, values, counts=None):
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self.slips = np.asarray(slips, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.counts = np.zeros(self.values.shape, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def from_results(cls, scales, slips, means, counts):
+        """Build the matrix from per-run (scale, slip, mean, sample count) arrays."""
+        scales, slips = np.asarray(scales, dtype=np.float64), np.asarray(slips, dtype=np.float64)
+        means, counts = np.asarray(means, dtype=np.float64), np.asarray(counts, dtype=np.int64)
+        scale_values, rows = np.unique(scales, return_inverse=True)
+        slip_values, columns = np.unique(slips, return_inverse=True)
+
+        # Sample-weighted sums per cell; runs without valid samples do not contribute
+        valid = counts > 0
+        totals = np.zeros((len(scale_values), len(slip_values)))
+        cell_counts = np.zeros(totals.shape, dtype=np.int64)
+        np.add.at(totals, (rows[valid], columns[valid]), means[valid] * counts[valid])
+        np.add.at(cell_counts, (rows[valid], columns[valid]), counts[valid])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = np.where(cell_counts > 0, totals / cell_counts, np.nan)
+        return cls(scale_values, slip_values, values, cell_counts)
+
+    @classmethod
+    def from_runs(cls, runs, workers=1):
+        """
+        Reduce every (csv_path, scale, slip) run, in a process pool when workers > 1.
+
+        Each file is streamed (or memory-mapped from the column cache) chunk by chunk, so
+        memory stays bounded by the chunk size times the number of workers. Failing runs
+        are reported and left out.
+        """
+        runs = list(runs)
+        paths = [csv_path for csv_path, _, _ in runs]
+        results = render_in_parallel(reduce_run, paths, workers, _init_worker, (cache_settings(), memo_settings()))
+
+        scales, slips, means, counts = [], [], [], []
+        for done, ((csv_path, scale, slip), (_, result, error)) in enumerate(zip(runs, results), start=1):
+            if error is not None:
+                print(f"[{done}/{len(runs)}] Error processing {csv_path}: {error}")
+                continue
+            mean, count, skipped = result
+            if skipped:
+                print(f"{csv_path}: skipped {skipped} samples with f_z ~ 0")
+            scales.append(scale)
+            slips.append(slip)
+            means.append(mean)
+            counts.append(count)
+        return cls.from_results(scales, slips, means, counts)
+
+    def save(self, path):
+        """Save the matrix to a .npz file."""
+        np.savez_compressed(path, scales=self.scales, slips=self.slips, values=self.values, counts=self.counts)
+        print(f"Saved drawbar matrix: {path}")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["scales"], data["slips"], data["values"], data["counts"])
+
+    def curves(self):
+        """Yield (scale, slips, mean drawbar coefficients) per scale, skipping missing runs."""
+        for scale, row in zip(self.scales, self.values):
+            present = ~np.isnan(row)
+            if present.any():
+                yield scale, self.slips[present], row[present]
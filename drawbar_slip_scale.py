@@ -1,70 +1,109 @@
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import argparse
 import sys
 
-# Function to calculate the drawbar coefficient
-def calculate_drawbar_coeff(df):
-    df['resultant_fx_fy'] = np.sqrt(df['f_x']**2 + df['f_y']**2)
-    df['drawbar_coeff'] = df['resultant_fx_fy'] / df['f_z']
-    return df['drawbar_coeff'].mean()
-
-# Set up argument parsing
-parser = argparse.ArgumentParser(description="Plot 2D graph of drawbar coefficient vs slip for different scale values.")
-parser.add_argument('--csv', nargs='+', help="Paths to CSV files", required=True)
-parser.add_argument('--scale', nargs='+', type=float, help="Scale factors for each CSV file", required=True)
-parser.add_argument('--slip', nargs='+', type=float, help="Slip values for each CSV file", required=True)
-
-args = parser.parse_args()
-
-# Check if the number of CSV files, scale factors, and slip values match
-if len(args.csv) != len(args.scale) or len(args.csv) != len(args.slip):
-    print("Error: The number of CSV files, scale factors, and slip values must match.")
-    sys.exit(1)
-
-# Dictionary to store data for plotting, grouped by scale values
-data = {}
-
-# Process each CSV file
-for csv_path, scale, slip in zip(args.csv, args.scale, args.slip):
-    # Load the CSV file
-    df = pd.read_csv(csv_path)
-
-    # Calculate the average drawbar coefficient
-    avg_drawbar_coeff = calculate_drawbar_coeff(df)
-
-    # Store the data grouped by scale value
-    if scale not in data:
-        data[scale] = {'slips': [], 'drawbar_coeffs': []}
-    data[scale]['slips'].append(slip)
-    data[scale]['drawbar_coeffs'].append(avg_drawbar_coeff)
-
-# Create a 2D plot
-plt.figure()
-
-# Use a colormap for different scale values
-colors = plt.cm.viridis(np.linspace(0, 1, len(data.keys())))
-
-# Plot lines for each scale value
-for scale, color in zip(sorted(data.keys()), colors):
-    slips = np.array(data[scale]['slips'])
-    drawbar_coeffs = np.array(data[scale]['drawbar_coeffs'])
-
-    # Sort by slip value to ensure proper line connections
-    sort_idx = np.argsort(slips)
-    slips = slips[sort_idx]
-    drawbar_coeffs = drawbar_coeffs[sort_idx]
-
-    # Plot the line for this scale value
-    plt.plot(slips, drawbar_coeffs, color=color, label=f'Scale {scale}')
-
-# Add labels and legend
-plt.xlabel('Slip Value')
-plt.ylabel('Drawbar Coefficient')
-plt.title('Drawbar Coefficient vs Slip for Different Scale Values')
-plt.legend(title="Scale Factors")
-
-# Show the plot
-plt.show()
-
+from data_cache import add_cache_arguments, apply_cache_arguments
+from drawbar_matrix import DrawbarMatrix, discover_runs
+from figure_export import add_export_arguments, apply_export_arguments, figures_are_current, finish_figure
+from instrumentation import add_instrumentation_arguments, apply_instrumentation_arguments
+from memoize import add_memo_arguments, apply_memo_arguments
+
+
+def drawbar_slip_matrix(csv_paths, scales, slips, workers=1):
+    """Average drawbar coefficient of each CSV file as a (scale, slip) DrawbarMatrix."""
+    return DrawbarMatrix.from_runs(zip(csv_paths, scales, slips), workers)
+
+
+def plot_drawbar_matrix(matrix, input_paths=(), params=None):
+    """Plot a DrawbarMatrix as drawbar coefficient vs slip with one line per scale value."""
+    import matplotlib.pyplot as plt
+
+    # Create a 2D plot
+    fig = plt.figure()
+
+    # Use a colormap for different scale values
+    colors = plt.cm.viridis(np.linspace(0, 1, len(matrix.scales)))
+
+    # Plot lines for each scale value (slips are sorted, so lines connect properly)
+    for (scale, slips, drawbar_coeffs), color in zip(matrix.curves(), colors):
+        plt.plot(slips, drawbar_coeffs, color=color, label=f'Scale {scale}')
+
+    # Add labels and legend
+    plt.xlabel('Slip Value')
+    plt.ylabel('Drawbar Coefficient')
+    plt.title('Drawbar Coefficient vs Slip for Different Scale Values')
+    plt.legend(title="Scale Factors")
+
+    # Show or export the plot
+    finish_figure(fig, 'drawbar_slip_scale', input_paths, params)
+
+
+def plot_drawbar_slip_scale(csv_paths, scales, slips, workers=1, matrix_path=None):
+    """
+    Plot the average drawbar coefficient vs slip with one line per scale value.
+
+    Parameters:
+        workers (int): Number of processes reducing the CSV files.
+        matrix_path (str): Also save the (scale, slip) matrix to this .npz file.
+    """
+    # Skip the work when the exported figure is already up to date
+    figure_params = [list(scales), list(slips)]
+    if matrix_path is None and figures_are_current(['drawbar_slip_scale'], csv_paths, figure_params):
+        print("Figure is up to date, skipping")
+        return
+
+    matrix = drawbar_slip_matrix(csv_paths, scales, slips, workers)
+    if matrix_path:
+        matrix.save(matrix_path)
+    plot_drawbar_matrix(matrix, csv_paths, figure_params)
+
+
+def main(argv=None, prog=None):
+    # Set up argument parsing
+    parser = argparse.ArgumentParser(prog=prog, description="Plot 2D graph of drawbar coefficient vs slip for different scale values.")
+    parser.add_argument('--csv', nargs='+', help="Paths to CSV files")
+    parser.add_argument('--scale', nargs='+', type=float, help="Scale factors for each CSV file")
+    parser.add_argument('--slip', nargs='+', type=float, help="Slip values for each CSV file")
+    parser.add_argument('--dir', default=None,
+                        help="Discover the runs below this folder (manifest.csv, or params.json with scale and slip)")
+    parser.add_argument('--manifest', default=None, help="CSV manifest with csv, scale and slip columns")
+    parser.add_argument('--workers', type=int, default=1, help="Number of processes reducing the CSV files")
+    parser.add_argument('--save-matrix', default=None, help="Save the (scale, slip) drawbar matrix to this .npz file")
+    parser.add_argument('--load-matrix', default=None, help="Plot a matrix saved with --save-matrix instead of reading CSVs")
+    add_cache_arguments(parser)
+    add_export_arguments(parser)
+    add_instrumentation_arguments(parser)
+    add_memo_arguments(parser)
+
+    args = parser.parse_args(argv)
+    apply_cache_arguments(args)
+    apply_export_arguments(args)
+    apply_instrumentation_arguments(args)
+    apply_memo_arguments(args)
+
+    # A saved matrix is plotted without touching the CSV files
+    if args.load_matrix:
+        plot_drawbar_matrix(DrawbarMatrix.load(args.load_matrix), [args.load_matrix])
+        return
+
+    # Runs come from a folder / manifest or from the command line
+    if args.dir or args.manifest:
+        runs = discover_runs(args.dir, args.manifest)
+        if not runs:
+            print("Error: No runs found.")
+            sys.exit(1)
+        print(f"Found {len(runs)} runs")
+        args.csv, args.scale, args.slip = (list(values) for values in zip(*runs))
+    elif not (args.csv and args.scale and args.slip):
+        parser.error("give --csv, --scale and --slip, or --dir / --manifest, or --load-matrix")
+
+    # Check if the number of CSV files, scale factors, and slip values match
+    if len(args.csv) != len(args.scale) or len(args.csv) != len(args.slip):
+        print("Error: The number of CSV files, scale factors, and slip values must match.")
+        sys.exit(1)
+
+    plot_drawbar_slip_scale(args.csv, args.scale, args.slip, args.workers, args.save_matrix)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,79 +1,113 @@
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import argparse
-from scipy.signal import savgol_filter  # For Savitzky-Golay filtering
-
-# Function to calculate the drawbar coefficient
-def calculate_drawbar_coeff(df):
-    df['resultant_fx_fy'] = np.sqrt(df['f_x']**2 + df['f_y']**2)
-    df['drawbar_coeff'] = df['resultant_fx_fy'] / df['f_z']
-    return df
-
-# Function to apply smoothing
-def smooth_data(y, method='moving_average', window_size=5, polyorder=2):
-    if method == 'moving_average':
-        return y.rolling(window=window_size, center=True, min_periods=1).mean()  # Moving average
-    elif method == 'savgol':
-        return savgol_filter(y, window_length=window_size, polyorder=polyorder)  # Savitzky-Golay filter
-    else:
-        return y  # No smoothing
-
-# Set up argument parsing
-parser = argparse.ArgumentParser(description="Plot 2D graph of drawbar coefficient vs time for different scale values.")
-parser.add_argument('--csv', nargs='+', help="Paths to CSV files", required=True)
-parser.add_argument('--scale', nargs='+', type=float, help="Scale factors for each CSV file", required=True)
-parser.add_argument('--slip', type=float, help="Constant slip value for all CSV files", required=True)
-parser.add_argument('--smooth', type=str, default='moving_average', choices=['moving_average', 'savgol', 'none'],
-                    help="Smoothing method: 'moving_average', 'savgol', or 'none'")
-parser.add_argument('--window_size', type=int, default=5,
-                    help="Window size for smoothing (must be an odd integer for Savitzky-Golay)")
-parser.add_argument('--polyorder', type=int, default=2,
-                    help="Polynomial order for Savitzky-Golay filter")
-
-args = parser.parse_args()
-
-# Check if the number of CSV files and scale factors match
-if len(args.csv) != len(args.scale):
-    print("Error: The number of CSV files and scale factors must match.")
-    sys.exit(1)
-
-# Create a 2D plot
-plt.figure()
-
-# Use a colormap for different scale values
-colors = plt.cm.viridis(np.linspace(0, 1, len(args.scale)))
-
-# Process each CSV file
-for csv_path, scale, color in zip(args.csv, args.scale, colors):
-    # Load the CSV file
-    df = pd.read_csv(csv_path)
-
-    # Calculate the drawbar coefficient
-    df = calculate_drawbar_coeff(df)
-
-    # Apply smoothing to the drawbar coefficient data
-    if args.smooth != 'none':
-        if args.smooth == 'moving_average':
-            df['drawbar_coeff_smooth'] = smooth_data(
-                df['drawbar_coeff'], method='moving_average', window_size=args.window_size
-            )
-        elif args.smooth == 'savgol':
-            df['drawbar_coeff_smooth'] = smooth_data(
-                df['drawbar_coeff'], method='savgol', window_size=args.window_size, polyorder=args.polyorder
-            )
-        y_values = df['drawbar_coeff_smooth']
-    else:
-        y_values = df['drawbar_coeff']
-
-    # Plot drawbar coefficient vs time (using the 't' column)
-    plt.plot(df['t'], y_values, color=color, label=f'Scale {scale} ({scale*20}x scaled)')
-
-# Add labels and legend
-plt.xlabel('Time (t)')
-plt.ylabel('Drawbar Coefficient')
-plt.title(f'Drawbar Coefficient vs Time (Slip = {args.slip})')
-plt.legend(title="Scale Factors")
-
-# Show the plot
-plt.show()
\ No newline at end of file
+import sys
+
+from data_cache import add_cache_arguments, apply_cache_arguments
+from data_loader import DEFAULT_CHUNKSIZE
+from drawbar import drawbar_coefficient
+from downsample import add_downsample_arguments, apply_downsample_arguments, plot_series
+from figure_export import add_export_arguments, apply_export_arguments, figures_are_current, finish_figure
+from instrumentation import add_instrumentation_arguments, apply_instrumentation_arguments, stage
+from run_store import RunStore, add_comparison_arguments, comparison_name, plot_comparison
+from smoothing import SMOOTHING_METHODS, make_filter
+
+# Function to apply smoothing, chunk by chunk with constant filter state
+def smooth_data(y, method='moving_average', window_size=5, polyorder=2, chunksize=DEFAULT_CHUNKSIZE):
+    return make_filter(method, window_size, polyorder).apply(y, chunksize=chunksize)
+
+
+def plot_drawbar_time_scale(csv_paths, scales, slip, smooth='moving_average', window_size=5, polyorder=2, workers=None,
+                            baseline=None, envelope=False):
+    """
+    Plot the drawbar coefficient vs time for each scale value.
+
+    Only f_x, f_y and f_z of every run are loaded, as float32 into one RunStore. With a
+    baseline scale (or envelope) a second figure compares the runs on a common time grid.
+    """
+    import matplotlib.pyplot as plt
+
+    # Skip the work when the exported figures are already up to date
+    figure_name = f'drawbar_time_scale_slip{slip}'
+    comparison = comparison_name('drawbar_time_scale', slip, baseline, envelope)
+    figure_params = [list(scales), slip, smooth, window_size, polyorder]
+    if figures_are_current([figure_name] + ([comparison] if comparison else []), csv_paths, figure_params):
+        print("Figure is up to date, skipping")
+        return
+
+    store = RunStore.load(csv_paths, ['f_x', 'f_y', 'f_z'], labels=scales, workers=workers)
+    with stage("reduce", rows=len(store.t)):
+        # Calculate the drawbar coefficient of every run in one call (NaN where f_z ~ 0)
+        drawbar_coeff = drawbar_coefficient(store.column('f_x'), store.column('f_y'), store.column('f_z'))
+
+        # Apply smoothing to each run's drawbar coefficient data
+        if smooth != 'none':
+            for start, stop in zip(store.offsets[:-1], store.offsets[1:]):
+                drawbar_coeff[start:stop] = smooth_data(drawbar_coeff[start:stop], method=smooth,
+                                                        window_size=window_size, polyorder=polyorder)
+    store = store.derived({'drawbar': drawbar_coeff})
+    del drawbar_coeff
+
+    # Create a 2D plot
+    fig = plt.figure()
+
+    # Use a colormap for different scale values
+    colors = plt.cm.viridis(np.linspace(0, 1, len(scales)))
+
+    # Plot drawbar coefficient vs time (using the 't' column) of each run
+    for run, scale, color in zip(store.runs(), scales, colors):
+        plot_series(plt.gca(), run['t'], run['drawbar'], color=color, label=f'Scale {scale} ({scale*20}x scaled)')
+
+    # Add labels and legend
+    plt.xlabel('Time (t)')
+    plt.ylabel('Drawbar Coefficient')
+    plt.title(f'Drawbar Coefficient vs Time (Slip = {slip})')
+    plt.legend(title="Scale Factors")
+
+    # Show or export the plot
+    finish_figure(fig, figure_name, csv_paths, figure_params)
+
+    if comparison:
+        plot_comparison(store.resample(), ['drawbar'], colors, f'Drawbar Coefficient across Scales (Slip = {slip})',
+                        comparison, baseline, csv_paths, figure_params)
+
+
+def main(argv=None, prog=None):
+    # Set up argument parsing
+    parser = argparse.ArgumentParser(prog=prog, description="Plot 2D graph of drawbar coefficient vs time for different scale values.")
+    parser.add_argument('--csv', nargs='+', help="Paths to CSV files", required=True)
+    parser.add_argument('--scale', nargs='+', type=float, help="Scale factors for each CSV file", required=True)
+    parser.add_argument('--slip', type=float, help="Constant slip value for all CSV files", required=True)
+    parser.add_argument('--smooth', type=str, default='moving_average', choices=SMOOTHING_METHODS,
+                        help="Smoothing method: 'moving_average', 'savgol', 'exponential', or 'none'")
+    parser.add_argument('--window_size', type=int, default=5,
+                        help="Window size for smoothing (rounded up to an odd integer for Savitzky-Golay)")
+    parser.add_argument('--polyorder', type=int, default=2,
+                        help="Polynomial order for Savitzky-Golay filter")
+    parser.add_argument('--workers', type=int, default=None, help="Number of threads used to load the CSV files")
+    add_comparison_arguments(parser)
+    add_cache_arguments(parser)
+    add_export_arguments(parser)
+    add_instrumentation_arguments(parser)
+    add_downsample_arguments(parser)
+
+    args = parser.parse_args(argv)
+    apply_cache_arguments(args)
+    apply_export_arguments(args)
+    apply_instrumentation_arguments(args)
+    apply_downsample_arguments(args)
+
+    # Check if the number of CSV files and scale factors match
+    if len(args.csv) != len(args.scale):
+        print("Error: The number of CSV files and scale factors must match.")
+        sys.exit(1)
+
+    if args.baseline is not None and args.baseline not in args.scale:
+        print(f"Error: --baseline {args.baseline} is not one of the --scale values.")
+        sys.exit(1)
+
+    plot_drawbar_time_scale(args.csv, args.scale, args.slip, args.smooth, args.window_size, args.polyorder, args.workers,
+                            args.baseline, args.envelope)
+
+
+if __name__ == "__main__":
+    main()
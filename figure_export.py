@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from downsample import downsample_settings
+from instrumentation import merge_events, run_traced, stage
+
+EXPORT_FORMATS = ['png', 'svg', 'pdf']
+
+_settings = {
+    "out_dir": None,
+    "format": "png",
+    "force": False,
+}
+
+
+def configure_export(out_dir=None, fmt="png", force=False):
+    """
+    Switch figure output between interactive windows and headless file export.
+
+    Parameters:
+        out_dir (str): Directory figures are saved to. None keeps the interactive plt.show().
+        fmt (str): File format, one of EXPORT_FORMATS.
+        force (bool): Re-render figures even when their inputs have not changed.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported figure format {fmt!r}, expected one of {EXPORT_FORMATS}")
+    _settings["out_dir"] = out_dir
+    _settings["format"] = fmt
+    _settings["force"] = force
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+        # Non-interactive backend so exports work on headless nodes (pyplot itself is imported on first plot)
+        import matplotlib
+        matplotlib.use("Agg")
+
+
+def export_settings():
+    return dict(_settings)
+
+
+def exporting():
+    return _settings["out_dir"] is not None
+
+
+def add_export_arguments(parser):
+    """Add --out-dir / --format / --force-export to an argparse parser."""
+    parser.add_argument('--out-dir', default=None, help="Save figures to this directory instead of showing them")
+    parser.add_argument('--format', default='png', choices=EXPORT_FORMATS, help="File format for exported figures")
+    parser.add_argument('--force-export', action='store_true', help="Re-render figures whose inputs have not changed")
+
+
+def apply_export_arguments(args):
+    """Configure figure export from arguments added by add_export_arguments."""
+    configure_export(args.out_dir, args.format, args.force_export)
+
+
+def figure_stem(file_path):
+    """File-name-safe figure name derived from an input path, e.g. 'sweep_run1_output'."""
+    stem = os.path.splitext(os.path.normpath(os.path.relpath(file_path)))[0]
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", stem).strip("_.")
+
+
+def figure_path(name):
+    return os.path.join(_settings["out_dir"], f"{name}.{_settings['format']}")
+
+
+def _signature(input_paths, params):
+    """Hash of the input files' path, size and mtime plus the rendering and downsampling parameters."""
+    entries = []
+    for path in input_paths:
+        stat = os.stat(path)
+        entries.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+    key = json.dumps([entries, params, downsample_settings()], sort_keys=True, default=str)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _signature_path(name):
+    return os.path.join(_settings["out_dir"], f".{name}.{_settings['format']}.sig")
+
+
+def figures_are_current(names, input_paths=(), params=None):
+    """
+    True when exporting and every named figure was already saved from unchanged inputs.
+
+    Scripts call this before loading data so up-to-date figures cost nothing.
+    """
+    if not exporting() or _settings["force"]:
+        return False
+    signature = _signature(input_paths, params)
+    for name in names:
+        if not os.path.exists(figure_path(name)) or not os.path.exists(_signature_path(name)):
+            return False
+        with open(_signature_path(name)) as fp:
+            if fp.read() != signature:
+                return False
+    return True
+
+
+def finish_figure(fig, name, input_paths=(), params=None):
+    """
+    Show a finished figure, or save it to the export directory and close it.
+
+    Parameters:
+        fig: The matplotlib figure.
+        name (str): File name (without extension) used when exporting.
+        input_paths (list): Input files the figure was drawn from.
+        params: JSON-serialisable rendering parameters; with input_paths they decide
+            whether a later export can be skipped.
+    """
+    import matplotlib.pyplot as plt
+
+    if not exporting():
+        plt.show()
+        return
+
+    path = figure_path(name)
+    with stage("render", path):
+        fig.savefig(path)
+    plt.close(fig)
+    with open(_signature_path(name), "w") as fp:
+        fp.write(_signature(input_paths, params))
+    print(f"Saved figure: {path}")
+
+
+def render_in_parallel(func, items, workers=1, initializer=None, initargs=()):
+    """
+    Call func(item) for every item in worker processes with the current export settings.
+
+    Parameters:
+        func: Top-level (picklable) function rendering one item.
+        items (list): Items to render, e.g. input file paths.
+        workers (int): Number of worker processes.
+        initializer: Optional extra per-process initializer (e.g. cache configuration).
+
+    Returns:
+        list: (item, result, error) tuples in the order of items.
+    """
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        results = []
+        for item in items:
+            try:
+                results.append((item, func(item), None))
+            except Exception as e:
+                results.append((item, None, e))
+        return results
+
+    settings = export_settings()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(settings, initializer, initargs)) as executor:
+        futures = [executor.submit(run_traced, func, item) for item in items]
+        results = []
+        for item, future in zip(items, futures):
+            try:
+                result, worker_events = future.result()
+            except Exception as e:
+                results.append((item, None, e))
+                continue
+            merge_events(worker_events)
+            results.append((item, result, None))
+        return results
+
+
+def _init_worker(settings, initializer, initargs):
+    configure_export(settings["out_dir"], settings["format"], settings["force"])
+    if initializer is not None:
+        initializer(*initargs)
@@ -0,0 +1,196 @@
+import atexit
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_settings = {
+    "trace_path": None,
+    "profile": False,
+}
+
+# Events recorded in this process, and the stages currently open in each thread
+_events = []
+_local = threading.local()
+_started = time.perf_counter()
+_registered = False
+
+
+def configure_instrumentation(trace_path=None, profile=False):
+    """
+    Set where the run's stage trace goes and whether it is profiled.
+
+    Parameters:
+        trace_path (str): Write the stage trace here at exit (.csv for CSV, anything else JSON).
+        profile (bool): Wrap the run in cProfile and tracemalloc and print a report at exit.
+    """
+    global _registered
+    _settings["trace_path"] = trace_path
+    _settings["profile"] = profile
+    if trace_path is not None or profile:
+        _start_profiling(profile)
+        if not _registered:
+            atexit.register(finish_instrumentation)
+            _registered = True
+
+
+def instrumentation_settings():
+    return dict(_settings)
+
+
+def add_instrumentation_arguments(parser):
+    """Add --trace / --profile to an argparse parser."""
+    parser.add_argument('--trace', default=None, help="Write a per-stage timing trace to this .json or .csv file")
+    parser.add_argument('--profile', action='store_true', help="Profile the run with cProfile and tracemalloc")
+
+
+def apply_instrumentation_arguments(args):
+    """Configure instrumentation from arguments added by add_instrumentation_arguments."""
+    configure_instrumentation(args.trace, args.profile)
+
+
+@contextmanager
+def stage(name, label=None, **counters):
+    """
+    Time a parse / reduce / render step.
+
+    Yields the event dict so the step can add counters once known, e.g.
+    event["rows"] = len(data). Time spent in nested stages is excluded from the
+    enclosing stage's self_seconds, and an event containing a nested stage of the same
+    name is marked nested so its rows and bytes are not counted twice.
+    """
+    event = {"stage": name, "label": label, "pid": os.getpid(), **counters}
+    if not hasattr(_local, "open_stages"):
+        _local.open_stages = []
+    open_stages = _local.open_stages
+    started = time.perf_counter()
+    open_stages.append(event)
+    event["_children"] = 0.0
+    try:
+        yield event
+    finally:
+        open_stages.pop()
+        seconds = time.perf_counter() - started
+        event["start"] = started - _started
+        event["seconds"] = seconds
+        event["self_seconds"] = seconds - event.pop("_children")
+        if open_stages:
+            open_stages[-1]["_children"] += seconds
+            if open_stages[-1]["stage"] == name:
+                open_stages[-1]["nested"] = True
+        _events.append(event)
+
+
+def events():
+    return list(_events)
+
+
+def merge_events(new_events):
+    """Add events recorded in a worker process (see run_traced)."""
+    _events.extend(new_events)
+
+
+def run_traced(func, *args):
+    """
+    Call func(*args) and return (result, events recorded during the call).
+
+    Process pools submit this instead of func so the parent can merge the workers' events.
+    """
+    first = len(_events)
+    result = func(*args)
+    new_events = _events[first:]
+    del _events[first:]
+    return result, new_events
+
+
+def summarize(recorded=None):
+    """
+    Totals per stage.
+
+    Returns:
+        dict: stage -> {"seconds", "calls", "rows", "bytes"} using self time.
+    """
+    totals = {}
+    for event in recorded if recorded is not None else _events:
+        total = totals.setdefault(event["stage"], {"seconds": 0.0, "calls": 0, "rows": 0, "bytes": 0})
+        total["seconds"] += event["self_seconds"]
+        if event.get("nested"):
+            continue
+        total["calls"] += 1
+        total["rows"] += event.get("rows", 0) or 0
+        total["bytes"] += event.get("bytes", 0) or 0
+    return totals
+
+
+def print_summary(recorded=None):
+    totals = summarize(recorded)
+    overall = sum(total["seconds"] for total in totals.values()) or 1.0
+    print("Stage       seconds      %   calls          rows        MiB")
+    for name in sorted(totals, key=lambda name: -totals[name]["seconds"]):
+        total = totals[name]
+        print(f"{name:<10}{total['seconds']:9.3f} {100 * total['seconds'] / overall:6.1f} {total['calls']:7d}"
+              f" {total['rows']:13d} {total['bytes'] / 2**20:10.1f}")
+
+
+def write_trace(path, recorded=None):
+    """Write the recorded events to a CSV (by extension) or JSON file."""
+    recorded = recorded if recorded is not None else _events
+    if path.endswith(".csv"):
+        fields = ["stage", "label", "pid", "start", "seconds", "self_seconds", "rows", "bytes", "nested"]
+        fields += sorted({key for event in recorded for key in event} - set(fields))
+        with open(path, "w", newline="") as fp:
+            writer = csv.DictWriter(fp, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(recorded)
+    else:
+        with open(path, "w") as fp:
+            json.dump({"events": recorded, "summary": summarize(recorded)}, fp, indent=2, default=str)
+    print(f"Saved trace: {path}")
+
+
+_profiler = None
+
+
+def _start_profiling(profile):
+    global _profiler
+    if not profile or _profiler is not None:
+        return
+    import cProfile
+    import tracemalloc
+
+    tracemalloc.start()
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+
+def finish_instrumentation():
+    """Stop profiling, print the stage summary and write the trace (runs at exit once configured)."""
+    global _profiler
+    if _profiler is not None:
+        import pstats
+        import tracemalloc
+
+        _profiler.disable()
+        peak = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        print("\nProfile (top 20 by cumulative time):")
+        pstats.Stats(_profiler).sort_stats("cumulative").print_stats(20)
+        print(f"Peak traced memory: {peak / 2**20:.1f} MiB")
+        print("Top allocation sites:")
+        for statistic in snapshot.statistics("lineno")[:10]:
+            print(f"  {statistic}")
+        if _settings["trace_path"]:
+            profile_path = os.path.splitext(_settings["trace_path"])[0] + ".prof"
+            _profiler.dump_stats(profile_path)
+            print(f"Saved profile: {profile_path}")
+        _profiler = None
+
+    if _events:
+        print()
+        print_summary()
+    if _settings["trace_path"]:
+        write_trace(_settings["trace_path"])
@@ -0,0 +1,96 @@
+import numpy as np
+
+from data_cache import cache_enabled, read_cached_columns, write_cached_columns
+from data_loader import DEFAULT_CHUNKSIZE
+from instrumentation import stage
+from series_store import SeriesStore
+
+# Orientation quaternion columns of each schema, in (w, x, y, z) order
+QUATERNION_COLUMNS = {
+    "chrono": ['quatE0', 'quatE1', 'quatE2', 'quatE3'],
+    "single_wheel": ['oriq_w', 'oriq_x', 'oriq_y', 'oriq_z'],
+}
+
+# World-frame velocity columns of each schema
+VELOCITY_COLUMNS = {
+    "chrono": ['velX', 'velY', 'velZ'],
+    "single_wheel": ['vel_x', 'vel_y', 'vel_z'],
+}
+
+# Derived columns: body-frame velocity and unwrapped heading (yaw, rad)
+BODY_COLUMNS = ['vel_body_x', 'vel_body_y', 'vel_body_z', 'heading']
+
+
+def normalize_quaternions(w, x, y, z):
+    """Unit quaternions as float64 (w, x, y, z) arrays, so drift in the logged values cancels."""
+    w, x, y, z = (np.asarray(component, dtype=np.float64) for component in (w, x, y, z))
+    norm = np.sqrt(w * w + x * x + y * y + z * z)
+    norm[norm == 0] = 1.0
+    return w / norm, x / norm, y / norm, z / norm
+
+
+def heading(w, x, y, z):
+    """Yaw angle (rad) of unit quaternions, the rotation about the world z axis."""
+    return np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+
+
+def world_to_body(w, x, y, z, v_x, v_y, v_z, out=None):
+    """
+    Rotate world-frame vectors into the body frame of the quaternions (w, x, y, z).
+
+    Applies the conjugate rotation v_b = v - 2w (q x v) + 2 q x (q x v), with q the
+    vector part, on whole arrays of unit quaternions (see normalize_quaternions).
+
+    Returns:
+        np.ndarray: (3, n) body-frame components (out, when given).
+    """
+    v_x, v_y, v_z = (np.asarray(component, dtype=np.float64) for component in (v_x, v_y, v_z))
+
+    # c = q x v, then q x c
+    c_x = y * v_z - z * v_y
+    c_y = z * v_x - x * v_z
+    c_z = x * v_y - y * v_x
+    if out is None:
+        out = np.empty((3, len(w)))
+    out[0] = v_x - 2 * w * c_x + 2 * (y * c_z - z * c_y)
+    out[1] = v_y - 2 * w * c_y + 2 * (z * c_x - x * c_z)
+    out[2] = v_z - 2 * w * c_z + 2 * (x * c_y - y * c_x)
+    return out
+
+
+def body_kinematics(file_path, schema, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Body-frame velocity and heading of every sample of a run.
+
+    The whole quaternion array is processed in chunks of vectorized operations, so
+    temporaries stay bounded on multi-million-row logs. With the column cache enabled the
+    derived columns are stored next to the parsed ones and later calls memory-map them.
+
+    Parameters:
+        file_path (str): Simulation output CSV.
+        schema (Schema): Its layout (CHRONO_SCHEMA or SINGLE_WHEEL_SCHEMA).
+
+    Returns:
+        dict: 't' plus BODY_COLUMNS arrays.
+    """
+    if cache_enabled():
+        arrays, missing = read_cached_columns(file_path, ['t'] + BODY_COLUMNS, schema, mmap_mode='r')
+        if not missing:
+            return arrays
+
+    quaternion, velocity = QUATERNION_COLUMNS[schema.name], VELOCITY_COLUMNS[schema.name]
+    store = SeriesStore.open(file_path, quaternion + velocity, names=schema)
+    n = len(store)
+    with stage("reduce", file_path, rows=n, derived="body"):
+        body = np.empty((3, n))
+        yaw = np.empty(n)
+        for start in range(0, n, chunksize):
+            rows = slice(start, start + chunksize)
+            w, x, y, z = normalize_quaternions(*(store[column][rows] for column in quaternion))
+            world_to_body(w, x, y, z, *(store[column][rows] for column in velocity), out=body[:, rows])
+            yaw[rows] = heading(w, x, y, z)
+        arrays = dict(zip(BODY_COLUMNS, [body[0], body[1], body[2], np.unwrap(yaw)]))
+
+    if cache_enabled():
+        write_cached_columns(file_path, arrays, schema)
+    return {'t': store.t, **arrays}
@@ -0,0 +1,210 @@
+import io
+import os
+import time
+
+import numpy as np
+
+from schemas import CHRONO_SCHEMA, SINGLE_WHEEL_SCHEMA, Schema
+from downsample import downsample, point_budget
+
+
+class CsvTail:
+    """
+    Incrementally parse a CSV file that is still being written.
+
+    Each call to read_new_rows() parses only the complete lines appended since the
+    previous call, starting from the last byte offset.
+    """
+
+    def __init__(self, file_path, names=None):
+        self.file_path = file_path
+        self.schema = names if isinstance(names, Schema) else None
+        self.names = None if self.schema else names
+        self.usecols = None
+        self.offset = 0
+
+    def read_new_rows(self):
+        """Return the rows appended since the last call as a float64 DataFrame (possibly empty)."""
+        import pandas as pd
+
+        if not os.path.exists(self.file_path):
+            return self._empty()
+        if os.path.getsize(self.file_path) < self.offset:
+            # The file was truncated (e.g. the simulation restarted): start over
+            self.offset = 0
+
+        with open(self.file_path, "rb") as fp:
+            fp.seek(self.offset)
+            chunk = fp.read()
+
+        # Only parse up to the last complete line; a partial row is left for the next call
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return self._empty()
+        chunk = chunk[:end + 1]
+
+        if self.offset == 0:
+            header, _, rest = chunk.partition(b"\n")
+            fields = [name.strip() for name in header.decode().split(",")]
+            if self.schema is not None:
+                # Map the schema columns by header name; a header-less file starts with data
+                layout = self.schema.match(fields, self.file_path)
+                self.names, self.usecols = layout.labels, self.schema.columns
+                if layout.has_header:
+                    chunk = rest
+            else:
+                chunk = rest
+                if self.names is None:
+                    self.names = fields
+        self.offset += end + 1
+
+        if not chunk.strip():
+            return self._empty()
+        return pd.read_csv(io.BytesIO(chunk), header=None, names=self.names, usecols=self.usecols,
+                           dtype=np.float64, skipinitialspace=True)
+
+    def _empty(self):
+        import pandas as pd
+
+        return pd.DataFrame(columns=self.usecols or self.names or [], dtype=np.float64)
+
+
+class RingBuffer:
+    """Fixed-capacity buffer keeping the most recent rows of several columns."""
+
+    def __init__(self, columns, capacity):
+        self.columns = list(columns)
+        self.capacity = capacity
+        self.data = np.empty((capacity, len(self.columns)))
+        self.size = 0
+        self.head = 0  # Next write position
+
+    def extend(self, rows):
+        """Append a (n, n_columns) block, overwriting the oldest rows once full."""
+        rows = np.asarray(rows, dtype=np.float64)[-self.capacity:]
+        n = len(rows)
+        first = min(n, self.capacity - self.head)
+        self.data[self.head:self.head + first] = rows[:first]
+        self.data[:n - first] = rows[first:]
+        self.head = (self.head + n) % self.capacity
+        self.size = min(self.capacity, self.size + n)
+
+    def column(self, name):
+        """Rows of one column in time order."""
+        values = self.data[:, self.columns.index(name)]
+        if self.size < self.capacity:
+            return values[:self.size]
+        return np.concatenate([values[self.head:], values[:self.head]])
+
+
+class RunningMean:
+    """Mean of a column over samples at or after start_time, updated incrementally."""
+
+    def __init__(self, start_time=0.0):
+        self.start_time = start_time
+        self.total = 0.0
+        self.count = 0
+
+    def update(self, t, values):
+        selected = np.asarray(values)[np.asarray(t) >= self.start_time]
+        self.total += float(selected.sum())
+        self.count += len(selected)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float("nan")
+
+
+def follow_csv(file_path, panels, names=None, summary=None, refresh=1.0, capacity=200_000,
+               duration=None, title=None):
+    """
+    Live-plot a growing CSV file until the figure is closed.
+
+    Parameters:
+        file_path (str): CSV file being written by a running simulation.
+        panels (list): (title, ylabel, [columns]) per subplot.
+        names: Schema of the file, or positional column names replacing the file header.
+        summary: Optional callable(new_rows) -> str, updated with each batch of new rows
+            and shown as the figure title (e.g. running statistics).
+        refresh (float): Seconds between updates.
+        capacity (int): Rows kept for plotting; older rows are dropped from the figure.
+        duration (float): Stop after this many seconds (None runs until the window is closed).
+    """
+    import matplotlib.pyplot as plt
+
+    tail = CsvTail(file_path, names)
+    plotted = [column for _, _, columns in panels for column in columns]
+    buffer = RingBuffer(['t'] + plotted, capacity)
+
+    fig, axs = plt.subplots(len(panels), 1, sharex=True, figsize=(10, 4 * len(panels)), squeeze=False)
+    axs = axs[:, 0]
+    lines = {}
+    for ax, (panel_title, ylabel, columns) in zip(axs, panels):
+        for column in columns:
+            lines[column] = (ax, ax.plot([], [], label=column)[0])
+        ax.set_title(panel_title)
+        ax.set_ylabel(ylabel)
+        ax.legend(loc="upper right")
+        ax.grid()
+    axs[-1].set_xlabel("Time (s)")
+    status = title or f"Following {file_path}"
+    fig.suptitle(status)
+
+    started = time.monotonic()
+    try:
+        while plt.fignum_exists(fig.number):
+            rows = tail.read_new_rows()
+            if len(rows):
+                buffer.extend(rows[['t'] + plotted].to_numpy())
+                t = buffer.column('t')
+                for column, (ax, line) in lines.items():
+                    line.set_data(*downsample(t, buffer.column(column), point_budget(ax)))
+                for ax in axs:
+                    ax.relim()
+                    ax.autoscale_view()
+                if summary is not None:
+                    status = summary(rows)
+                    fig.suptitle(status)
+                print(status)
+
+            if duration is not None and time.monotonic() - started >= duration:
+                break
+            plt.pause(refresh)
+    except KeyboardInterrupt:
+        pass
+    return fig
+
+
+def follow_single_wheel_data(file_path, start_time=0.0, refresh=1.0, capacity=200_000, duration=None):
+    """Live-plot forces and drawbar coefficient of a running single wheel simulation."""
+    mean_d_c = RunningMean(start_time)
+
+    def summary(rows):
+        mean_d_c.update(rows['t'], rows['d_c'])
+        return f"t = {rows['t'].iloc[-1]:.2f} s, running mean d_c (t >= {start_time}) = {mean_d_c.mean:.4f}"
+
+    panels = [
+        ("Forces vs Time", "Force (N)", ['f_x', 'f_y', 'f_z']),
+        ("Drawbar Coefficient vs Time", "D_c", ['d_c']),
+        ("V_max vs Time", "V_max (m/s)", ['v_max']),
+    ]
+    return follow_csv(file_path, panels, SINGLE_WHEEL_SCHEMA, summary, refresh, capacity, duration)
+
+
+def follow_chronosim_data(file_path, start_time=1, w_r=0.2, r_wheel=0.09, refresh=1.0, capacity=200_000,
+                          duration=None):
+    """Live-plot position, velocity and torques of a running Chronosim run with its current slip estimate."""
+    mean_vel_x = RunningMean(start_time)
+    expected_velocity = w_r * r_wheel
+
+    def summary(rows):
+        mean_vel_x.update(rows['t'], rows['velX'])
+        slip = (1 - mean_vel_x.mean / expected_velocity) * 100
+        return f"t = {rows['t'].iloc[-1]:.2f} s, slip estimate = {slip:.2f}%, effective radius = {mean_vel_x.mean / w_r:.4f}"
+
+    panels = [
+        ("Position vs Time", "Position (m)", ['posX', 'posY', 'posZ']),
+        ("Velocity vs Time", "Velocity (m/s)", ['velX', 'velY', 'velZ']),
+        ("Wheel Torques vs Time", "Torque (N*m)", ['torqueLF', 'torqueRF', 'torqueLB', 'torqueRB']),
+    ]
+    return follow_csv(file_path, panels, CHRONO_SCHEMA, summary, refresh, capacity, duration)
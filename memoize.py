@@ -0,0 +1,314 @@
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from collections import OrderedDict
+
+# Result store location and bounds, overridable from the environment
+DEFAULT_MEMO_DIR = os.environ.get(
+    "CHRONO_PLOTTER_MEMO", os.path.join(os.path.expanduser("~"), ".cache", "chrono_plotter_memo")
+)
+DEFAULT_MAX_BYTES = int(os.environ.get("CHRONO_PLOTTER_MEMO_MAX_BYTES", 256 * 1024**2))
+DEFAULT_MAX_ENTRIES = 4096
+
+# Bump to invalidate every stored result (e.g. when a dependency outside this package changes
+# its output; code changes inside the package are picked up by _function_id)
+MEMO_VERSION = 1
+
+# Directory of this package: functions and classes defined in it are part of a memo key
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Bytes hashed per read when digesting an input file
+HASH_BLOCK_SIZE = 8 * 1024**2
+
+_settings = {
+    "enabled": True,
+    "memo_dir": DEFAULT_MEMO_DIR,
+    "max_bytes": DEFAULT_MAX_BYTES,
+    "max_entries": DEFAULT_MAX_ENTRIES,
+}
+
+# In-process LRU of results (key -> result) and of file digests ((path, size, mtime) -> digest)
+_results = OrderedDict()
+_digests = {}
+
+# Store size as last scanned plus the bytes this process has written since (None until first written)
+_tracked_bytes = None
+
+if importlib.util.find_spec("xxhash") is not None:
+    import xxhash
+
+    def _hasher():
+        return xxhash.xxh3_128()
+else:
+    def _hasher():
+        return hashlib.blake2b(digest_size=16)
+
+
+def configure_memo(enabled=True, memo_dir=None, max_bytes=None, max_entries=None):
+    """
+    Set the process-wide memoization behaviour.
+
+    Parameters:
+        enabled (bool): Look up and store results of memoized functions.
+        memo_dir (str): Directory of the on-disk result store.
+        max_bytes (int): Size of the on-disk store above which least recently used results are evicted.
+        max_entries (int): Results kept in the in-process LRU.
+    """
+    _settings["enabled"] = enabled
+    if memo_dir is not None:
+        _settings["memo_dir"] = memo_dir
+    if max_bytes is not None:
+        _settings["max_bytes"] = max_bytes
+    if max_entries is not None:
+        _settings["max_entries"] = max_entries
+
+
+def memo_settings():
+    """Return the current settings (e.g. to pass to worker process initializers)."""
+    return dict(_settings)
+
+
+def init_worker_memo(settings):
+    """Process pool initializer applying settings returned by memo_settings()."""
+    configure_memo(**settings)
+
+
+def add_memo_arguments(parser):
+    """Add the --no-memo switch to an argparse parser."""
+    parser.add_argument('--no-memo', action='store_true', help="Recompute results instead of reusing memoized ones")
+
+
+def apply_memo_arguments(args):
+    """Configure memoization from arguments added by add_memo_arguments."""
+    configure_memo(enabled=not args.no_memo)
+
+
+def file_digest(file_path):
+    """
+    Content hash of a file (xxh3-128 when xxhash is installed, else BLAKE2b).
+
+    Digests are remembered in memory and on disk per (path, size, mtime), so an
+    unchanged file is hashed once, not on every call.
+    """
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    state = (file_path, stat.st_size, stat.st_mtime_ns)
+    if state in _digests:
+        return _digests[state]
+
+    record_path = os.path.join(_settings["memo_dir"], "digests",
+                               hashlib.sha1(file_path.encode()).hexdigest() + ".json")
+    try:
+        with open(record_path) as fp:
+            record = json.load(fp)
+        if [record["size"], record["mtime_ns"]] == [stat.st_size, stat.st_mtime_ns]:
+            _digests[state] = record["digest"]
+            return record["digest"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    hasher = _hasher()
+    with open(file_path, "rb") as fp:
+        for block in iter(lambda: fp.read(HASH_BLOCK_SIZE), b""):
+            hasher.update(block)
+    digest = hasher.hexdigest()
+    _digests[state] = digest
+    _write_atomic(record_path, json.dumps({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                                           "digest": digest}).encode())
+    return digest
+
+
+def _write_atomic(path, data):
+    """Write data to path via a temporary file, so concurrent readers never see partial files."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as fp:
+        fp.write(data)
+    os.replace(tmp_path, path)
+
+
+def _in_package(value):
+    """True for functions and classes defined in a module of this package."""
+    if not (inspect.isfunction(value) or inspect.isclass(value)):
+        return False
+    module_file = getattr(inspect.getmodule(value), "__file__", None)
+    return module_file is not None and os.path.dirname(os.path.abspath(module_file)) == PACKAGE_DIR
+
+
+def _hash_code(code, hasher, names):
+    """Add a code object (and the nested ones of its lambdas and comprehensions) to hasher."""
+    hasher.update(code.co_code)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            _hash_code(const, hasher, names)
+        else:
+            hasher.update(repr(const).encode())
+    names.extend(code.co_names)
+
+
+def _function_id(func):
+    """
+    Name plus a hash of the compiled body of func and of every function and class of
+    this package it reaches through its globals (e.g. bootstrap_ci, SeriesStore), so
+    editing any of them invalidates its results.
+    """
+    hasher = hashlib.sha1()
+    pending, seen = [func], set()
+    while pending:
+        value = pending.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if inspect.isclass(value):
+            # Methods, including the functions behind properties, static and class methods
+            for member in vars(value).values():
+                member = getattr(member, "fget", None) or getattr(member, "__func__", member)
+                if inspect.isfunction(member):
+                    pending.append(member)
+            continue
+        value = inspect.unwrap(value)
+        hasher.update(value.__qualname__.encode())
+        names = []
+        _hash_code(value.__code__, hasher, names)
+        pending.extend(callee for callee in (value.__globals__.get(name) for name in names) if _in_package(callee))
+    return [MEMO_VERSION, func.__module__, func.__qualname__, hasher.hexdigest()]
+
+
+def memoize(input_argument, files=None):
+    """
+    Memoize a pure function of input file content plus arguments.
+
+    Results are kept in an in-process LRU and in an on-disk store (pickles, evicted
+    least recently used first). The key combines the function (and the package code it
+    calls, see _function_id), the content digest of its input files and every other argument.
+
+    Parameters:
+        input_argument (str): Parameter holding the input path.
+        files (tuple): When the input is a folder, the files inside it the result depends
+            on (e.g. ("params.json", "output.csv")).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        # Hashed on the first call, once the callees defined later in the module exist
+        function_ids = []
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            global _tracked_bytes
+            if not _settings["enabled"]:
+                return func(*args, **kwargs)
+            if not function_ids:
+                function_ids.append(_function_id(func))
+            function_id = function_ids[0]
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            input_path = os.path.abspath(arguments.pop(input_argument))
+            try:
+                paths = [os.path.join(input_path, name) for name in files] if files else [input_path]
+                digests = [file_digest(path) for path in paths]
+            except OSError:
+                # Missing inputs: let the function raise its own error
+                return func(*args, **kwargs)
+            key_data = json.dumps([function_id, input_path, digests, sorted(arguments.items())], default=repr)
+            key = hashlib.sha1(key_data.encode()).hexdigest()
+
+            if key in _results:
+                _results.move_to_end(key)
+                return _results[key]
+            result_path = os.path.join(_settings["memo_dir"], "results", key[:2], key + ".pkl")
+            found, result = _load_result(result_path)
+            if not found:
+                result = func(*args, **kwargs)
+                data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+                _write_atomic(result_path, data)
+                # The store is only scanned for eviction once its tracked size exceeds the bound
+                if _tracked_bytes is None:
+                    _tracked_bytes = _store_size()
+                else:
+                    _tracked_bytes += len(data)
+                if _tracked_bytes > _settings["max_bytes"]:
+                    evict_memo()
+            _remember(key, result)
+            return result
+
+        return wrapper
+    return decorator
+
+
+def _load_result(result_path):
+    """Return (True, result) for a readable stored result, else (False, None)."""
+    try:
+        with open(result_path, "rb") as fp:
+            result = pickle.load(fp)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return False, None
+    # Mark the result as recently used for eviction
+    os.utime(result_path)
+    return True, result
+
+
+def _remember(key, result):
+    _results[key] = result
+    while len(_results) > _settings["max_entries"]:
+        _results.popitem(last=False)
+
+
+def _stored_results():
+    """(mtime, path, size) of every stored result."""
+    results_dir = os.path.join(_settings["memo_dir"], "results")
+    if not os.path.isdir(results_dir):
+        return []
+    entries = []
+    for shard in os.scandir(results_dir):
+        if shard.is_dir():
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".pkl"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+    return entries
+
+
+def _store_size():
+    return sum(size for _, _, size in _stored_results())
+
+
+def evict_memo(max_bytes=None):
+    """
+    Remove least recently used stored results until the store fits in max_bytes.
+
+    Returns:
+        int: Number of results removed.
+    """
+    global _tracked_bytes
+    max_bytes = _settings["max_bytes"] if max_bytes is None else max_bytes
+    entries = _stored_results()
+    total = sum(size for _, _, size in entries)
+
+    removed = 0
+    for _, path, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    _tracked_bytes = total
+    return removed
+
+
+def clear_memo():
+    """Forget every memoized result, in memory and on disk."""
+    global _tracked_bytes
+    _tracked_bytes = None
+    _results.clear()
+    _digests.clear()
+    shutil.rmtree(_settings["memo_dir"], ignore_errors=True)
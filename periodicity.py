@@ -0,0 +1,148 @@
+import numpy as np
+
+PERIOD_METHODS = ['fft', 'autocorr']
+
+# Columns of the table returned by periodicity_table
+PERIOD_COLUMNS = ['label', 'column', 'period', 'frequency', 'amplitude', 'cycles']
+
+
+def grid_spacing(t, max_samples=2**18):
+    """Sample spacing of t, coarsened so the whole run fits in max_samples points."""
+    t = np.asarray(t, dtype=np.float64)
+    if len(t) < 4:
+        raise ValueError("Need at least 4 samples to detect a period")
+    return max(float(np.median(np.diff(t))), (t[-1] - t[0]) / (max_samples - 1))
+
+
+def uniform_grid(t, y, dt):
+    """Resample y(t) every dt seconds over the span of t, dropping NaN samples first."""
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~np.isnan(y)
+    t, y = t[valid], y[valid]
+    if len(t) < 4:
+        raise ValueError("Need at least 4 valid samples to detect a period")
+    n = int((t[-1] - t[0]) / dt) + 1
+    return np.interp(t[0] + dt * np.arange(n), t, y)
+
+
+def _detrend(y):
+    """Remove the mean and linear trend of each row (e.g. a slowly sinking wheel)."""
+    n = y.shape[-1]
+    x = np.arange(n) - (n - 1) / 2
+    slope = (y * x).sum(axis=-1, keepdims=True) / (x * x).sum()
+    return y - y.mean(axis=-1, keepdims=True) - slope * x
+
+
+def _refine_peak(values, index):
+    """Sub-bin peak position by fitting a parabola through the peak and its neighbours."""
+    rows = np.arange(len(index))
+    left = values[rows, np.maximum(index - 1, 0)]
+    center = values[rows, index]
+    right = values[rows, np.minimum(index + 1, values.shape[1] - 1)]
+    denominator = left - 2 * center + right
+    with np.errstate(invalid='ignore', divide='ignore'):
+        offset = np.where(denominator != 0, 0.5 * (left - right) / denominator, 0.0)
+    return index + np.clip(offset, -0.5, 0.5)
+
+
+def detect_periods(series, dt, min_period=None, max_period=None, method='fft'):
+    """
+    Dominant oscillation period of several uniformly sampled series at once.
+
+    Parameters:
+        series (list): 1D arrays sampled every dt seconds (lengths may differ).
+        dt (float): Common sample spacing (s).
+        min_period, max_period (float): Search band (s). Defaults to 4 samples and a
+            third of the shortest series, so at least three cycles are observed.
+        method (str): 'fft' picks the largest spectral peak; 'autocorr' picks the highest
+            autocorrelation peak (more robust to non-sinusoidal cycles).
+
+    Returns:
+        tuple: (periods, amplitudes) arrays, one entry per series. The amplitude is that
+        of the fitted sinusoid at the detected period. NaN when no peak is found.
+    """
+    if method not in PERIOD_METHODS:
+        raise ValueError(f"Unknown period detection method {method!r}, expected one of {PERIOD_METHODS}")
+    lengths = np.array([len(y) for y in series])
+    min_period = min_period or 4 * dt
+    max_period = max_period or lengths.min() * dt / 3
+
+    # All series share one zero-padded FFT length so they are transformed in a single call
+    nfft = 1 << int(np.ceil(np.log2(2 * lengths.max())))
+    stacked = np.zeros((len(series), nfft))
+    for row, y in enumerate(series):
+        stacked[row, :len(y)] = _detrend(np.asarray(y, dtype=np.float64))
+    spectrum = np.fft.rfft(stacked, axis=1)
+    power = np.abs(spectrum) ** 2
+
+    if method == 'fft':
+        frequencies = np.fft.rfftfreq(nfft, dt)
+        with np.errstate(divide='ignore'):
+            band = (frequencies >= 1 / max_period) & (frequencies <= 1 / min_period)
+        peak = np.argmax(np.where(band, power, -np.inf), axis=1)
+        periods = 1 / (_refine_peak(power, peak) / (nfft * dt))
+    else:
+        # Biased autocorrelation from the power spectrum (Wiener-Khinchin). It decays with
+        # the lag, so the first cycle outranks its multiples
+        autocorr = np.fft.irfft(power, nfft, axis=1)[:, :lengths.max()] / lengths[:, None]
+        autocorr[np.arange(autocorr.shape[1])[None, :] >= lengths[:, None]] = -np.inf
+        lags = np.arange(autocorr.shape[1]) * dt
+        band = (lags >= min_period) & (lags <= max_period)
+
+        # Only lags after the first zero crossing, so the central peak is not picked
+        first_negative = np.argmax(autocorr < 0, axis=1)
+        band = band[None, :] & (np.arange(autocorr.shape[1])[None, :] >= first_negative[:, None])
+        peak = np.argmax(np.where(band, autocorr, -np.inf), axis=1)
+        periods = _refine_peak(np.where(np.isfinite(autocorr), autocorr, 0.0), peak) * dt
+
+    # Sinusoid amplitude at the detected period, from each series' own length
+    frequencies = 1 / periods
+    amplitudes = np.empty(len(series))
+    for row, y in enumerate(series):
+        phase = np.exp(-2j * np.pi * frequencies[row] * dt * np.arange(len(y)))
+        amplitudes[row] = 2 * np.abs(stacked[row, :len(y)] @ phase) / len(y)
+
+    # A flat series (e.g. a wheel that never moves vertically) has no period
+    scales = np.array([np.abs(np.asarray(y, dtype=np.float64)).max(initial=0.0) for y in series])
+    found = band.any(axis=1) if band.ndim == 2 else np.full(len(series), band.any())
+    found &= amplitudes > 1e-9 * np.maximum(scales, np.finfo(np.float64).tiny)
+    periods[~found] = np.nan
+    amplitudes[~found] = np.nan
+    return periods, amplitudes
+
+
+def periodicity_table(runs, columns, labels=None, min_period=None, max_period=None, method='fft',
+                      time_column='t', max_samples=2**18):
+    """
+    Period and amplitude of several columns of several runs.
+
+    Parameters:
+        runs (list): DataFrames (or dicts of arrays) with the time column and the columns.
+        columns (list): Columns to analyze, e.g. ['pos_z', 'f_x', 'd_c'].
+        labels (list): One label per run (e.g. the scale value). Defaults to the run index.
+
+    Returns:
+        pd.DataFrame: One row per (run, column) with PERIOD_COLUMNS.
+    """
+    import pandas as pd
+
+    labels = list(range(len(runs))) if labels is None else list(labels)
+
+    # Runs sampled at different rates are resampled to the coarsest common spacing
+    dt = max(grid_spacing(run[time_column], max_samples) for run in runs)
+    rows = []
+    for column in columns:
+        series = [uniform_grid(run[time_column], run[column], dt) for run in runs]
+        periods, amplitudes = detect_periods(series, dt, min_period, max_period, method)
+        for label, y, period, amplitude in zip(labels, series, periods, amplitudes):
+            rows.append({'label': label, 'column': column, 'period': period, 'frequency': 1 / period,
+                         'amplitude': amplitude, 'cycles': len(y) * dt / period})
+    return pd.DataFrame(rows, columns=PERIOD_COLUMNS)
+
+
+def cycle_marks(start, stop, period):
+    """Times of the multiples of period within [start, stop] (empty for an undefined period)."""
+    if not np.isfinite(period) or period <= 0:
+        return np.empty(0)
+    return np.arange(np.ceil(start / period), np.floor(stop / period) + 1) * period
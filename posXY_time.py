@@ -1,74 +1,127 @@
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import argparse
 import sys
 
-# Set up argument parsing
-parser = argparse.ArgumentParser(description="Plot pos_x vs time and pos_y vs time for different scale values.")
-parser.add_argument('--csv', nargs='+', help="Paths to CSV files", required=True)
-parser.add_argument('--scale', nargs='+', type=float, help="Scale factors for each CSV file", required=True)
-parser.add_argument('--slip', type=float, help="Constant slip value for all CSV files", required=True)
+from data_cache import add_cache_arguments, apply_cache_arguments
+from downsample import add_downsample_arguments, apply_downsample_arguments, plot_series
+from figure_export import add_export_arguments, apply_export_arguments, figures_are_current, finish_figure
+from instrumentation import add_instrumentation_arguments, apply_instrumentation_arguments
+from run_store import RunStore, add_comparison_arguments, comparison_name, plot_comparison
 
-args = parser.parse_args()
-
-# Check if the number of CSV files and scale factors match
-if len(args.csv) != len(args.scale):
-    print("Error: The number of CSV files and scale factors must match.")
-    sys.exit(1)
-
-# Use a colormap for different scale values
-colors = plt.cm.viridis(np.linspace(0, 1, len(args.scale)))
 
 # Function to create a plot with two subplots (pos_x vs t and pos_y vs t)
-def create_plot(df, scale, color, title):
+def create_plot(df, scale, color, title, name, input_paths=(), params=None):
+    import matplotlib.pyplot as plt
+
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
     fig.suptitle(title, fontsize=16)
 
     # Plot pos_x vs time
-    ax1.plot(df['t'], df['pos_x'], color=color, label=f'pos_x (Scale {scale})')
+    plot_series(ax1, df['t'], df['pos_x'], color=color, label=f'pos_x (Scale {scale})')
     ax1.set_xlabel('Time (t)')
     ax1.set_ylabel('pos_x')
     ax1.legend()
 
     # Plot pos_y vs time
-    ax2.plot(df['t'], df['pos_y'], color=color, label=f'pos_y (Scale {scale})')
+    plot_series(ax2, df['t'], df['pos_y'], color=color, label=f'pos_y (Scale {scale})')
     ax2.set_xlabel('Time (t)')
     ax2.set_ylabel('pos_y')
     ax2.legend()
 
     plt.tight_layout(rect=[0, 0, 1, 0.96])  # Adjust for the suptitle
-    plt.show()
+    finish_figure(fig, name, input_paths, params)
 
-# Process each CSV file and create individual plots
-for csv_path, scale, color in zip(args.csv, args.scale, colors):
-    # Load the CSV file
-    df = pd.read_csv(csv_path)
 
-    # Create a plot for this scale value
-    create_plot(df, scale, color, title=f'pos_x and pos_y vs Time (Scale {scale}, Slip = {args.slip})')
+# Function to create the combined plot of every scale
+def create_combined_plot(runs, scales, colors, slip, name, input_paths=(), params=None):
+    import matplotlib.pyplot as plt
 
-# Create the combined plot
-fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
-fig.suptitle(f'Combined pos_x and pos_y vs Time (Slip = {args.slip})', fontsize=16)
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
+    fig.suptitle(f'Combined pos_x and pos_y vs Time (Slip = {slip})', fontsize=16)
 
-for csv_path, scale, color in zip(args.csv, args.scale, colors):
-    # Load the CSV file
-    df = pd.read_csv(csv_path)
+    for df, scale, color in zip(runs, scales, colors):
+        # Plot pos_x vs time
+        plot_series(ax1, df['t'], df['pos_x'], color=color, label=f'pos_x (Scale {scale})')
+        # Plot pos_y vs time
+        plot_series(ax2, df['t'], df['pos_y'], color=color, label=f'pos_y (Scale {scale})')
 
-    # Plot pos_x vs time
-    ax1.plot(df['t'], df['pos_x'], color=color, label=f'pos_x (Scale {scale})')
-    # Plot pos_y vs time
-    ax2.plot(df['t'], df['pos_y'], color=color, label=f'pos_y (Scale {scale})')
+    # Add labels and legends for the combined plot
+    ax1.set_xlabel('Time (t)')
+    ax1.set_ylabel('pos_x')
+    ax1.legend()
+
+    ax2.set_xlabel('Time (t)')
+    ax2.set_ylabel('pos_y')
+    ax2.legend()
+
+    plt.tight_layout(rect=[0, 0, 1, 0.96])  # Adjust for the suptitle
+    finish_figure(fig, name, input_paths, params)
+
+
+def plot_positions(csv_paths, scales, slip, workers=None, baseline=None, envelope=False):
+    """
+    Plot pos_x and pos_y vs time for each scale and combined, loading every CSV once.
+
+    With a baseline scale (or envelope) the scales are also compared on a common time grid.
+    """
+    import matplotlib.pyplot as plt
+
+    names = [f'posXY_scale{scale}_slip{slip}' for scale in scales] + [f'posXY_combined_slip{slip}']
+    comparison = comparison_name('posXY', slip, baseline, envelope)
+    params = [list(scales), slip]
+    if figures_are_current(names + ([comparison] if comparison else []), csv_paths, params):
+        print("Figures are up to date, skipping")
+        return
+
+    # Load the two columns of every dataset once (concurrently) into one float32 store;
+    # all figures render from views of it
+    store = RunStore.load(csv_paths, ['pos_x', 'pos_y'], labels=scales, workers=workers)
+    runs = store.runs()
+
+    # Use a colormap for different scale values
+    colors = plt.cm.viridis(np.linspace(0, 1, len(scales)))
+
+    # Create a plot for each scale value
+    for df, scale, color, name in zip(runs, scales, colors, names):
+        create_plot(df, scale, color, name=name, input_paths=csv_paths, params=params, title=f'pos_x and pos_y vs Time (Scale {scale}, Slip = {slip})')
+
+    create_combined_plot(runs, scales, colors, slip, names[-1], csv_paths, params)
+
+    if comparison:
+        plot_comparison(store.resample(), ['pos_x', 'pos_y'], colors, f'pos_x and pos_y across Scales (Slip = {slip})', comparison,
+                        baseline, csv_paths, params)
+
+
+def main(argv=None, prog=None):
+    # Set up argument parsing
+    parser = argparse.ArgumentParser(prog=prog, description="Plot pos_x vs time and pos_y vs time for different scale values.")
+    parser.add_argument('--csv', nargs='+', help="Paths to CSV files", required=True)
+    parser.add_argument('--scale', nargs='+', type=float, help="Scale factors for each CSV file", required=True)
+    parser.add_argument('--slip', type=float, help="Constant slip value for all CSV files", required=True)
+    parser.add_argument('--workers', type=int, default=None, help="Number of threads used to load the CSV files")
+    add_comparison_arguments(parser)
+    add_cache_arguments(parser)
+    add_export_arguments(parser)
+    add_instrumentation_arguments(parser)
+    add_downsample_arguments(parser)
+
+    args = parser.parse_args(argv)
+    apply_cache_arguments(args)
+    apply_export_arguments(args)
+    apply_instrumentation_arguments(args)
+    apply_downsample_arguments(args)
+
+    # Check if the number of CSV files and scale factors match
+    if len(args.csv) != len(args.scale):
+        print("Error: The number of CSV files and scale factors must match.")
+        sys.exit(1)
+
+    if args.baseline is not None and args.baseline not in args.scale:
+        print(f"Error: --baseline {args.baseline} is not one of the --scale values.")
+        sys.exit(1)
 
-# Add labels and legends for the combined plot
-ax1.set_xlabel('Time (t)')
-ax1.set_ylabel('pos_x')
-ax1.legend()
+    plot_positions(args.csv, args.scale, args.slip, args.workers, args.baseline, args.envelope)
 
-ax2.set_xlabel('Time (t)')
-ax2.set_ylabel('pos_y')
-ax2.legend()
 
-plt.tight_layout(rect=[0, 0, 1, 0.96])  # Adjust for the suptitle
-plt.show()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
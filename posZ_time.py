@@ -1,47 +1,119 @@
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import argparse
+import sys
 
-# Set up argument parsing
-parser = argparse.ArgumentParser(description="Plot pos_z vs time for a given slip value with vertical lines at multiples of 1.47 seconds.")
-parser.add_argument('--csv', nargs='+', help="Paths to CSV files", required=True)
-parser.add_argument('--scale', nargs='+', type=float, help="Scale factors for each CSV file", required=True)
-parser.add_argument('--slip', type=float, help="Slip value for all CSV files", required=True)
+from data_cache import add_cache_arguments, apply_cache_arguments
+from downsample import add_downsample_arguments, apply_downsample_arguments, plot_series
+from figure_export import add_export_arguments, apply_export_arguments, figures_are_current, finish_figure
+from instrumentation import add_instrumentation_arguments, apply_instrumentation_arguments, stage
+from periodicity import PERIOD_METHODS, cycle_marks, periodicity_table
+from run_store import RunStore, add_comparison_arguments, comparison_name, plot_comparison
 
-args = parser.parse_args()
+# Columns whose dominant period is reported for every run
+PERIOD_TABLE_COLUMNS = ['pos_z', 'f_x', 'd_c']
 
-# Check if the number of CSV files and scale factors match
-if len(args.csv) != len(args.scale):
-    print("Error: The number of CSV files and scale factors must match.")
-    sys.exit(1)
 
-# Create a 2D plot
-plt.figure()
+def plot_pos_z(csv_paths, scales, slip, period=None, workers=None, method='fft', output_file=None, baseline=None,
+               envelope=False):
+    """
+    Plot pos_z vs time for each scale with its grouser cycles marked.
 
-# Use a colormap for different scale values
-colors = plt.cm.viridis(np.linspace(0, 1, len(args.scale)))
+    The dominant period of pos_z, f_x and d_c is detected per run and printed as a
+    per-scale table (optionally saved to output_file as CSV). Cycles are marked at
+    multiples of each run's detected pos_z period, or of period when one is given. With a
+    baseline scale (or envelope) the pos_z of the scales is also compared on a common time grid.
+    """
+    import matplotlib.pyplot as plt
 
-# Process each CSV file and plot pos_z vs time
-for csv_path, scale, color in zip(args.csv, args.scale, colors):
-    # Load the CSV file
-    df = pd.read_csv(csv_path)
+    name = f'posZ_slip{slip}'
+    comparison = comparison_name('posZ', slip, baseline, envelope)
+    params = [list(scales), slip, period, method]
+    if figures_are_current([name] + ([comparison] if comparison else []), csv_paths, params) and output_file is None:
+        print("Figure is up to date, skipping")
+        return
+
+    # Load the needed columns of every dataset once (concurrently) into one float32 store
+    store = RunStore.load(csv_paths, PERIOD_TABLE_COLUMNS, labels=scales, workers=workers)
+    runs = store.runs()
+
+    # Per-scale period and amplitude table
+    with stage("reduce", rows=len(store.t)):
+        table = periodicity_table(runs, PERIOD_TABLE_COLUMNS, labels=scales, method=method)
+    table = table.rename(columns={'label': 'scale'})
+    print(table.pivot(index='scale', columns='column', values=['period', 'amplitude']).to_string(float_format='%.4g'))
+    if output_file:
+        print(f"Saving period table to: {output_file}")
+        table.to_csv(output_file, index=False)
+    pos_z_periods = table[table['column'] == 'pos_z']['period'].to_numpy()
+    if period is not None:
+        pos_z_periods = np.full(len(runs), period)
+
+    # Create a 2D plot
+    fig = plt.figure()
+    ax = plt.gca()
+
+    # Use a colormap for different scale values
+    colors = plt.cm.viridis(np.linspace(0, 1, len(scales)))
 
     # Plot pos_z vs time (using the 't' column)
-    plt.plot(df['t'], df['pos_z'], color=color, label=f'Scale {scale}')
-
-# Add vertical red lines at multiples of 1.47 seconds and label them
-max_time = max([pd.read_csv(csv_path)['t'].max() for csv_path in args.csv])  # Find the maximum time across all files
-multiples = np.arange(0, max_time + 1.47, 1.47)  # Generate multiples of 1.47 seconds
-for multiple in multiples:
-    plt.axvline(x=multiple, color='red', linestyle='--', alpha=0.5)
-    plt.text(multiple, plt.ylim()[0], f'{multiple:.2f}', color='red', rotation=90, verticalalignment='bottom', horizontalalignment='right')
-
-# Add labels and legend
-plt.xlabel('Time (t)')
-plt.ylabel('pos_z')
-plt.title(f'pos_z vs Time (Slip = {args.slip})')
-plt.legend(title="Scale Factors")
-
-# Show the plot
-plt.show()
\ No newline at end of file
+    for df, scale, color, run_period in zip(runs, scales, colors, pos_z_periods):
+        plot_series(ax, df['t'], df['pos_z'], color=color, label=f'Scale {scale} (T = {run_period:.3f} s)')
+
+    # Mark every cycle of every run with one line collection in the run's color
+    marks = [cycle_marks(float(df['t'].min()), float(df['t'].max()), run_period)
+             for df, run_period in zip(runs, pos_z_periods)]
+    mark_colors = np.concatenate([np.repeat([color], len(times), axis=0) for color, times in zip(colors, marks)])
+    ax.vlines(np.concatenate(marks), 0, 1, transform=ax.get_xaxis_transform(), colors=mark_colors,
+              linestyles='--', alpha=0.3)
+
+    # Add labels and legend
+    plt.xlabel('Time (t)')
+    plt.ylabel('pos_z')
+    plt.title(f'pos_z vs Time (Slip = {slip})')
+    plt.legend(title="Scale Factors")
+
+    # Show or export the plot
+    finish_figure(fig, name, csv_paths, params)
+
+    if comparison:
+        plot_comparison(store.resample(['pos_z']), ['pos_z'], colors, f'pos_z across Scales (Slip = {slip})', comparison,
+                        baseline, csv_paths, params)
+
+
+def main(argv=None, prog=None):
+    # Set up argument parsing
+    parser = argparse.ArgumentParser(prog=prog, description="Plot pos_z vs time for a given slip value with its detected grouser cycles marked.")
+    parser.add_argument('--csv', nargs='+', help="Paths to CSV files", required=True)
+    parser.add_argument('--scale', nargs='+', type=float, help="Scale factors for each CSV file", required=True)
+    parser.add_argument('--slip', type=float, help="Slip value for all CSV files", required=True)
+    parser.add_argument('--workers', type=int, default=None, help="Number of threads used to load the CSV files")
+    parser.add_argument('--period', type=float, default=None, help="Mark multiples of this period (s) instead of the detected one")
+    parser.add_argument('--method', default='fft', choices=PERIOD_METHODS, help="Period detection method")
+    parser.add_argument('--save-periods', default=None, help="Save the per-scale period table to this CSV file")
+    add_comparison_arguments(parser)
+    add_cache_arguments(parser)
+    add_export_arguments(parser)
+    add_instrumentation_arguments(parser)
+    add_downsample_arguments(parser)
+
+    args = parser.parse_args(argv)
+    apply_cache_arguments(args)
+    apply_export_arguments(args)
+    apply_instrumentation_arguments(args)
+    apply_downsample_arguments(args)
+
+    # Check if the number of CSV files and scale factors match
+    if len(args.csv) != len(args.scale):
+        print("Error: The number of CSV files and scale factors must match.")
+        sys.exit(1)
+
+    if args.baseline is not None and args.baseline not in args.scale:
+        print(f"Error: --baseline {args.baseline} is not one of the --scale values.")
+        sys.exit(1)
+
+    plot_pos_z(args.csv, args.scale, args.slip, args.period, args.workers, args.method, args.save_periods, args.baseline,
+               args.envelope)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import json
+import os
+
+import numpy as np
+
+from bootstrap import error_bars
+
+# Directory of these scripts, holding TerramuleData and the default registry whatever the working directory
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Default registry file, created next to TerramuleData
+REGISTRY_FILE_NAME = "reference_curves.npz"
+DEFAULT_REGISTRY_PATH = os.path.join(DATA_DIR, REGISTRY_FILE_NAME)
+
+# Curves the registry is seeded with. Slips are stored as published; the plotted slip in
+# percent is slip * slip_scale + offset (the hand-applied mass adjustments).
+BUILTIN_CURVES = [
+    {"name": "SIM-TERRA-GRC1, Adjusted", "kind": "simulation", "terrain": "GRC-1", "gravity": "earth",
+     "offset": 11.0, "slip_scale": 1.0,
+     "slip": [-11, 4, 19, 30, 37], "drawbar": [0, 0.3, 0.5, 0.6, 0.7]},
+    {"name": "SIM-MR-EARTH-GRC1, Adjusted", "kind": "simulation", "terrain": "GRC-1", "gravity": "earth",
+     "offset": -15.68, "slip_scale": 1.0,
+     "slip": [15.68, 15.69, 18.08, 21.33, 26.54, 29.50, 32.75, 39.74, 45.48, 46.90, 58.34],
+     "drawbar": [0, 0.0125, 0.025, 0.0375, 0.05, 0.1, 0.15, 0.20, 0.25, 0.3, 0.5]},
+    {"name": "SIM-MR-MOON-GRC1, Adjusted", "kind": "simulation", "terrain": "GRC-1", "gravity": "moon",
+     "offset": 2.86, "slip_scale": 1.0,
+     "slip": [-2.86, 0.82, 5.35, 8.86, 17.42, 24.24, 28.10, 33.3, 48.77],
+     "drawbar": [0, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5]},
+    {"name": "EXP-MR-EARTH-BEST90, Adjusted", "kind": "experiment", "terrain": "BEST-90", "gravity": "earth",
+     "offset": 0.0, "slip_scale": 100.0,
+     "slip": [-0.01377441834, 0.04254638267, 0.09886718369, 0.1551879847, 0.2115087857, 0.2678295868],
+     "drawbar": [-0.02065071089, 0.06378585476, 0.126498084, 0.1628421714, 0.1764346278, 0.194016305],
+     # Published error bars (below, above) per point
+     "below": [0.002151173, 0.003802956, 0.004441608, 0.002379257, 0.005570809, 0.003275811],
+     "above": [0.00191919, 0.006234711, 0.007362803, 0.002437128, 0.006661601, 0.00297384]},
+]
+
+# Physical Terramule measurements imported from their CSV files when the registry is built
+TERRAMULE_CSVS = [
+    ("PHY-TERRA-FILLITE", os.path.join(DATA_DIR, "TerramuleData", "Fillite.csv"), "fillite"),
+    ("PHY-TERRA-SAND", os.path.join(DATA_DIR, "TerramuleData", "Sand.csv"), "sand"),
+]
+
+# Registries loaded in this process: absolute path -> (mtime_ns, ReferenceRegistry)
+_loaded = {}
+
+
+class ReferenceRegistry:
+    """
+    Named slip vs drawbar curves with their metadata, kept in one .npz file.
+
+    All points live in flat slip / drawbar / low / high arrays (low and high are NaN
+    without error bars) with per-curve start offsets; the metadata (name, kind, terrain,
+    gravity, offset, slip_scale, source ...) is stored as JSON.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.metadata = []
+        self.starts = np.zeros(1, dtype=np.int64)
+        self.slip = np.empty(0)
+        self.drawbar = np.empty(0)
+        self.low = np.empty(0)
+        self.high = np.empty(0)
+
+    @classmethod
+    def load(cls, path):
+        registry = cls(path)
+        with np.load(path) as data:
+            registry.metadata = json.loads(str(data["metadata"]))
+            registry.starts = data["starts"]
+            registry.slip, registry.drawbar = data["slip"], data["drawbar"]
+            registry.low, registry.high = data["low"], data["high"]
+        return registry
+
+    def save(self, path=None):
+        self.path = path or self.path
+        with open(self.path, "wb") as fp:
+            np.savez_compressed(fp, metadata=np.array(json.dumps(self.metadata)), starts=self.starts,
+                                slip=self.slip, drawbar=self.drawbar, low=self.low, high=self.high)
+        _loaded.pop(os.path.abspath(self.path), None)
+
+    def names(self, **metadata):
+        """Curve names, optionally only those whose metadata matches, e.g. names(kind="batch")."""
+        return [meta["name"] for meta in self.metadata
+                if all(meta.get(key) == value for key, value in metadata.items())]
+
+    def _index(self, name):
+        for index, meta in enumerate(self.metadata):
+            if meta["name"] == name:
+                return index
+        raise KeyError(f"No reference curve named {name!r}")
+
+    def curve(self, name):
+        """
+        One curve with its offset applied.
+
+        Returns:
+            dict: metadata plus "slip" (percent), "drawbar", "low" and "high" arrays.
+        """
+        index = self._index(name)
+        meta = self.metadata[index]
+        points = slice(self.starts[index], self.starts[index + 1])
+        return dict(meta, slip=self.slip[points] * meta.get("slip_scale", 1.0) + meta.get("offset", 0.0),
+                    drawbar=self.drawbar[points], low=self.low[points], high=self.high[points])
+
+    def add(self, name, slip, drawbar, low=None, high=None, **metadata):
+        """Add a curve, replacing any curve of the same name."""
+        if name in self.names():
+            self.remove(name)
+        slip = np.asarray(slip, dtype=np.float64)
+        nan = np.full(len(slip), np.nan)
+        self.metadata.append(dict(metadata, name=name))
+        self.slip = np.concatenate([self.slip, slip])
+        self.drawbar = np.concatenate([self.drawbar, np.asarray(drawbar, dtype=np.float64)])
+        self.low = np.concatenate([self.low, nan if low is None else np.asarray(low, dtype=np.float64)])
+        self.high = np.concatenate([self.high, nan if high is None else np.asarray(high, dtype=np.float64)])
+        self.starts = np.append(self.starts, len(self.slip))
+
+    def remove(self, name):
+        index = self._index(name)
+        keep = np.ones(len(self.slip), dtype=bool)
+        keep[self.starts[index]:self.starts[index + 1]] = False
+        lengths = np.delete(np.diff(self.starts), index)
+        del self.metadata[index]
+        self.slip, self.drawbar = self.slip[keep], self.drawbar[keep]
+        self.low, self.high = self.low[keep], self.high[keep]
+        self.starts = np.concatenate([[0], np.cumsum(lengths)])
+
+    def plot(self, ax, names=None):
+        """Draw curves (all by default) in their kind's style: experiments with error bars."""
+        for name in self.names() if names is None else names:
+            curve = self.curve(name)
+            if curve.get("kind") == "physical":
+                ax.plot(curve["slip"], curve["drawbar"], label=name)
+            elif not np.isnan(curve["low"]).all():
+                linestyle = "-" if curve.get("kind") == "experiment" else "--"
+                ax.errorbar(curve["slip"], curve["drawbar"], yerr=error_bars(curve["drawbar"], curve["low"], curve["high"]),
+                            marker=".", linestyle=linestyle, capsize=3 if curve.get("kind") == "batch" else 0, label=name)
+            else:
+                ax.plot(curve["slip"], curve["drawbar"], marker=".", linestyle="--", label=name)
+
+
+def build_registry(path=DEFAULT_REGISTRY_PATH):
+    """Create a registry seeded with the Terramule measurements (when present) and BUILTIN_CURVES."""
+    registry = ReferenceRegistry(path)
+    for name, csv_path, terrain in TERRAMULE_CSVS:
+        if not os.path.exists(csv_path):
+            print(f"Skipping {name}: {csv_path} does not exist")
+            continue
+        data = np.genfromtxt(csv_path, delimiter=",", skip_header=1, names=["slip", "drawbar"])
+        registry.add(name, data["slip"], data["drawbar"], kind="physical", terrain=terrain, gravity="earth",
+                     offset=0.0, slip_scale=1.0, source=csv_path)
+    for curve in BUILTIN_CURVES:
+        curve = dict(curve)
+        drawbar = np.asarray(curve.pop("drawbar"), dtype=np.float64)
+        below, above = curve.pop("below", None), curve.pop("above", None)
+        low = None if below is None else drawbar - below
+        high = None if above is None else drawbar + above
+        registry.add(curve.pop("name"), curve.pop("slip"), drawbar, low, high, **curve)
+    registry.save()
+    print(f"Created reference curve registry: {path}")
+    return registry
+
+
+def load_registry(path=DEFAULT_REGISTRY_PATH):
+    """
+    The registry at path, built on first use and loaded once per process.
+
+    Later calls return the in-memory copy until the file changes on disk.
+    """
+    if not os.path.exists(path):
+        build_registry(path)
+    key = os.path.abspath(path)
+    mtime_ns = os.stat(path).st_mtime_ns
+    if key not in _loaded or _loaded[key][0] != mtime_ns:
+        _loaded[key] = (mtime_ns, ReferenceRegistry.load(path))
+    return _loaded[key][1]
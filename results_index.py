@@ -0,0 +1,128 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+# Default index file name, created inside the batch main folder
+INDEX_FILE_NAME = "results_index.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    subfolder TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    params_hash TEXT NOT NULL,
+    csv_size INTEGER NOT NULL,
+    csv_mtime_ns INTEGER NOT NULL,
+    slip REAL NOT NULL,
+    mean_d_c REAL NOT NULL,
+    computed_at REAL NOT NULL,
+    ci_low REAL,
+    ci_high REAL,
+    confidence REAL,
+    PRIMARY KEY (subfolder, start_time, end_time)
+)
+"""
+
+# Columns added after the first schema; older index files are migrated on open
+_ADDED_COLUMNS = {"ci_low": "REAL", "ci_high": "REAL", "confidence": "REAL"}
+
+
+def run_fingerprint(subdir_path):
+    """
+    Identify the current state of a wheel test subfolder.
+
+    Returns:
+        tuple: (sha1 of params.json, output.csv size, output.csv mtime in ns)
+    """
+    with open(os.path.join(subdir_path, "params.json"), "rb") as fp:
+        params_hash = hashlib.sha1(fp.read()).hexdigest()
+    stat = os.stat(os.path.join(subdir_path, "output.csv"))
+    return params_hash, stat.st_size, stat.st_mtime_ns
+
+
+class ResultsIndex:
+    """
+    Persistent SQLite index of per-run batch results.
+
+    Rows are keyed by subfolder and analysis window and remember the params.json hash
+    and output.csv size/mtime they were computed from, so unchanged runs are never
+    recomputed and results of past sweeps can be queried without touching the CSVs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(_SCHEMA)
+        existing = {row[1] for row in self.connection.execute("PRAGMA table_info(runs)")}
+        for column, column_type in _ADDED_COLUMNS.items():
+            if column not in existing:
+                self.connection.execute(f"ALTER TABLE runs ADD COLUMN {column} {column_type}")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def lookup(self, subdir_path, start_time, end_time, confidence=None):
+        """
+        Return the stored (slip, mean_d_c, ci_low, ci_high) if the run is unchanged since it
+        was indexed (and its interval was computed at this confidence, when given), else None.
+        """
+        try:
+            fingerprint = run_fingerprint(subdir_path)
+        except OSError:
+            return None
+        row = self.connection.execute(
+            "SELECT params_hash, csv_size, csv_mtime_ns, slip, mean_d_c, ci_low, ci_high, confidence FROM runs "
+            "WHERE subfolder = ? AND start_time = ? AND end_time = ?",
+            (os.path.abspath(subdir_path), float(start_time), float(end_time)),
+        ).fetchone()
+        if row is None or tuple(row[:3]) != fingerprint:
+            return None
+        if confidence is not None and row[7] != float(confidence):
+            return None
+        return row[3], row[4], row[5], row[6]
+
+    def store(self, subdir_path, start_time, end_time, slip, mean_d_c, fingerprint=None,
+              ci_low=None, ci_high=None, confidence=None):
+        """Record a computed result (fingerprint defaults to the subfolder's current state)."""
+        params_hash, csv_size, csv_mtime_ns = fingerprint or run_fingerprint(subdir_path)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO runs (subfolder, start_time, end_time, params_hash, csv_size, csv_mtime_ns, "
+            "slip, mean_d_c, computed_at, ci_low, ci_high, confidence) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (os.path.abspath(subdir_path), float(start_time), float(end_time), params_hash,
+             csv_size, csv_mtime_ns, float(slip), float(mean_d_c), time.time(), ci_low, ci_high, confidence),
+        )
+        self.connection.commit()
+
+    def query(self, start_time=None, end_time=None, main_folder=None):
+        """
+        Slip vs drawbar results stored in the index, ordered by slip.
+
+        Parameters:
+            start_time, end_time (float): Restrict to one analysis window.
+            main_folder (str): Restrict to subfolders of this sweep folder.
+
+        Returns:
+            list: (subfolder, start_time, end_time, slip, mean_d_c, ci_low, ci_high) tuples;
+            the interval bounds are None for results indexed without one.
+        """
+        sql = "SELECT subfolder, start_time, end_time, slip, mean_d_c, ci_low, ci_high FROM runs WHERE 1 = 1"
+        args = []
+        if start_time is not None:
+            sql += " AND start_time = ?"
+            args.append(float(start_time))
+        if end_time is not None:
+            sql += " AND end_time = ?"
+            args.append(float(end_time))
+        if main_folder is not None:
+            sql += " AND subfolder LIKE ?"
+            args.append(os.path.join(os.path.abspath(main_folder), "%"))
+        sql += " ORDER BY slip, subfolder"
+        return self.connection.execute(sql, args).fetchall()
@@ -0,0 +1,299 @@
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from data_cache import cache_enabled, read_cached_columns
+from data_loader import load_columns
+from downsample import fill_band, plot_series
+from figure_export import finish_figure
+from instrumentation import stage
+from schemas import Schema
+
+# Samples of a common grid at most (the grid spacing is coarsened beyond that)
+MAX_GRID_SAMPLES = 2**20
+
+# Bytes read per block when counting the rows of an uncached file
+COUNT_BLOCK_SIZE = 8 * 1024**2
+
+
+def _open_run(file_path, columns, names, dtype):
+    """Columns of one run: memory-mapped from the column cache when possible, else parsed as dtype."""
+    if cache_enabled():
+        arrays, missing = read_cached_columns(file_path, columns, names, mmap_mode='r')
+        if not missing:
+            return arrays
+    data = load_columns(file_path, columns=columns, names=names, dtype=dtype)
+    return {column: data[column].to_numpy() for column in columns}
+
+
+def _row_count(file_path, names, time_column):
+    """
+    Number of data rows of a run, without parsing it.
+
+    Taken from the cached time column when present, otherwise by counting the lines of
+    the file in fixed-size blocks (minus the header and trailing blank lines).
+    """
+    if cache_enabled():
+        arrays, missing = read_cached_columns(file_path, [time_column], names, mmap_mode='r')
+        if not missing:
+            return len(arrays[time_column])
+
+    lines, last = 0, b"\n"
+    with open(file_path, "rb") as fp:
+        for block in iter(lambda: fp.read(COUNT_BLOCK_SIZE), b""):
+            lines += block.count(b"\n")
+            last = block
+    if not last.endswith(b"\n"):
+        # An unterminated last line is a row
+        lines += 1
+    else:
+        # Blank lines after the last row are not
+        lines -= last[len(last.rstrip(b"\r\n")):].count(b"\n") - 1
+
+    has_header = names.layout(file_path).has_header if isinstance(names, Schema) else True
+    return max(lines - has_header, 0)
+
+
+class RunStore:
+    """
+    The same few columns of many runs, packed into one shared buffer.
+
+    data holds the data columns as a contiguous (columns, total rows) float32 array in
+    which run i occupies rows offsets[i]:offsets[i + 1]. The time column is kept as a
+    parallel float64 array (like everywhere else, so long runs keep their time
+    resolution). Per-run access returns views, and a column of every run is a single
+    array, so element-wise work (e.g. the drawbar coefficient) is one call over all runs.
+    """
+
+    def __init__(self, columns, data, t, offsets, labels=None, paths=None, time_column='t'):
+        self.columns = list(columns)
+        self.time_column = time_column
+        self.data = data
+        self.t = t
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.labels = list(range(len(self.offsets) - 1)) if labels is None else list(labels)
+        self.paths = list(paths or [])
+
+    @classmethod
+    def load(cls, file_paths, columns, labels=None, names=None, dtype=np.float32, workers=None, time_column='t'):
+        """
+        Load the requested columns of several CSV files into one store.
+
+        Files are opened concurrently on a thread pool (one thread per file, up to the CPU
+        count, when workers is None). The buffer is sized from the row counts up front and
+        every thread copies its run straight into its slice, so besides the buffer at most
+        one parsed run per thread is held. With the column cache enabled runs are
+        memory-mapped instead of parsed; otherwise each run is parsed as dtype.
+
+        Parameters:
+            file_paths (list): Paths to the CSV files.
+            columns (list): Data columns to keep (the time column is always kept).
+            labels (list): One label per run, e.g. its scale value. Defaults to the run index.
+            names: Schema or positional column names of the files (see load_columns).
+        """
+        file_paths = list(file_paths)
+        columns = [column for column in columns if column != time_column]
+        wanted = [time_column] + columns
+
+        # Size the shared buffer first, so each run is written straight into its slice
+        offsets = np.concatenate([[0], np.cumsum([_row_count(path, names, time_column) for path in file_paths])])
+        offsets = offsets.astype(np.int64)
+        data = np.empty((len(columns), offsets[-1]), dtype=dtype)
+        t = np.empty(offsets[-1])
+
+        def pack(index):
+            run = _open_run(file_paths[index], wanted, names, dtype)
+            rows = slice(offsets[index], offsets[index + 1])
+            if len(run[time_column]) != rows.stop - rows.start:
+                raise ValueError(f"{file_paths[index]}: read {len(run[time_column])} rows, "
+                                 f"counted {rows.stop - rows.start}")
+            t[rows] = run[time_column]
+            for row, column in enumerate(columns):
+                data[row, rows] = run[column]
+
+        # At most one parsed run per loader thread exists at a time
+        if workers is None:
+            workers = min(len(file_paths), os.cpu_count() or 1)
+        with stage("parse", "run_store"):
+            if workers <= 1 or len(file_paths) <= 1:
+                for index in range(len(file_paths)):
+                    pack(index)
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    list(executor.map(pack, range(len(file_paths))))
+        return cls(columns, data, t, offsets, labels, file_paths, time_column)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.t.nbytes
+
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def column(self, column):
+        """One column of every run, concatenated (a view into the shared buffer)."""
+        return self.t if column == self.time_column else self.data[self.columns.index(column)]
+
+    def run(self, index):
+        """
+        Views of the columns of one run.
+
+        Returns:
+            dict: The time column plus every data column, indexable like a DataFrame of load_columns.
+        """
+        rows = slice(self.offsets[index], self.offsets[index + 1])
+        run = {self.time_column: self.t[rows]}
+        run.update((column, values[rows]) for column, values in zip(self.columns, self.data))
+        return run
+
+    def runs(self):
+        return [self.run(index) for index in range(len(self))]
+
+    def derived(self, arrays):
+        """
+        A store of other columns over the same runs, sharing this store's time column.
+
+        Parameters:
+            arrays (dict): column -> one value per row of every run (see column()), e.g.
+                a coefficient computed from this store's columns in one call.
+        """
+        data = np.empty((len(arrays), self.offsets[-1]), dtype=self.data.dtype)
+        for row, values in enumerate(arrays.values()):
+            data[row] = values
+        return RunStore(list(arrays), data, self.t, self.offsets, self.labels, self.paths, self.time_column)
+
+    def resample(self, columns=None, dt=None, span='overlap', max_samples=MAX_GRID_SAMPLES):
+        """
+        Interpolate columns of every run onto one uniform time grid.
+
+        Parameters:
+            columns (list): Columns to resample (all data columns by default).
+            dt (float): Grid spacing (s). Defaults to the coarsest median sample spacing of
+                the runs, coarsened further to keep the grid within max_samples.
+            span (str): 'overlap' spans the time range every run covers; 'union' spans all
+                of them, with NaN where a run has no samples.
+
+        Returns:
+            RunGrid: (runs x samples) float32 matrices on the common grid.
+        """
+        columns = list(self.columns if columns is None else columns)
+        starts = self.t[self.offsets[:-1]]
+        stops = self.t[self.offsets[1:] - 1]
+        if span == 'overlap':
+            start, stop = starts.max(), stops.min()
+        elif span == 'union':
+            start, stop = starts.min(), stops.max()
+        else:
+            raise ValueError(f"Unknown span {span!r}, expected 'overlap' or 'union'")
+        if stop <= start:
+            raise ValueError(f"The runs share no time range ({start:g} to {stop:g} s)")
+        if dt is None:
+            dt = max(float(np.median(np.diff(self.t[self.offsets[index]:self.offsets[index + 1]])))
+                     for index in range(len(self)))
+            dt = max(dt, (stop - start) / (max_samples - 1))
+
+        # The tolerance keeps the last sample when the span is a whole number of steps
+        grid = start + dt * np.arange(int((stop - start) / dt * (1 + 1e-9)) + 1)
+        matrices = {}
+        with stage("reduce", "resample", rows=len(grid) * len(self) * len(columns)):
+            for column in columns:
+                values = self.column(column)
+                matrix = np.empty((len(self), len(grid)), dtype=self.data.dtype)
+                for index in range(len(self)):
+                    rows = slice(self.offsets[index], self.offsets[index + 1])
+                    matrix[index] = np.interp(grid, self.t[rows], values[rows], left=np.nan, right=np.nan)
+                matrices[column] = matrix
+        return RunGrid(grid, matrices, self.labels)
+
+
+class RunGrid:
+    """
+    Columns of several runs on one time grid: matrices[column] has shape (runs, samples).
+
+    Cross-run operations are single vectorized reductions over the run axis that ignore
+    NaN (no samples, or an undefined value such as the drawbar coefficient at f_z ~ 0).
+    """
+
+    def __init__(self, t, matrices, labels):
+        self.t = t
+        self.matrices = matrices
+        self.labels = list(labels)
+
+    def __getitem__(self, column):
+        return self.matrices[column]
+
+    def index(self, label):
+        """Row of the run with this label (e.g. a scale value)."""
+        if label not in self.labels:
+            raise KeyError(f"No run labeled {label!r}; runs are {self.labels}")
+        return self.labels.index(label)
+
+    def difference(self, column, baseline):
+        """Every run minus the run labeled baseline."""
+        matrix = self.matrices[column]
+        return matrix - matrix[self.index(baseline)]
+
+    def envelope(self, column):
+        """(lowest, highest) value over the runs at each grid time."""
+        matrix = self.matrices[column]
+        with warnings.catch_warnings():
+            # Times where no run has a value stay NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanmin(matrix, axis=0), np.nanmax(matrix, axis=0)
+
+    def mean(self, column):
+        """Mean over the runs at each grid time."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanmean(self.matrices[column], axis=0)
+
+
+def add_comparison_arguments(parser):
+    """Add the --baseline / --envelope cross-scale comparison options to an argparse parser."""
+    parser.add_argument('--baseline', type=float, default=None,
+                        help="Also plot every scale's difference from this scale on a common time grid")
+    parser.add_argument('--envelope', action='store_true',
+                        help="Also plot the range and mean over all scales on a common time grid")
+
+
+def comparison_name(prefix, slip, baseline=None, envelope=False):
+    """Name of the cross-scale comparison figure, or None when neither is requested."""
+    if baseline is not None:
+        return f'{prefix}_vs_scale{baseline}_slip{slip}'
+    return f'{prefix}_envelope_slip{slip}' if envelope else None
+
+
+def plot_comparison(grid, columns, colors, title, name, baseline=None, input_paths=(), params=None):
+    """
+    One subplot per column comparing the runs of a RunGrid.
+
+    With a baseline label every other run is drawn as its difference from the baseline
+    run; otherwise the envelope (min to max over the runs) is shaded around their mean.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(len(columns), 1, figsize=(10, 4 * len(columns)), squeeze=False)
+    fig.suptitle(title, fontsize=16)
+    for ax, column in zip(axes[:, 0], columns):
+        if baseline is not None:
+            differences = grid.difference(column, baseline)
+            for label, values, color in zip(grid.labels, differences, colors):
+                if label != baseline:
+                    plot_series(ax, grid.t, values, color=color, label=f'Scale {label} - Scale {baseline}')
+            ax.axhline(0, color='black', linewidth=0.8)
+            ax.set_ylabel(f'{column} difference')
+        else:
+            low, high = grid.envelope(column)
+            fill_band(ax, grid.t, low, high, color='tab:blue', alpha=0.25, label=f'Range of {len(grid.labels)} scales')
+            plot_series(ax, grid.t, grid.mean(column), color='tab:blue', label='Mean')
+            ax.set_ylabel(column)
+        ax.set_xlabel('Time (t)')
+        ax.legend()
+
+    plt.tight_layout(rect=[0, 0, 1, 0.96])  # Adjust for the suptitle
+    finish_figure(fig, name, input_paths, params)
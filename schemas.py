@@ -0,0 +1,129 @@
+import os
+
+# Column layout written by the Chrono rover simulation
+CHRONO_COLUMNS = [
+    't', 'posX', 'posY', 'posZ', 'velX', 'velY', 'velZ',
+    'quatE0', 'quatE1', 'quatE2', 'quatE3',
+    'torqueLF', 'torqueRF', 'torqueLB', 'torqueRB', 'slip'
+]
+
+# Column layout written by the single wheel test rig / simulation
+SINGLE_WHEEL_COLUMNS = [
+    't', 'f_x', 'f_y', 'f_z', 'd_c', 'v_max',
+    'pos_x', 'pos_y', 'pos_z',
+    'oriq_x', 'oriq_y', 'oriq_z', 'oriq_w',
+    'vel_x', 'vel_y', 'vel_z'
+]
+
+# Resolved layouts: (absolute path, schema name) -> (mtime_ns, Layout)
+_layouts = {}
+
+
+def read_header(file_path):
+    """
+    First line of a CSV split into stripped fields.
+
+    Returns:
+        tuple: (fields, padded) where padded tells whether fields of the first two lines
+        are separated by ", " (such files need skipinitialspace).
+    """
+    with open(file_path, "rb") as fp:
+        first, second = fp.readline().decode(), fp.readline().decode()
+    fields = [field.strip() for field in first.rstrip("\r\n").split(",")]
+    return fields, ", " in first or ", " in second
+
+
+def _is_number(field):
+    try:
+        float(field)
+    except ValueError:
+        return False
+    return True
+
+
+class Layout:
+    """
+    How the fields of one file map onto a schema.
+
+    labels holds one unique label per field: the schema column read from that field, or
+    _fieldN for fields the schema does not know (they are never parsed).
+    """
+
+    def __init__(self, labels, has_header, positional=False, extra=()):
+        self.labels = list(labels)
+        self.has_header = has_header
+        self.positional = positional
+        self.extra = list(extra)
+
+
+class Schema:
+    """
+    A known simulation output layout.
+
+    Iterates like its column list, so it can be passed wherever the positional names
+    list used to go (load_columns, SeriesStore.open, cache keys).
+    """
+
+    def __init__(self, name, columns, aliases=None):
+        self.name = name
+        self.columns = list(columns)
+        self.aliases = dict(aliases or {})
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __repr__(self):
+        return f"Schema({self.name!r})"
+
+    def match(self, fields, file_path="<header>"):
+        """
+        Layout of a file whose first line has these fields.
+
+        Columns are mapped by name when the header names every schema column (extra
+        columns are skipped). A header-less file, or an unnamed header of exactly the
+        schema's width, is read by position. Anything else raises ValueError instead of
+        silently mislabeling the data.
+        """
+        if all(_is_number(field) for field in fields):
+            if len(fields) != len(self.columns):
+                raise ValueError(f"{file_path}: {len(fields)} fields without a header, "
+                                 f"the {self.name} layout has {len(self.columns)}")
+            return Layout(self.columns, has_header=False, positional=True)
+
+        names = [self.aliases.get(field, field) for field in fields]
+        if set(self.columns) <= set(names):
+            labels = [name if name in self.columns and names.index(name) == position else f"_field{position}"
+                      for position, name in enumerate(names)]
+            extra = [field for field, name in zip(fields, names) if name not in self.columns]
+            return Layout(labels, has_header=True, extra=extra)
+
+        if len(fields) == len(self.columns):
+            return Layout(self.columns, has_header=True, positional=True)
+
+        missing = [column for column in self.columns if column not in names]
+        raise ValueError(f"{file_path}: header does not match the {self.name} layout "
+                         f"({len(fields)} fields, {len(self.columns)} expected; missing {missing})")
+
+    def layout(self, file_path):
+        """Validate the header of file_path once (until the file changes) and return its Layout."""
+        key = (os.path.abspath(file_path), self.name)
+        mtime_ns = os.stat(file_path).st_mtime_ns
+        cached = _layouts.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        fields, _ = read_header(file_path)
+        layout = self.match(fields, file_path)
+        if layout.extra:
+            print(f"{file_path}: skipping columns not in the {self.name} layout: {layout.extra}")
+        elif layout.positional and layout.has_header:
+            print(f"{file_path}: header does not name the {self.name} columns, reading them by position")
+        _layouts[key] = (mtime_ns, layout)
+        return layout
+
+
+CHRONO_SCHEMA = Schema("chrono", CHRONO_COLUMNS, aliases={"time": "t"})
+SINGLE_WHEEL_SCHEMA = Schema("single_wheel", SINGLE_WHEEL_COLUMNS, aliases={"time": "t"})
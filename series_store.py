@@ -0,0 +1,79 @@
+import numpy as np
+
+from data_cache import cache_enabled, read_cached_columns
+from data_loader import load_columns
+from instrumentation import stage
+
+
+class SeriesStore:
+    """
+    Columns of one simulation output, indexed by a sorted time column.
+
+    Windows are located with a binary search on the time column and returned as
+    zero-copy views, so windowed reductions cost O(log n + window). When the parsed
+    column cache is enabled the columns are memory-mapped from it rather than
+    loaded into memory.
+    """
+
+    def __init__(self, columns, time_column='t'):
+        self.columns = columns
+        self.time_column = time_column
+        self.t = columns[time_column]
+
+    @classmethod
+    def open(cls, file_path, columns, names=None, time_column='t', end_time=None):
+        """
+        Open the requested columns of a simulation CSV.
+
+        Parameters:
+            file_path (str): Path to the CSV file.
+            columns (list): Columns to expose (the time column is always included).
+            names: Schema of the file (e.g. SINGLE_WHEEL_SCHEMA) or positional column names
+                replacing the file header (see load_columns).
+            time_column (str): Name of the sorted time column.
+            end_time (float): Stop parsing past this time when the cache is disabled.
+        """
+        wanted = list(columns)
+        if time_column not in wanted:
+            wanted.insert(0, time_column)
+
+        with stage("parse", file_path, source="mmap") as event:
+            if cache_enabled():
+                arrays, missing = read_cached_columns(file_path, wanted, names, mmap_mode='r')
+            else:
+                arrays, missing = {}, wanted
+            if missing:
+                # First access parses (and caches) the columns; later opens are memory-mapped
+                data = load_columns(file_path, columns=missing, names=names, time_column=time_column,
+                                    end_time=None if cache_enabled() else end_time)
+                arrays.update({column: data[column].to_numpy() for column in missing})
+            event["rows"] = len(arrays[time_column])
+        return cls(arrays, time_column)
+
+    def __len__(self):
+        return len(self.t)
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def window_slice(self, start_time=None, end_time=None):
+        """Slice of rows with start_time <= t <= end_time (either bound may be None)."""
+        start = 0 if start_time is None else int(np.searchsorted(self.t, start_time, side='left'))
+        stop = len(self.t) if end_time is None else int(np.searchsorted(self.t, end_time, side='right'))
+        return slice(start, max(start, stop))
+
+    def window(self, column, start_time=None, end_time=None):
+        """Zero-copy view of a column over [start_time, end_time]."""
+        return self.columns[column][self.window_slice(start_time, end_time)]
+
+    def window_mean(self, column, start_time=None, end_time=None):
+        return float(np.mean(self.window(column, start_time, end_time)))
+
+    def window_max(self, column, start_time=None, end_time=None):
+        return float(np.max(self.window(column, start_time, end_time)))
+
+    def window_min(self, column, start_time=None, end_time=None):
+        return float(np.min(self.window(column, start_time, end_time)))
+
+    def window_std(self, column, start_time=None, end_time=None):
+        return float(np.std(self.window(column, start_time, end_time)))
@@ -0,0 +1,208 @@
+import numpy as np
+
+SMOOTHING_METHODS = ['moving_average', 'savgol', 'exponential', 'none']
+
+
+class StreamingFilter:
+    """
+    Base class for smoothing filters that process a series chunk by chunk.
+
+    process(chunk) returns the outputs that are complete so far (centered filters
+    emit each sample once the samples after it have arrived) and flush() returns the
+    rest. Concatenating every process() result and the flush() result gives one
+    output per input sample, aligned with the input.
+    """
+
+    def process(self, chunk):
+        raise NotImplementedError
+
+    def flush(self):
+        return np.empty(0)
+
+    def apply(self, y, chunksize=None):
+        """Filter a whole series (in chunks of chunksize when given)."""
+        y = np.asarray(y, dtype=np.float64)
+        chunksize = chunksize or max(len(y), 1)
+        parts = [self.process(y[start:start + chunksize]) for start in range(0, len(y), chunksize)]
+        parts.append(self.flush())
+        return np.concatenate(parts)
+
+
+class _ForwardFill:
+    """Replace NaN samples by the last valid value seen, across chunks."""
+
+    def __init__(self):
+        self.last = np.nan
+
+    def __call__(self, chunk):
+        valid = ~np.isnan(chunk)
+        if valid.all():
+            if len(chunk):
+                self.last = chunk[-1]
+            return chunk
+        indices = np.where(valid, np.arange(len(chunk)), -1)
+        np.maximum.accumulate(indices, out=indices)
+        filled = np.where(indices >= 0, chunk[np.maximum(indices, 0)], self.last)
+        if len(filled):
+            self.last = filled[-1]
+        return filled
+
+
+class MovingAverage(StreamingFilter):
+    """
+    Centered moving average with O(1) work per sample from running (prefix) sums.
+
+    Matches pandas rolling(window_size, center=True, min_periods=1).mean(): windows are
+    truncated at the ends of the series and NaN samples are skipped.
+    """
+
+    def __init__(self, window_size=5):
+        if window_size < 1:
+            raise ValueError("window_size must be at least 1")
+        self.after = (window_size - 1) // 2
+        self.before = window_size - 1 - self.after
+        self._buffer = np.empty(0)
+        self._buffer_start = 0  # Global index of _buffer[0]
+        self._seen = 0
+        self._next = 0  # Global index of the next output
+
+    def _emit(self, stop):
+        """Outputs for centers [_next, stop) from the buffered samples."""
+        values = np.nan_to_num(self._buffer, nan=0.0)
+        sums = np.concatenate([[0.0], np.cumsum(values)])
+        counts = np.concatenate([[0], np.cumsum(~np.isnan(self._buffer))])
+
+        centers = np.arange(self._next, stop)
+        lo = np.maximum(centers - self.before, 0) - self._buffer_start
+        hi = np.minimum(centers + self.after + 1, self._seen) - self._buffer_start
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = (sums[hi] - sums[lo]) / (counts[hi] - counts[lo])
+
+        # Keep only the samples still needed by later windows
+        self._next = stop
+        keep_from = max(self._next - self.before, 0)
+        self._buffer = self._buffer[keep_from - self._buffer_start:]
+        self._buffer_start = keep_from
+        return out
+
+    def process(self, chunk):
+        self._buffer = np.concatenate([self._buffer, np.asarray(chunk, dtype=np.float64)])
+        self._seen += len(chunk)
+        return self._emit(max(self._next, self._seen - self.after))
+
+    def flush(self):
+        return self._emit(self._seen)
+
+
+def savgol_coefficients(window_size, polyorder):
+    """
+    Savitzky-Golay fit matrix for a window of window_size samples.
+
+    Returns:
+        np.ndarray: (window_size, window_size) matrix whose row k evaluates, at window
+        position k, the least-squares polynomial fitted to the window. The center row
+        is the usual convolution kernel.
+    """
+    positions = np.arange(window_size) - (window_size - 1) / 2
+    vandermonde = np.vander(positions, polyorder + 1, increasing=True)
+    return vandermonde @ np.linalg.pinv(vandermonde)
+
+
+class SavitzkyGolay(StreamingFilter):
+    """
+    Streaming Savitzky-Golay filter using precomputed convolution coefficients.
+
+    Equivalent to scipy.signal.savgol_filter(mode='interp'): interior samples use the
+    center kernel and the first/last half windows are evaluated from the polynomial
+    fitted to the first/last full window. An even window_size is rounded up to the
+    next odd size, and series shorter than the window are fitted as a whole. NaN
+    samples are replaced by the last valid value.
+    """
+
+    def __init__(self, window_size=5, polyorder=2):
+        if window_size % 2 == 0:
+            window_size += 1
+        if polyorder >= window_size:
+            raise ValueError(f"polyorder ({polyorder}) must be less than window_size ({window_size})")
+        self.window_size = window_size
+        self.polyorder = polyorder
+        self.half = window_size // 2
+        self.fit = savgol_coefficients(window_size, polyorder)
+        self.kernel = self.fit[self.half][::-1]
+        self._fill = _ForwardFill()
+        self._buffer = np.empty(0)
+        self._started = False
+
+    def process(self, chunk):
+        self._buffer = np.concatenate([self._buffer, self._fill(np.asarray(chunk, dtype=np.float64))])
+        if len(self._buffer) < self.window_size:
+            return np.empty(0)
+
+        parts = []
+        if not self._started:
+            # Leading half window from the polynomial fitted to the first full window
+            parts.append(self.fit[:self.half] @ self._buffer[:self.window_size])
+            self._started = True
+        parts.append(np.convolve(self._buffer, self.kernel, mode='valid'))
+
+        # Keep the last full window for flush() and window_size - 1 samples as context
+        self._last_window = self._buffer[-self.window_size:]
+        self._buffer = self._buffer[len(self._buffer) - (self.window_size - 1):]
+        return np.concatenate(parts)
+
+    def flush(self):
+        buffer = self._buffer
+        self._buffer = np.empty(0)
+        if not self._started:
+            # Series shorter than one window: fit one polynomial to all of it
+            if len(buffer) == 0:
+                return buffer
+            order = min(self.polyorder, len(buffer) - 1)
+            positions = np.arange(len(buffer), dtype=np.float64)
+            return np.polyval(np.polyfit(positions, buffer, order), positions)
+        # Trailing half window from the polynomial fitted to the last full window
+        return self.fit[self.half + 1:] @ self._last_window
+
+
+class ExponentialFilter(StreamingFilter):
+    """
+    Exponential moving average y[i] = alpha * x[i] + (1 - alpha) * y[i-1].
+
+    alpha defaults to 2 / (window_size + 1). The filter state is carried across chunks
+    and NaN samples are replaced by the last valid value.
+    """
+
+    def __init__(self, window_size=5, alpha=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (window_size + 1)
+        self._fill = _ForwardFill()
+        self._state = None
+
+    def process(self, chunk):
+        from scipy.signal import lfilter
+
+        chunk = self._fill(np.asarray(chunk, dtype=np.float64))
+        if len(chunk) == 0:
+            return chunk
+        if self._state is None:
+            # Start from the first sample rather than from zero
+            self._state = np.array([(1 - self.alpha) * chunk[0]])
+        out, self._state = lfilter([self.alpha], [1.0, self.alpha - 1.0], chunk, zi=self._state)
+        return out
+
+
+class Identity(StreamingFilter):
+    def process(self, chunk):
+        return np.asarray(chunk, dtype=np.float64)
+
+
+def make_filter(method='moving_average', window_size=5, polyorder=2):
+    """Create a streaming filter for one of SMOOTHING_METHODS."""
+    if method == 'moving_average':
+        return MovingAverage(window_size)
+    if method == 'savgol':
+        return SavitzkyGolay(window_size, polyorder)
+    if method == 'exponential':
+        return ExponentialFilter(window_size)
+    if method == 'none':
+        return Identity()
+    raise ValueError(f"Unknown smoothing method {method!r}, expected one of {SMOOTHING_METHODS}")
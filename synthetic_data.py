@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from schemas import CHRONO_COLUMNS, SINGLE_WHEEL_COLUMNS
+
+# Rows generated and written per block, so 10M-row files never sit in memory at once
+WRITE_CHUNKSIZE = 1_000_000
+
+
+def single_wheel_block(t, slip=0.1, rng=None, normal_load=50.0, w_r=0.2, r_wheel=0.09, period=1.47):
+    """
+    Synthetic single wheel rig samples at times t, in SINGLE_WHEEL_COLUMNS order.
+
+    The wheel rolls at w_r rad/s with the given slip; drawbar pull follows a saturating
+    slip curve with grouser oscillation at the given period plus sensor noise.
+    """
+    rng = rng or np.random.default_rng()
+    n = len(t)
+    phase = 2 * np.pi * t / period
+    speed = w_r * r_wheel * (1 - slip)
+
+    f_z = normal_load * (1 + 0.05 * np.sin(phase)) + rng.normal(0, 0.5, n)
+    pull = 0.4 * (1 - np.exp(-8 * slip)) - 0.05
+    f_x = f_z * (pull + 0.03 * np.sin(phase)) + rng.normal(0, 0.5, n)
+    f_y = rng.normal(0, 0.3, n)
+    d_c = np.sqrt(f_x ** 2 + f_y ** 2) / f_z
+    v_max = np.full(n, w_r * r_wheel)
+
+    # Wheel spinning about y while translating along x
+    half_angle = 0.5 * w_r * t
+    return np.column_stack([
+        t, f_x, f_y, f_z, d_c, v_max,
+        speed * t, np.zeros(n), 0.005 * np.sin(phase) + rng.normal(0, 1e-4, n),
+        np.zeros(n), np.sin(half_angle), np.zeros(n), np.cos(half_angle),
+        speed + rng.normal(0, 1e-3, n), rng.normal(0, 1e-4, n), 0.005 * 2 * np.pi / period * np.cos(phase),
+    ])
+
+
+def chrono_block(t, slip=0.1, rng=None, w_r=0.2, r_wheel=0.09):
+    """Synthetic Chrono rover samples at times t, in CHRONO_COLUMNS order."""
+    rng = rng or np.random.default_rng()
+    n = len(t)
+    speed = w_r * r_wheel * (1 - slip)
+
+    vel_x = speed * (1 - np.exp(-t / 0.5)) + rng.normal(0, 1e-3, n)
+    yaw = 0.01 * np.sin(0.1 * t)
+    torques = [2.0 + 0.2 * np.sin(2 * np.pi * t / 1.47 + offset) + rng.normal(0, 0.1, n)
+               for offset in (0, np.pi / 2, np.pi, 3 * np.pi / 2)]
+    return np.column_stack([
+        t, speed * t, 0.001 * np.sin(0.05 * t), 0.2 + rng.normal(0, 1e-4, n),
+        vel_x, rng.normal(0, 1e-3, n), rng.normal(0, 1e-3, n),
+        np.cos(yaw / 2), np.zeros(n), np.zeros(n), np.sin(yaw / 2),
+        *torques, np.full(n, slip),
+    ])
+
+
+def write_csv(file_path, block_func, columns, rows, dt=0.001, slip=0.1, seed=0, chunksize=WRITE_CHUNKSIZE):
+    """
+    Write rows samples produced by block_func(t, slip, rng) to a CSV file, block by block.
+
+    Returns:
+        str: file_path
+    """
+    rng = np.random.default_rng(seed)
+    with open(file_path, "w", newline="") as fp:
+        for start in range(0, rows, chunksize):
+            t = np.arange(start, min(start + chunksize, rows)) * dt
+            block = pd.DataFrame(block_func(t, slip, rng), columns=columns)
+            block.to_csv(fp, header=start == 0, index=False, float_format="%.8g")
+    return file_path
+
+
+def write_single_wheel_csv(file_path, rows, dt=0.001, slip=0.1, seed=0):
+    """Write a synthetic single wheel output.csv with all SINGLE_WHEEL_COLUMNS."""
+    return write_csv(file_path, single_wheel_block, SINGLE_WHEEL_COLUMNS, rows, dt, slip, seed)
+
+
+def write_chrono_csv(file_path, rows, dt=0.001, slip=0.1, seed=0):
+    """Write a synthetic 16-column Chrono rover CSV (as read by plot_chronosim_data)."""
+    return write_csv(file_path, chrono_block, CHRONO_COLUMNS, rows, dt, slip, seed)
+
+
+def write_sweep(main_folder, slips, rows, dt=0.001, seed=0):
+    """
+    Write a batch_process_data sweep folder: one run_XX subfolder per slip with params.json and output.csv.
+
+    Returns:
+        list: The subfolder paths.
+    """
+    subdir_paths = []
+    for i, slip in enumerate(slips):
+        subdir_path = os.path.join(main_folder, f"run_{i:02d}")
+        os.makedirs(subdir_path, exist_ok=True)
+        with open(os.path.join(subdir_path, "params.json"), "w") as fp:
+            json.dump({"slip": float(slip)}, fp)
+        write_single_wheel_csv(os.path.join(subdir_path, "output.csv"), rows, dt, slip, seed + i)
+        subdir_paths.append(subdir_path)
+    return subdir_paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic Chrono, single wheel and sweep datasets.")
+    parser.add_argument('layout', choices=['chrono', 'single_wheel', 'sweep'], help="Dataset layout to generate")
+    parser.add_argument('path', help="Output CSV file (or folder for a sweep)")
+    parser.add_argument('--rows', type=int, default=100_000, help="Samples per file")
+    parser.add_argument('--dt', type=float, default=0.001, help="Time step (s)")
+    parser.add_argument('--slip', type=float, nargs='+', default=[0.1], help="Slip value (one per run for a sweep)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+
+    if args.layout == 'chrono':
+        write_chrono_csv(args.path, args.rows, args.dt, args.slip[0], args.seed)
+    elif args.layout == 'single_wheel':
+        write_single_wheel_csv(args.path, args.rows, args.dt, args.slip[0], args.seed)
+    else:
+        write_sweep(args.path, args.slip, args.rows, args.dt, args.seed)
+    print(f"Wrote {args.layout} data to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
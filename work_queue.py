@@ -0,0 +1,199 @@
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+
+# Default queue file name, created inside the batch main folder (shared by every node)
+QUEUE_FILE_NAME = "work_queue.sqlite"
+
+# Seconds after which a claim whose worker never reported back may be claimed again
+DEFAULT_LEASE = 1800.0
+
+# Claims of one subfolder before it is given up as failed (a run that keeps killing its worker)
+MAX_ATTEMPTS = 3
+
+# Seconds a worker waits for the database lock held by another node
+LOCK_TIMEOUT = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    subfolder TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    confidence REAL NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    finished_at REAL,
+    slip REAL,
+    mean_d_c REAL,
+    ci_low REAL,
+    ci_high REAL,
+    params_hash TEXT,
+    csv_size INTEGER,
+    csv_mtime_ns INTEGER,
+    error TEXT,
+    PRIMARY KEY (subfolder, start_time, end_time, confidence)
+)
+"""
+
+
+def worker_name(index=0):
+    """Identify a queue worker as host-pid-index, unique across the nodes sharing a queue."""
+    return f"{socket.gethostname()}-{os.getpid()}-{index}"
+
+
+class WorkQueue:
+    """
+    Work queue of batch subfolders in an SQLite file on storage shared by several nodes.
+
+    A task is one subfolder for one analysis window and confidence (0 when no interval
+    is computed). Subfolders are stored by name, relative to the main folder, so nodes
+    may mount the shared storage at different paths. Claims are made in an exclusive
+    (BEGIN IMMEDIATE) transaction, so no two workers ever hold the same task. A claim
+    not reported back within its lease (e.g. a crashed node) is handed out again.
+    Each result is written to its task row when it completes. These rows are the
+    partial results that merge_batch_results turns into the slip vs drawbar curve.
+
+    The database uses the rollback journal (not WAL), which needs only the POSIX
+    file locks that shared filesystems provide.
+    """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.connection.execute(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def _exclusive(self):
+        """Exclusive (BEGIN IMMEDIATE) transaction: other nodes wait for it on the lock."""
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    @staticmethod
+    def _job(start_time, end_time, confidence):
+        return float(start_time), float(end_time), float(confidence or 0.0)
+
+    def enqueue(self, subfolders, start_time, end_time, confidence=None):
+        """
+        Add subfolder names for an analysis window; already queued ones are kept as they are.
+
+        Returns:
+            int: Number of tasks added.
+        """
+        job = self._job(start_time, end_time, confidence)
+        with self._exclusive() as connection:
+            cursor = connection.executemany(
+                "INSERT OR IGNORE INTO tasks (subfolder, start_time, end_time, confidence) VALUES (?, ?, ?, ?)",
+                [(subfolder,) + job for subfolder in subfolders],
+            )
+        return cursor.rowcount
+
+    def claim(self, worker, start_time, end_time, confidence=None, lease=DEFAULT_LEASE):
+        """
+        Claim the next pending (or expired) task of an analysis window.
+
+        Returns:
+            str: The claimed subfolder name, or None when nothing is left to claim.
+        """
+        job = self._job(start_time, end_time, confidence)
+        now = time.time()
+        with self._exclusive() as connection:
+            # Expired claims that used up their attempts are given up
+            connection.execute(
+                "UPDATE tasks SET state = 'failed', finished_at = ?, error = 'claim expired ' || attempts || ' times' "
+                "WHERE start_time = ? AND end_time = ? AND confidence = ? AND state = 'claimed' "
+                "AND claimed_at < ? AND attempts >= ?",
+                (now,) + job + (now - lease, MAX_ATTEMPTS),
+            )
+            row = connection.execute(
+                "SELECT subfolder FROM tasks WHERE start_time = ? AND end_time = ? AND confidence = ? "
+                "AND (state = 'pending' OR (state = 'claimed' AND claimed_at < ?)) ORDER BY attempts, subfolder LIMIT 1",
+                job + (now - lease,),
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE tasks SET state = 'claimed', worker = ?, claimed_at = ?, attempts = attempts + 1 "
+                    "WHERE subfolder = ? AND start_time = ? AND end_time = ? AND confidence = ?",
+                    (worker, now, row[0]) + job,
+                )
+        return None if row is None else row[0]
+
+    def complete(self, worker, subfolder, start_time, end_time, confidence, result, fingerprint):
+        """
+        Record the (slip, mean_d_c, ci_low, ci_high) result of a claimed task.
+
+        Returns:
+            bool: False if the claim had expired and the task was taken over by another worker.
+        """
+        slip, mean_d_c, ci_low, ci_high = (float(value) for value in result)
+        with self._exclusive() as connection:
+            cursor = connection.execute(
+                "UPDATE tasks SET state = 'done', finished_at = ?, slip = ?, mean_d_c = ?, ci_low = ?, ci_high = ?, "
+                "params_hash = ?, csv_size = ?, csv_mtime_ns = ?, error = NULL "
+                "WHERE subfolder = ? AND start_time = ? AND end_time = ? AND confidence = ? AND worker = ? AND state = 'claimed'",
+                (time.time(), slip, mean_d_c, ci_low, ci_high) + tuple(fingerprint)
+                + (subfolder,) + self._job(start_time, end_time, confidence) + (worker,),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, worker, subfolder, start_time, end_time, confidence, error):
+        """Record that a claimed task failed (it is not retried until requeue_failed)."""
+        with self._exclusive() as connection:
+            connection.execute(
+                "UPDATE tasks SET state = 'failed', finished_at = ?, error = ? "
+                "WHERE subfolder = ? AND start_time = ? AND end_time = ? AND confidence = ? AND worker = ? AND state = 'claimed'",
+                (time.time(), str(error), subfolder) + self._job(start_time, end_time, confidence) + (worker,),
+            )
+
+    def requeue_failed(self, start_time, end_time, confidence=None):
+        """Make the failed tasks of an analysis window pending again; returns how many."""
+        with self._exclusive() as connection:
+            cursor = connection.execute(
+                "UPDATE tasks SET state = 'pending', worker = NULL, claimed_at = NULL, attempts = 0, error = NULL "
+                "WHERE start_time = ? AND end_time = ? AND confidence = ? AND state = 'failed'",
+                self._job(start_time, end_time, confidence),
+            )
+        return cursor.rowcount
+
+    def progress(self, start_time, end_time, confidence=None):
+        """Number of tasks per state ('pending', 'claimed', 'done', 'failed') of an analysis window."""
+        counts = dict.fromkeys(("pending", "claimed", "done", "failed"), 0)
+        counts.update(self.connection.execute(
+            "SELECT state, COUNT(*) FROM tasks WHERE start_time = ? AND end_time = ? AND confidence = ? GROUP BY state",
+            self._job(start_time, end_time, confidence),
+        ).fetchall())
+        return counts
+
+    def results(self, start_time, end_time, confidence=None):
+        """
+        Partial results of an analysis window.
+
+        Returns:
+            tuple: (done, failed) lists; done holds (subfolder, slip, mean_d_c, ci_low, ci_high,
+            (params_hash, csv_size, csv_mtime_ns)) tuples, failed (subfolder, error) tuples.
+        """
+        job = self._job(start_time, end_time, confidence)
+        done = [row[:5] + (row[5:],) for row in self.connection.execute(
+            "SELECT subfolder, slip, mean_d_c, ci_low, ci_high, params_hash, csv_size, csv_mtime_ns FROM tasks "
+            "WHERE start_time = ? AND end_time = ? AND confidence = ? AND state = 'done' ORDER BY subfolder", job)]
+        failed = self.connection.execute(
+            "SELECT subfolder, error FROM tasks WHERE start_time = ? AND end_time = ? AND confidence = ? "
+            "AND state = 'failed' ORDER BY subfolder", job).fetchall()
+        return done, failed